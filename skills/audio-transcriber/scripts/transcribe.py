@@ -12,6 +12,12 @@ import tempfile
 import shutil
 import json
 from pathlib import Path
+
+# 스킬 데몬이 떠 있으면 데몬에서 실행 (무거운 import 전에 확인)
+if __name__ == '__main__':
+    from daemon_client import forward_to_daemon
+    forward_to_daemon(__file__)
+
 from openai import OpenAI
 from dotenv import load_dotenv
 
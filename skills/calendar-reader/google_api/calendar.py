@@ -4,9 +4,66 @@ Google Calendar API Manager
 OAuth 토큰 기반 Calendar API 접근을 제공합니다.
 """
 
-import pickle
-from pathlib import Path
-from googleapiclient.discovery import build
+import heapq
+from datetime import datetime
+from itertools import islice
+from operator import itemgetter
+from zoneinfo import ZoneInfo
+
+from .batch import execute_batch
+from .freebusy import query_freebusy
+from .service import get_service, load_oauth_token
+
+# Partial-response masks: request only the fields the summaries below read.
+# get_event returns the attendee resources as-is, so they stay unmasked there.
+CALENDAR_LIST_FIELDS = 'nextPageToken,items(id,summary,primary,accessRole)'
+EVENT_FIELDS = (
+    'id,summary,start,end,location,description,attendees,'
+    'hangoutLink,htmlLink,status,created,updated'
+)
+EVENT_LIST_FIELDS = (
+    'nextPageToken,items(id,summary,start,end,location,description,'
+    'attendees(email,responseStatus),hangoutLink,htmlLink)'
+)
+
+# events.list returns at most 2500 events per page
+MAX_PAGE_SIZE = 2500
+
+
+def summarize_event(event: dict) -> dict:
+    """Reduce an events.list item to the summary dict printed by read_calendar."""
+    summary = {
+        'id': event['id'],
+        'summary': event.get('summary', '(제목 없음)'),
+        'start': event.get('start', {}).get('dateTime') or event.get('start', {}).get('date'),
+        'end': event.get('end', {}).get('dateTime') or event.get('end', {}).get('date'),
+        'location': event.get('location', ''),
+        'description': event.get('description', ''),
+        'attendees': [
+            {'email': a.get('email'), 'responseStatus': a.get('responseStatus')}
+            for a in event.get('attendees', [])
+        ],
+        'hangoutLink': event.get('hangoutLink', ''),
+        'htmlLink': event.get('htmlLink', '')
+    }
+    if 'calendarId' in event:
+        # Attribution added when several calendars are merged
+        summary['calendarId'] = event['calendarId']
+    return summary
+
+
+def event_timestamp(when: dict, tz: ZoneInfo) -> float:
+    """Epoch seconds of an event start/end (all-day dates start at midnight in the calendar's zone)."""
+    if when.get('dateTime'):
+        return datetime.fromisoformat(when['dateTime']).timestamp()
+    if when.get('date'):
+        return datetime.fromisoformat(when['date']).replace(tzinfo=tz).timestamp()
+    return 0.0
+
+
+def merge_streams(streams):
+    """Merge iterators of (start timestamp, event), each in start order, into one ordered event stream."""
+    return (event for _, event in heapq.merge(*streams, key=itemgetter(0)))
 
 
 class GoogleCalendarManager:
@@ -19,24 +76,38 @@ class GoogleCalendarManager:
         Args:
             token_path: Path to calendar_token.pickle file
         """
-        token_file = Path(token_path)
-        if not token_file.exists():
-            raise FileNotFoundError(f"Token file not found: {token_path}")
+        credentials = load_oauth_token(token_path)
+        self.service = get_service('calendar', 'v3', credentials)
+
+    def execute_batch(self, requests, **kwargs):
+        """
+        Execute many requests built from self.service in HTTP batch calls.
 
-        with open(token_file, 'rb') as f:
-            credentials = pickle.load(f)
+        Args:
+            requests: Iterable of HttpRequest or (key, HttpRequest)
+            **kwargs: batch_size, max_workers, max_retries (see google_api.batch)
 
-        self.service = build('calendar', 'v3', credentials=credentials)
+        Returns:
+            List of BatchResult(key, response, error) in request order
+        """
+        return execute_batch(self.service, requests, **kwargs)
 
-    def list_calendars(self):
+    def list_calendars(self, raw: bool = False):
         """
         Get list of all calendars.
 
+        Args:
+            raw: Return the unmasked API items instead of summaries
+
         Returns:
             List of calendar summary dicts
         """
-        result = self.service.calendarList().list().execute()
+        result = self.service.calendarList().list(
+            fields=None if raw else CALENDAR_LIST_FIELDS
+        ).execute()
         calendars = result.get('items', [])
+        if raw:
+            return calendars
         return [
             {
                 'id': cal['id'],
@@ -47,36 +118,43 @@ class GoogleCalendarManager:
             for cal in calendars
         ]
 
-    def get_events(
+    def iter_events(
         self,
         calendar_id: str = 'primary',
         time_min: str = None,
         time_max: str = None,
-        max_results: int = 100,
         query: str = None,
         single_events: bool = True,
-        order_by: str = 'startTime'
+        order_by: str = 'startTime',
+        raw: bool = False,
+        page_size: int = MAX_PAGE_SIZE
     ):
         """
-        Get events from a calendar.
+        Iterate over all events in a calendar, following nextPageToken.
+
+        Pages are requested one at a time as the caller consumes events, so
+        stopping early skips the remaining pages.
 
         Args:
             calendar_id: Calendar ID (default: 'primary')
             time_min: Start time (RFC3339, e.g., '2026-01-01T00:00:00+09:00')
             time_max: End time (RFC3339)
-            max_results: Maximum number of events
             query: Free text search query
             single_events: Expand recurring events
             order_by: Order by 'startTime' or 'updated'
+            raw: Yield the unmasked API event resources instead of summaries
+            page_size: Events per page (capped at MAX_PAGE_SIZE)
 
-        Returns:
-            List of event dicts
+        Yields:
+            Event dicts
         """
         params = {
             'calendarId': calendar_id,
-            'maxResults': max_results,
+            'maxResults': max(1, min(page_size, MAX_PAGE_SIZE)),
             'singleEvents': single_events,
         }
+        if not raw:
+            params['fields'] = EVENT_LIST_FIELDS
 
         if time_min:
             params['timeMin'] = time_min
@@ -87,42 +165,142 @@ class GoogleCalendarManager:
         if single_events and order_by:
             params['orderBy'] = order_by
 
-        result = self.service.events().list(**params).execute()
-        events = result.get('items', [])
+        events = self.service.events()
+        request = events.list(**params)
+        while request is not None:
+            result = request.execute()
+            for event in result.get('items', []):
+                yield event if raw else summarize_event(event)
+            request = events.list_next(request, result)
 
-        return [
-            {
-                'id': event['id'],
-                'summary': event.get('summary', '(제목 없음)'),
-                'start': event.get('start', {}).get('dateTime') or event.get('start', {}).get('date'),
-                'end': event.get('end', {}).get('dateTime') or event.get('end', {}).get('date'),
-                'location': event.get('location', ''),
-                'description': event.get('description', ''),
-                'attendees': [
-                    {'email': a.get('email'), 'responseStatus': a.get('responseStatus')}
-                    for a in event.get('attendees', [])
-                ],
-                'hangoutLink': event.get('hangoutLink', ''),
-                'htmlLink': event.get('htmlLink', '')
-            }
-            for event in events
-        ]
+    def get_events(
+        self,
+        calendar_id: str = 'primary',
+        time_min: str = None,
+        time_max: str = None,
+        max_results: int = None,
+        query: str = None,
+        single_events: bool = True,
+        order_by: str = 'startTime',
+        raw: bool = False
+    ):
+        """
+        Get events from a calendar.
+
+        Args:
+            calendar_id: Calendar ID (default: 'primary')
+            time_min: Start time (RFC3339, e.g., '2026-01-01T00:00:00+09:00')
+            time_max: End time (RFC3339)
+            max_results: Maximum number of events (None: all events in the range)
+            query: Free text search query
+            single_events: Expand recurring events
+            order_by: Order by 'startTime' or 'updated'
+            raw: Return the unmasked API event resources instead of summaries
+
+        Returns:
+            List of event dicts
+        """
+        events = self.iter_events(
+            calendar_id=calendar_id,
+            time_min=time_min,
+            time_max=time_max,
+            query=query,
+            single_events=single_events,
+            order_by=order_by,
+            raw=raw,
+            page_size=max_results or MAX_PAGE_SIZE
+        )
+        return list(islice(events, max_results))
+
+    def _iter_calendar_pages(self, calendar_id: str, request, result: dict, raw: bool):
+        """Yield (start timestamp, event tagged with calendarId), fetching later pages on demand."""
+        tz = ZoneInfo(result.get('timeZone') or 'UTC')
+        events = self.service.events()
+        while True:
+            for event in result.get('items', []):
+                event['calendarId'] = calendar_id
+                yield event_timestamp(event.get('start', {}), tz), event if raw else summarize_event(event)
+            request = events.list_next(request, result)
+            if request is None:
+                return
+            result = request.execute()
 
-    def get_event(self, event_id: str, calendar_id: str = 'primary'):
+    def iter_merged_events(
+        self,
+        calendar_ids: list,
+        time_min: str = None,
+        time_max: str = None,
+        query: str = None,
+        raw: bool = False,
+        page_size: int = MAX_PAGE_SIZE,
+        on_error=None
+    ):
+        """
+        Iterate over the events of several calendars as one start-ordered stream.
+
+        The first page of every calendar is fetched concurrently in HTTP
+        batch calls; further pages of a calendar are requested only when the
+        merge reaches them. Every event carries a 'calendarId' key.
+
+        Args:
+            calendar_ids: Calendar IDs (duplicates are ignored)
+            time_min: Start time (RFC3339)
+            time_max: End time (RFC3339)
+            query: Free text search query
+            raw: Yield the unmasked API event resources instead of summaries
+            page_size: Events per page (capped at MAX_PAGE_SIZE)
+            on_error: Called as on_error(calendar_id, error) for a calendar that
+                cannot be read; if None the error is raised
+
+        Yields:
+            Event dicts in start time order
+        """
+        params = {
+            'maxResults': max(1, min(page_size, MAX_PAGE_SIZE)),
+            'singleEvents': True,
+            'orderBy': 'startTime',
+        }
+        if not raw:
+            params['fields'] = 'timeZone,' + EVENT_LIST_FIELDS
+        if time_min:
+            params['timeMin'] = time_min
+        if time_max:
+            params['timeMax'] = time_max
+        if query:
+            params['q'] = query
+
+        events = self.service.events()
+        requests = {cal_id: events.list(calendarId=cal_id, **params) for cal_id in dict.fromkeys(calendar_ids)}
+        streams = []
+        for result in self.execute_batch(requests.items()):
+            if not result.ok:
+                if on_error is None:
+                    raise result.error
+                on_error(result.key, result.error)
+                continue
+            streams.append(self._iter_calendar_pages(result.key, requests[result.key], result.response, raw))
+
+        yield from merge_streams(streams)
+
+    def get_event(self, event_id: str, calendar_id: str = 'primary', raw: bool = False):
         """
         Get a single event by ID.
 
         Args:
             event_id: Event ID
             calendar_id: Calendar ID
+            raw: Return the unmasked API event resource
 
         Returns:
             Event dict
         """
         event = self.service.events().get(
             calendarId=calendar_id,
-            eventId=event_id
+            eventId=event_id,
+            fields=None if raw else EVENT_FIELDS
         ).execute()
+        if raw:
+            return event
 
         return {
             'id': event['id'],
@@ -143,24 +321,23 @@ class GoogleCalendarManager:
         self,
         calendar_ids: list,
         time_min: str,
-        time_max: str
+        time_max: str,
+        ttl: float = None
     ):
         """
         Get free/busy information for calendars.
 
+        Any number of calendars can be passed; they are queried in
+        API-sized chunks and recent results are served from a short-lived
+        cache (see google_api.freebusy).
+
         Args:
             calendar_ids: List of calendar IDs
             time_min: Start time (RFC3339)
             time_max: End time (RFC3339)
+            ttl: Cache lifetime in seconds (0 always queries the API)
 
         Returns:
             Dict with busy times per calendar
         """
-        body = {
-            'timeMin': time_min,
-            'timeMax': time_max,
-            'items': [{'id': cal_id} for cal_id in calendar_ids]
-        }
-
-        result = self.service.freebusy().query(body=body).execute()
-        return result.get('calendars', {})
+        return query_freebusy(self.service, calendar_ids, time_min, time_max, ttl=ttl)
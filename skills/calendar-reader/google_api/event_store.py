@@ -0,0 +1,313 @@
+"""
+Calendar Event Store
+
+Local SQLite copy of one calendar's events, kept current with incremental sync.
+
+- The first sync downloads every event ending after the sync window start
+  (SYNC_PAST_DAYS before today unless a query needs more) and keeps the
+  nextSyncToken from the last page.
+- Later syncs call events.list with that syncToken and apply only the
+  changes; cancelled events are deleted. When the token has expired (410
+  GONE) the store is rebuilt with a full sync.
+- Date-range listing and text search are answered from the store.
+
+One database file per calendar under CACHE_DIR. Syncs hold an flock on
+<database>.lock, so concurrent processes take turns and each one applies
+only what changed since the previous sync. Pages are fetched outside any
+database transaction and written in short ones (a full sync builds a temp
+table and swaps it in at the end), so readers are never blocked by a sync
+in progress and always see a complete store.
+"""
+
+import fcntl
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from googleapiclient.errors import HttpError
+
+from .calendar import MAX_PAGE_SIZE, event_timestamp, merge_streams
+
+CACHE_DIR = Path(os.getenv('GOOGLE_CALENDAR_CACHE_DIR', str(Path.home() / '.cache/calendar-reader')))
+
+# Days before today that the first sync covers
+SYNC_PAST_DAYS = 180
+
+# Same event fields as EVENT_LIST_FIELDS plus what syncing needs
+EVENT_SYNC_FIELDS = (
+    'nextPageToken,nextSyncToken,timeZone,items(id,status,summary,start,end,location,description,'
+    'attendees(email,responseStatus),hangoutLink,htmlLink)'
+)
+
+EVENTS_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id TEXT PRIMARY KEY,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    search_text TEXT NOT NULL,
+    resource TEXT NOT NULL
+);
+"""
+
+SCHEMA = EVENTS_TABLE.format(table='events') + """
+CREATE INDEX IF NOT EXISTS idx_events_start ON events(start_ts);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def parse_time(value: str) -> float:
+    """Epoch seconds of an RFC3339 query bound."""
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _search_text(event: dict) -> str:
+    parts = [event.get('summary', ''), event.get('description', ''), event.get('location', '')]
+    parts.extend(a.get('email', '') for a in event.get('attendees', []))
+    return '\n'.join(parts).lower()
+
+
+def _store_path(calendar_id: str) -> Path:
+    return CACHE_DIR / (re.sub(r'[^A-Za-z0-9_.@-]', '_', calendar_id) + '.sqlite3')
+
+
+class EventStore:
+    """Local SQLite copy of one calendar's (single, expanded) events."""
+
+    def __init__(self, calendar_id: str = 'primary', path=None):
+        self.calendar_id = calendar_id
+        self.path = Path(path) if path else _store_path(calendar_id)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly around each page a sync writes
+        self.conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----- State -----
+
+    def get_state(self, key: str, default=None):
+        row = self.conn.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else default
+
+    def set_state(self, key: str, value):
+        self.conn.execute('INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', (key, str(value)))
+
+    @property
+    def time_zone(self) -> ZoneInfo:
+        return ZoneInfo(self.get_state('time_zone', 'UTC'))
+
+    @property
+    def window_start(self):
+        """Epoch seconds from which the store holds every event (None before the first sync)."""
+        value = self.get_state('window_start')
+        return float(value) if value is not None else None
+
+    def covers(self, time_min: str = None) -> bool:
+        """Whether events ending after time_min are all in the store."""
+        start = self.window_start
+        return start is not None and self.get_state('sync_token') is not None and (
+            time_min is None or parse_time(time_min) >= start
+        )
+
+    # ----- Sync -----
+
+    @contextmanager
+    def _transaction(self, mode: str = 'IMMEDIATE'):
+        self.conn.execute(f'BEGIN {mode}')
+        try:
+            yield
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    @contextmanager
+    def _sync_lock(self):
+        """Exclusive per-store lock held for a whole sync (does not block readers)."""
+        with open(str(self.path) + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _apply(self, events: list, tz: ZoneInfo, table: str = 'events') -> tuple:
+        changed = deleted = 0
+        for event in events:
+            if event.get('status') == 'cancelled':
+                deleted += self.conn.execute(f'DELETE FROM {table} WHERE id = ?', (event['id'],)).rowcount
+                continue
+            event.pop('status', None)
+            self.conn.execute(
+                f'INSERT OR REPLACE INTO {table} (id, start_ts, end_ts, search_text, resource) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (
+                    event['id'],
+                    event_timestamp(event.get('start', {}), tz),
+                    event_timestamp(event.get('end', {}), tz),
+                    _search_text(event),
+                    json.dumps(event, ensure_ascii=False),
+                ),
+            )
+            changed += 1
+        return changed, deleted
+
+    def _pages(self, service, **params):
+        """events.list result pages (network only; the last one carries nextSyncToken)."""
+        events = service.events()
+        request = events.list(
+            calendarId=self.calendar_id, singleEvents=True, maxResults=MAX_PAGE_SIZE,
+            fields=EVENT_SYNC_FIELDS, **params
+        )
+        while request is not None:
+            result = request.execute()
+            yield result
+            request = events.list_next(request, result)
+
+    def _full_sync(self, service, window_start: float) -> dict:
+        # Build the new copy in a temp table; readers keep seeing the old one until the swap
+        self.conn.execute(EVENTS_TABLE.format(table='temp.staging'))
+        self.conn.execute('DELETE FROM temp.staging')
+        time_min = datetime.fromtimestamp(window_start, timezone.utc).isoformat()
+        time_zone = self.get_state('time_zone', 'UTC')
+        changed, sync_token = 0, None
+        try:
+            for page in self._pages(service, timeMin=time_min):
+                time_zone = page.get('timeZone') or time_zone
+                with self._transaction('DEFERRED'):
+                    changed += self._apply(page.get('items', []), ZoneInfo(time_zone), 'temp.staging')[0]
+                sync_token = page.get('nextSyncToken')
+
+            with self._transaction():
+                self.conn.execute('DELETE FROM events')
+                self.conn.execute('INSERT INTO events SELECT * FROM temp.staging')
+                self.set_state('time_zone', time_zone)
+                self.set_state('window_start', window_start)
+                self.set_state('sync_token', sync_token)
+                self.set_state('last_sync', time.time())
+        finally:
+            self.conn.execute('DROP TABLE IF EXISTS temp.staging')
+        return {'mode': 'full', 'changed': changed, 'deleted': 0}
+
+    def _incremental_sync(self, service) -> dict:
+        changed = deleted = 0
+        try:
+            for page in self._pages(service, syncToken=self.get_state('sync_token')):
+                # One short transaction per page; the new token is stored with the last page,
+                # so an interrupted sync re-applies (idempotent) changes from the old token
+                with self._transaction():
+                    if page.get('timeZone'):
+                        self.set_state('time_zone', page['timeZone'])
+                    page_changed, page_deleted = self._apply(page.get('items', []), self.time_zone)
+                    if 'nextSyncToken' in page:
+                        self.set_state('sync_token', page['nextSyncToken'])
+                        self.set_state('last_sync', time.time())
+                changed += page_changed
+                deleted += page_deleted
+        except HttpError as e:
+            if e.resp.status == 410:
+                # Sync token expired or invalidated: start over
+                return self._full_sync(service, self.window_start)
+            raise
+        return {'mode': 'incremental', 'changed': changed, 'deleted': deleted}
+
+    def sync(self, service, time_min: str = None, max_age: float = 0, full: bool = False) -> dict:
+        """
+        Bring the store up to date.
+
+        Runs a full sync when the store is empty, when full=True, or when
+        time_min is earlier than the synced window; otherwise applies the
+        changes since the last sync. Another process syncing the same store
+        makes this call wait for it (and then usually find little to do).
+
+        Args:
+            service: Calendar API service
+            time_min: Earliest time the caller is about to query (RFC3339)
+            max_age: Skip syncing if the last sync is newer than this many minutes
+            full: Force a full sync
+
+        Returns:
+            {'mode': 'full'|'incremental'|'fresh', 'changed': int, 'deleted': int}
+        """
+        with self._sync_lock():
+            if full or not self.covers(time_min):
+                default_start = datetime.combine(datetime.now().date() - timedelta(days=SYNC_PAST_DAYS),
+                                                 datetime.min.time()).timestamp()
+                starts = [default_start, self.window_start or default_start]
+                if time_min:
+                    starts.append(parse_time(time_min))
+                return self._full_sync(service, min(starts))
+            if time.time() - float(self.get_state('last_sync', 0)) < max_age * 60:
+                return {'mode': 'fresh', 'changed': 0, 'deleted': 0}
+            return self._incremental_sync(service)
+
+    # ----- Queries -----
+
+    def _select(self, time_min: str = None, time_max: str = None, query: str = None):
+        clauses, params = [], []
+        if time_min:
+            clauses.append('end_ts > ?')
+            params.append(parse_time(time_min))
+        if time_max:
+            clauses.append('start_ts < ?')
+            params.append(parse_time(time_max))
+        for phrase, word in _TERM_RE.findall(query or ''):
+            clauses.append("search_text LIKE ? ESCAPE '\\'")
+            term = (phrase or word).lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f'%{term}%')
+
+        where = ' AND '.join(clauses) or '1'
+        return self.conn.execute(
+            f'SELECT start_ts, resource FROM events WHERE {where} ORDER BY start_ts, end_ts, id', params
+        )
+
+    def iter_events(self, time_min: str = None, time_max: str = None, query: str = None):
+        """
+        Events overlapping [time_min, time_max) in start order, like events.list with singleEvents.
+
+        Args:
+            time_min: Lower bound (exclusive) for the event end (RFC3339)
+            time_max: Upper bound (exclusive) for the event start (RFC3339)
+            query: Words (or "quoted phrases") that must all appear in the summary,
+                description, location or attendee emails (case-insensitive)
+
+        Yields:
+            Event resources (EVENT_SYNC_FIELDS without status)
+        """
+        return (json.loads(row['resource']) for row in self._select(time_min, time_max, query))
+
+    def _iter_keyed(self, time_min: str = None, time_max: str = None, query: str = None):
+        for row in self._select(time_min, time_max, query):
+            event = json.loads(row['resource'])
+            event['calendarId'] = self.calendar_id
+            yield row['start_ts'], event
+
+
+def merge_stores(stores, time_min: str = None, time_max: str = None, query: str = None):
+    """
+    Events of several stores as one start-ordered stream (see EventStore.iter_events).
+
+    Yields:
+        Event resources, each with a 'calendarId' key
+    """
+    return merge_streams(store._iter_keyed(time_min, time_max, query) for store in stores)
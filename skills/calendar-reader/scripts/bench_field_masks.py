@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Calendar partial response (fields mask) benchmark
+
+Applies the GoogleCalendarManager field masks to a recorded events.list page in
+fixtures/ the same way the API does, and compares response bytes (raw/gzip) and
+JSON decode time against the full response.
+
+Usage:
+    python bench_field_masks.py --repeat 500
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google_api.calendar import EVENT_FIELDS, EVENT_LIST_FIELDS
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+FIELD_PATH_RE = re.compile(r'\w+(?:/\w+)*')
+
+
+def parse_fields(spec: str, pos: int = 0):
+    """Parse a fields spec ('a,b/c,d(e,f)') into a {name: subtree or True} tree."""
+    tree = {}
+    while pos < len(spec) and spec[pos] != ')':
+        match = FIELD_PATH_RE.match(spec, pos)
+        if not match:
+            raise ValueError(f"Invalid fields spec: {spec[pos:]!r}")
+        *parents, name = match.group().split('/')
+        pos = match.end()
+
+        node = tree
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        if pos < len(spec) and spec[pos] == '(':
+            node[name], pos = parse_fields(spec, pos + 1)
+            pos += 1
+        else:
+            node[name] = True
+        if pos < len(spec) and spec[pos] == ',':
+            pos += 1
+    return tree, pos
+
+
+def apply_fields(resource, tree):
+    """Trim a resource with a parsed fields tree (applied per element for lists)."""
+    if tree is True:
+        return resource
+    if isinstance(resource, list):
+        return [apply_fields(item, tree) for item in resource]
+    if isinstance(resource, dict):
+        return {key: apply_fields(resource[key], sub) for key, sub in tree.items() if key in resource}
+    return resource
+
+
+def measure(data, repeat: int):
+    # The API returns indented JSON
+    payload = json.dumps(data, ensure_ascii=False, indent=2).encode()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        json.loads(payload)
+    return len(payload), len(gzip.compress(payload)), (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calendar fields mask benchmark')
+    parser.add_argument('--repeat', type=int, default=500, help='JSON decode repetitions (default: 500)')
+    args = parser.parse_args()
+
+    page = json.loads((FIXTURES / 'calendar_events_page.json').read_text())
+    cases = [
+        ('events.list page', page, EVENT_LIST_FIELDS),
+        ('events.get', page['items'][0], EVENT_FIELDS),
+    ]
+
+    print(f"{'Response':<18} {'Full(B)':>9} {'Masked(B)':>10} {'gzip full':>10} {'gzip masked':>12} "
+          f"{'Decode(us)':>17}")
+    print('-' * 80)
+    for name, resource, fields in cases:
+        masked = apply_fields(resource, parse_fields(fields)[0])
+        full_bytes, full_gzip, full_us = measure(resource, args.repeat)
+        masked_bytes, masked_gzip, masked_us = measure(masked, args.repeat)
+        print(f"{name:<18} {full_bytes:>9} {masked_bytes:>10} {full_gzip:>10} {masked_gzip:>12} "
+              f"{full_us:>8.1f} → {masked_us:>6.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,13 +9,21 @@ import argparse
 import json
 import os
 import sys
+from contextlib import ExitStack
 from datetime import datetime, timedelta
+from itertools import islice
 from zoneinfo import ZoneInfo
 
+# 스킬 데몬이 떠 있으면 데몬에서 실행 (무거운 import 전에 확인)
+if __name__ == '__main__':
+    from daemon_client import forward_to_daemon
+    forward_to_daemon(__file__)
+
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from google_api.calendar import GoogleCalendarManager
+from google_api.calendar import MAX_PAGE_SIZE, GoogleCalendarManager, summarize_event
+from google_api.event_store import EventStore, merge_stores
 
 
 def get_kst_now():
@@ -37,25 +45,136 @@ def format_datetime_kst(dt_str):
         return dt_str + ' (종일)'
 
 
+def write_json_array(items, out=sys.stdout):
+    """Write items as the same indented JSON array as json.dumps(indent=2), one item at a time."""
+    count = 0
+    for item in items:
+        out.write('[\n' if count == 0 else ',\n')
+        out.write('\n'.join('  ' + line for line in json.dumps(item, ensure_ascii=False, indent=2).splitlines()))
+        count += 1
+    out.write('\n]\n' if count else '[]\n')
+    return count
+
+
+def write_jsonl(items, out=sys.stdout):
+    """Write one JSON object per line, flushing so each line is readable as soon as it is fetched."""
+    count = 0
+    for item in items:
+        out.write(json.dumps(item, ensure_ascii=False) + '\n')
+        out.flush()
+        count += 1
+    return count
+
+
+def write_event_table(events, out=sys.stdout, labels=None):
+    """
+    Write events grouped by date as they arrive; returns the number of events.
+
+    With labels ({calendar ID: name}), each row shows the calendar it came from.
+    """
+    weekdays = ['월', '화', '수', '목', '금', '토', '일']
+    count = 0
+    current_date = None
+    for event in events:
+        start = event['start']
+        if start:
+            event_date = start[:10]
+            if event_date != current_date:
+                current_date = event_date
+                # Parse and format date with weekday
+                dt = datetime.strptime(event_date, '%Y-%m-%d')
+                out.write(f"\n📅 {event_date} ({weekdays[dt.weekday()]})\n")
+                out.write('-' * 40 + '\n')
+
+        start_fmt = format_datetime_kst(event['start'])
+        end_fmt = format_datetime_kst(event['end'])
+
+        # Time only for display
+        if 'T' in (event['start'] or ''):
+            start_time = start_fmt.split(' ')[1] if ' ' in start_fmt else start_fmt
+            end_time = end_fmt.split(' ')[1] if ' ' in end_fmt else end_fmt
+            time_str = f"{start_time} - {end_time}"
+        else:
+            time_str = "종일"
+
+        if labels:
+            label = labels.get(event.get('calendarId'), event.get('calendarId', ''))
+            out.write(f"  {time_str:15} [{label[:16]}] {event['summary'][:40]}\n")
+        else:
+            out.write(f"  {time_str:15} {event['summary'][:40]}\n")
+        if event['location']:
+            out.write(f"  {'':15} 📍 {event['location'][:35]}\n")
+        count += 1
+
+    if not count:
+        out.write("No events found.\n")
+    return count
+
+
+def write_events(args, events, calendar_ids, labels, start_date, end_date):
+    """Write events in the requested format; returns the number of events."""
+    if args.format == 'jsonl':
+        return write_jsonl(events)
+    if args.format == 'json' or args.raw:
+        return write_json_array(events)
+
+    print(f"Calendar: {', '.join(labels.get(cal_id, cal_id) for cal_id in calendar_ids)}")
+    print(f"Period: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
+    if args.query:
+        print(f"Search: {args.query}")
+    print('-' * 80)
+    return write_event_table(events, labels=labels if len(calendar_ids) > 1 else None)
+
+
+def resolve_calendars(manager, args):
+    """
+    Calendar IDs to read and their display names.
+
+    Returns:
+        ([calendar ID, ...], {calendar ID: name})
+    """
+    if args.all:
+        calendars = manager.list_calendars()
+        return [cal['id'] for cal in calendars], {cal['id']: cal['summary'] or cal['id'] for cal in calendars}
+    calendar_ids = list(dict.fromkeys(args.calendar_id or ['primary']))
+    return calendar_ids, {cal_id: cal_id.split('@')[0] for cal_id in calendar_ids}
+
+
+def warn_calendar_error(calendar_id, error):
+    print(f"Warning: skipped {calendar_id}: {error}", file=sys.stderr)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Google Calendar Reader')
     parser.add_argument('--token', help='Path to calendar_token.pickle')
     parser.add_argument('--list-calendars', action='store_true',
                         help='List all calendars')
-    parser.add_argument('--calendar-id', default='primary',
-                        help='Calendar ID (default: primary)')
+    parser.add_argument('--calendar-id', action='append',
+                        help='Calendar ID, repeat for several calendars (default: primary)')
+    parser.add_argument('--all', action='store_true',
+                        help='Read every calendar in the calendar list')
     parser.add_argument('--date', help='Date to query (YYYY-MM-DD, default: today)')
     parser.add_argument('--days', type=int, default=7,
                         help='Number of days to query (default: 7)')
     parser.add_argument('--query', help='Search query')
-    parser.add_argument('--max-results', type=int, default=50,
-                        help='Maximum number of events')
+    parser.add_argument('--max-results', type=int,
+                        help='Maximum number of events (default: all events in the period)')
     parser.add_argument('--freebusy', action='store_true',
                         help='Get free/busy info instead of events')
-    parser.add_argument('--format', choices=['json', 'table'], default='table',
+    parser.add_argument('--format', choices=['json', 'jsonl', 'table'], default='table',
                         help='Output format')
+    parser.add_argument('--raw', action='store_true',
+                        help='Print unmasked API resources as JSON (no field filtering)')
+    parser.add_argument('--cached', action='store_true',
+                        help='Serve events from the local event store, syncing only changes first')
+    parser.add_argument('--max-age', type=float, default=0,
+                        help='With --cached, skip syncing if the store was synced within N minutes')
+    parser.add_argument('--full-sync', action='store_true',
+                        help='With --cached, rebuild the local event store from scratch')
 
     args = parser.parse_args()
+    if args.cached and args.raw:
+        parser.error('--raw cannot be combined with --cached (the store keeps masked events)')
 
     # Token path
     token_path = args.token or os.environ.get('GOOGLE_CALENDAR_TOKEN')
@@ -80,8 +199,10 @@ def main():
 
         # List calendars mode
         if args.list_calendars:
-            calendars = manager.list_calendars()
-            if args.format == 'json':
+            calendars = manager.list_calendars(raw=args.raw)
+            if args.format == 'jsonl':
+                write_jsonl(calendars)
+            elif args.format == 'json' or args.raw:
                 print(json.dumps(calendars, ensure_ascii=False, indent=2))
             else:
                 print(f"{'Primary':<8} {'ID':<40} {'Name':<30}")
@@ -91,6 +212,8 @@ def main():
                     print(f"{primary:<8} {cal['id'][:38]:<40} {cal['summary'][:28]:<30}")
             return
 
+        calendar_ids, labels = resolve_calendars(manager, args)
+
         # Calculate time range
         kst = ZoneInfo('Asia/Seoul')
         if args.date:
@@ -106,15 +229,18 @@ def main():
 
         # Free/busy mode
         if args.freebusy:
-            cal_ids = [args.calendar_id]
-            freebusy = manager.get_freebusy(cal_ids, time_min, time_max)
-            if args.format == 'json':
+            freebusy = manager.get_freebusy(calendar_ids, time_min, time_max)
+            if args.format == 'jsonl':
+                write_jsonl({'calendar': cal_id, **info} for cal_id, info in freebusy.items())
+            elif args.format == 'json':
                 print(json.dumps(freebusy, ensure_ascii=False, indent=2))
             else:
-                print(f"Free/Busy for {args.calendar_id}")
+                print(f"Free/Busy for {', '.join(labels.get(cal_id, cal_id) for cal_id in calendar_ids)}")
                 print(f"Period: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
                 print('-' * 60)
                 for cal_id, info in freebusy.items():
+                    if len(calendar_ids) > 1:
+                        print(f"\n{labels.get(cal_id, cal_id)}")
                     busy_times = info.get('busy', [])
                     if busy_times:
                         for slot in busy_times:
@@ -125,57 +251,37 @@ def main():
                         print("  No busy times (all free)")
             return
 
-        # Get events
-        events = manager.get_events(
-            calendar_id=args.calendar_id,
-            time_min=time_min,
-            time_max=time_max,
-            max_results=args.max_results,
-            query=args.query
-        )
-
-        if args.format == 'json':
-            print(json.dumps(events, ensure_ascii=False, indent=2))
+        # Get events from the local stores (after syncing changes)
+        if args.cached:
+            with ExitStack() as stack:
+                stores = [stack.enter_context(EventStore(cal_id)) for cal_id in calendar_ids]
+                for store in stores:
+                    stats = store.sync(manager.service, time_min, args.max_age, full=args.full_sync)
+                    print(f"Event store ({store.calendar_id}): {stats['mode']} sync, {stats['changed']} changed, "
+                          f"{stats['deleted']} deleted", file=sys.stderr)
+                if len(stores) > 1:
+                    events = merge_stores(stores, time_min, time_max, args.query)
+                else:
+                    events = stores[0].iter_events(time_min, time_max, args.query)
+                count = write_events(args, map(summarize_event, islice(events, args.max_results)),
+                                     calendar_ids, labels, start_date, end_date)
         else:
-            print(f"Calendar: {args.calendar_id}")
-            print(f"Period: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
-            if args.query:
-                print(f"Search: {args.query}")
-            print('-' * 80)
-
-            if not events:
-                print("No events found.")
+            # Get events (pages are fetched as the output is written)
+            params = dict(
+                time_min=time_min,
+                time_max=time_max,
+                query=args.query,
+                raw=args.raw,
+                page_size=args.max_results or MAX_PAGE_SIZE
+            )
+            if len(calendar_ids) > 1:
+                # First pages of all calendars in batch calls, merged in start order
+                events = manager.iter_merged_events(calendar_ids, on_error=warn_calendar_error, **params)
             else:
-                current_date = None
-                for event in events:
-                    start = event['start']
-                    if start:
-                        event_date = start[:10]
-                        if event_date != current_date:
-                            current_date = event_date
-                            # Parse and format date with weekday
-                            dt = datetime.strptime(event_date, '%Y-%m-%d')
-                            weekdays = ['월', '화', '수', '목', '금', '토', '일']
-                            weekday = weekdays[dt.weekday()]
-                            print(f"\n📅 {event_date} ({weekday})")
-                            print('-' * 40)
-
-                    start_fmt = format_datetime_kst(event['start'])
-                    end_fmt = format_datetime_kst(event['end'])
-
-                    # Time only for display
-                    if 'T' in (event['start'] or ''):
-                        start_time = start_fmt.split(' ')[1] if ' ' in start_fmt else start_fmt
-                        end_time = end_fmt.split(' ')[1] if ' ' in end_fmt else end_fmt
-                        time_str = f"{start_time} - {end_time}"
-                    else:
-                        time_str = "종일"
-
-                    print(f"  {time_str:15} {event['summary'][:40]}")
-                    if event['location']:
-                        print(f"  {'':15} 📍 {event['location'][:35]}")
+                events = manager.iter_events(calendar_id=calendar_ids[0], **params)
+            count = write_events(args, islice(events, args.max_results), calendar_ids, labels, start_date, end_date)
 
-        print(f"\n✅ {len(events)} events found", file=sys.stderr)
+        print(f"\n✅ {count} events found", file=sys.stderr)
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
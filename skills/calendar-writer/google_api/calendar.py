@@ -4,9 +4,64 @@ Google Calendar API Manager (Writer)
 OAuth 토큰 기반 Calendar API 쓰기 기능을 제공합니다.
 """
 
-import pickle
-from pathlib import Path
-from googleapiclient.discovery import build
+import base64
+import hashlib
+import json
+
+import httplib2
+from google.auth.exceptions import TransportError
+from googleapiclient.errors import HttpError
+
+from .batch import execute_batch, iter_batch
+from .service import get_service, load_oauth_token
+
+BULK_OPERATIONS = ('create', 'update', 'delete', 'quick-add')
+
+
+def _event_time(value: str, timezone: str, all_day: bool = False) -> dict:
+    """start/end object for a date (all-day) or a date-time (+09:00 assumed without an offset)."""
+    if all_day or 'T' not in value:
+        return {'date': value[:10]}
+    if not ('+' in value or 'Z' in value):
+        value = value + '+09:00'
+    return {'dateTime': value, 'timeZone': timezone}
+
+
+def event_id_for(calendar_id: str, key: str) -> str:
+    """
+    Deterministic event ID for a client-side key.
+
+    Calendar accepts client-chosen IDs made of base32hex characters (0-9, a-v),
+    so inserting the same key twice fails with 409 instead of creating a
+    duplicate event.
+    """
+    digest = hashlib.sha256(f'{calendar_id}\n{key}'.encode()).digest()
+    return base64.b32hexencode(digest).decode().rstrip('=').lower()
+
+
+def operation_key(op: dict) -> str:
+    """Stable identity of a bulk operation: its 'key' field, else a hash of its content."""
+    if op.get('key'):
+        return str(op['key'])
+    content = json.dumps({k: v for k, v in op.items() if k != 'key'}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def _status_of(error) -> int:
+    return error.resp.status if isinstance(error, HttpError) else 0
+
+
+def _is_ambiguous(error) -> bool:
+    """
+    Whether the server may have carried out the request anyway.
+
+    5xx responses and connections dropped after the request went out; a
+    refused connection, failed DNS lookup or token refresh never reached
+    the API.
+    """
+    if isinstance(error, HttpError):
+        return error.resp.status >= 500
+    return not isinstance(error, (ConnectionRefusedError, httplib2.ServerNotFoundError, TransportError))
 
 
 class GoogleCalendarWriter:
@@ -19,14 +74,21 @@ class GoogleCalendarWriter:
         Args:
             token_path: Path to calendar_token.pickle file
         """
-        token_file = Path(token_path)
-        if not token_file.exists():
-            raise FileNotFoundError(f"Token file not found: {token_path}")
+        credentials = load_oauth_token(token_path)
+        self.service = get_service('calendar', 'v3', credentials)
+
+    def execute_batch(self, requests, **kwargs):
+        """
+        Execute many requests built from self.service in HTTP batch calls.
 
-        with open(token_file, 'rb') as f:
-            credentials = pickle.load(f)
+        Args:
+            requests: Iterable of HttpRequest or (key, HttpRequest)
+            **kwargs: batch_size, max_workers, max_retries (see google_api.batch)
 
-        self.service = build('calendar', 'v3', credentials=credentials)
+        Returns:
+            List of BatchResult(key, response, error) in request order
+        """
+        return execute_batch(self.service, requests, **kwargs)
 
     def create_event(
         self,
@@ -61,22 +123,55 @@ class GoogleCalendarWriter:
         Returns:
             Created event dict
         """
+        result = self.insert_request(
+            summary, start, end, calendar_id, description, location, attendees,
+            timezone, all_day, send_notifications, conference
+        ).execute()
+        return self._created(result)
+
+    def _created(self, result: dict) -> dict:
+        return {
+            'id': result['id'],
+            'summary': result.get('summary'),
+            'start': result.get('start'),
+            'end': result.get('end'),
+            'htmlLink': result.get('htmlLink'),
+            'hangoutLink': result.get('hangoutLink', ''),
+            'status': 'created'
+        }
+
+    def insert_request(
+        self,
+        summary: str,
+        start: str,
+        end: str,
+        calendar_id: str = 'primary',
+        description: str = None,
+        location: str = None,
+        attendees: list = None,
+        timezone: str = 'Asia/Seoul',
+        all_day: bool = False,
+        send_notifications: bool = True,
+        conference: bool = False,
+        event_id: str = None
+    ):
+        """
+        Build (without sending) the events.insert request for create_event.
+
+        Args:
+            event_id: Client-chosen event ID (see event_id_for); a second
+                insert with the same ID fails with 409 instead of duplicating
+
+        Returns:
+            HttpRequest
+        """
         event = {
             'summary': summary,
+            'start': _event_time(start, timezone, all_day),
+            'end': _event_time(end, timezone, all_day),
         }
-
-        # Time format
-        if all_day or 'T' not in start:
-            event['start'] = {'date': start[:10]}
-            event['end'] = {'date': end[:10]}
-        else:
-            # Ensure timezone suffix
-            if not ('+' in start or 'Z' in start):
-                start = start + '+09:00'
-            if not ('+' in end or 'Z' in end):
-                end = end + '+09:00'
-            event['start'] = {'dateTime': start, 'timeZone': timezone}
-            event['end'] = {'dateTime': end, 'timeZone': timezone}
+        if event_id:
+            event['id'] = event_id
 
         if description:
             event['description'] = description
@@ -90,12 +185,11 @@ class GoogleCalendarWriter:
         if conference:
             event['conferenceData'] = {
                 'createRequest': {
-                    'requestId': f"meet-{start.replace(':', '').replace('-', '')}",
+                    'requestId': event_id or f"meet-{event['start'].get('dateTime', start).replace(':', '').replace('-', '')}",
                     'conferenceSolutionKey': {'type': 'hangoutsMeet'}
                 }
             }
 
-        # Create event
         params = {
             'calendarId': calendar_id,
             'body': event,
@@ -105,17 +199,7 @@ class GoogleCalendarWriter:
         if conference:
             params['conferenceDataVersion'] = 1
 
-        result = self.service.events().insert(**params).execute()
-
-        return {
-            'id': result['id'],
-            'summary': result.get('summary'),
-            'start': result.get('start'),
-            'end': result.get('end'),
-            'htmlLink': result.get('htmlLink'),
-            'hangoutLink': result.get('hangoutLink', ''),
-            'status': 'created'
-        }
+        return self.service.events().insert(**params)
 
     def update_event(
         self,
@@ -133,6 +217,9 @@ class GoogleCalendarWriter:
         """
         Update an existing event.
 
+        Only the given fields are sent (events.patch), so this is a single
+        round trip and fields changed by others in the meantime are kept.
+
         Args:
             event_id: Event ID to update
             calendar_id: Calendar ID
@@ -148,56 +235,66 @@ class GoogleCalendarWriter:
         Returns:
             Updated event dict
         """
-        # Get existing event
-        event = self.service.events().get(
-            calendarId=calendar_id,
-            eventId=event_id
+        result = self.patch_request(
+            event_id, calendar_id, summary, start, end, description, location,
+            attendees, timezone, send_notifications
         ).execute()
+        return self._updated(result)
+
+    def _updated(self, result: dict) -> dict:
+        return {
+            'id': result['id'],
+            'summary': result.get('summary'),
+            'start': result.get('start'),
+            'end': result.get('end'),
+            'htmlLink': result.get('htmlLink'),
+            'status': 'updated'
+        }
 
-        # Update fields if provided
+    def patch_request(
+        self,
+        event_id: str,
+        calendar_id: str = 'primary',
+        summary: str = None,
+        start: str = None,
+        end: str = None,
+        description: str = None,
+        location: str = None,
+        attendees: list = None,
+        timezone: str = 'Asia/Seoul',
+        send_notifications: bool = True
+    ):
+        """
+        Build (without sending) the events.patch request for update_event.
+
+        Returns:
+            HttpRequest
+        """
+        patch = {}
         if summary:
-            event['summary'] = summary
+            patch['summary'] = summary
 
+        # patch merges nested objects: clear the other time form explicitly
         if start:
-            if 'T' not in start:
-                event['start'] = {'date': start}
-            else:
-                if not ('+' in start or 'Z' in start):
-                    start = start + '+09:00'
-                event['start'] = {'dateTime': start, 'timeZone': timezone}
-
+            patch['start'] = {'date': None, 'dateTime': None, 'timeZone': None, **_event_time(start, timezone)}
         if end:
-            if 'T' not in end:
-                event['end'] = {'date': end}
-            else:
-                if not ('+' in end or 'Z' in end):
-                    end = end + '+09:00'
-                event['end'] = {'dateTime': end, 'timeZone': timezone}
+            patch['end'] = {'date': None, 'dateTime': None, 'timeZone': None, **_event_time(end, timezone)}
 
         if description is not None:
-            event['description'] = description
+            patch['description'] = description
 
         if location is not None:
-            event['location'] = location
+            patch['location'] = location
 
         if attendees is not None:
-            event['attendees'] = [{'email': email} for email in attendees]
+            patch['attendees'] = [{'email': email} for email in attendees]
 
-        result = self.service.events().update(
+        return self.service.events().patch(
             calendarId=calendar_id,
             eventId=event_id,
-            body=event,
+            body=patch,
             sendNotifications=send_notifications
-        ).execute()
-
-        return {
-            'id': result['id'],
-            'summary': result.get('summary'),
-            'start': result.get('start'),
-            'end': result.get('end'),
-            'htmlLink': result.get('htmlLink'),
-            'status': 'updated'
-        }
+        )
 
     def delete_event(
         self,
@@ -216,17 +313,26 @@ class GoogleCalendarWriter:
         Returns:
             Deletion status dict
         """
-        self.service.events().delete(
-            calendarId=calendar_id,
-            eventId=event_id,
-            sendNotifications=send_notifications
-        ).execute()
+        self.delete_request(event_id, calendar_id, send_notifications).execute()
 
         return {
             'id': event_id,
             'status': 'deleted'
         }
 
+    def delete_request(
+        self,
+        event_id: str,
+        calendar_id: str = 'primary',
+        send_notifications: bool = True
+    ):
+        """Build (without sending) the events.delete request for delete_event."""
+        return self.service.events().delete(
+            calendarId=calendar_id,
+            eventId=event_id,
+            sendNotifications=send_notifications
+        )
+
     def quick_add(
         self,
         text: str,
@@ -245,11 +351,7 @@ class GoogleCalendarWriter:
         Returns:
             Created event dict
         """
-        result = self.service.events().quickAdd(
-            calendarId=calendar_id,
-            text=text,
-            sendNotifications=send_notifications
-        ).execute()
+        result = self.quick_add_request(text, calendar_id, send_notifications).execute()
 
         return {
             'id': result['id'],
@@ -259,3 +361,144 @@ class GoogleCalendarWriter:
             'htmlLink': result.get('htmlLink'),
             'status': 'created'
         }
+
+    def quick_add_request(
+        self,
+        text: str,
+        calendar_id: str = 'primary',
+        send_notifications: bool = True
+    ):
+        """Build (without sending) the events.quickAdd request for quick_add."""
+        return self.service.events().quickAdd(
+            calendarId=calendar_id,
+            text=text,
+            sendNotifications=send_notifications
+        )
+
+    # ----- Bulk operations -----
+
+    def operation_request(self, op: dict, send_notifications: bool = True):
+        """
+        Build the request for one bulk operation.
+
+        Operation fields: op (create/update/delete/quick-add), calendar_id,
+        event_id or key, summary, start, end, description, location,
+        attendees (list or comma-separated), timezone, all_day, meet, text.
+
+        A create gets a deterministic ID from its key (event_id_for), so
+        running the same operation again cannot create a duplicate. update
+        and delete may name the event by event_id or by the key it was
+        created with.
+
+        Returns:
+            (event ID or None, HttpRequest)
+
+        Raises:
+            ValueError: Unknown operation or missing required fields
+        """
+        kind = op.get('op')
+        calendar_id = op.get('calendar_id') or 'primary'
+        timezone = op.get('timezone') or 'Asia/Seoul'
+        attendees = op.get('attendees')
+        if isinstance(attendees, str):
+            attendees = [a.strip() for a in attendees.split(',') if a.strip()] or None
+        event_id = op.get('event_id') or (event_id_for(calendar_id, op['key']) if op.get('key') else None)
+
+        if kind == 'create':
+            if not (op.get('summary') and op.get('start') and op.get('end')):
+                raise ValueError('create requires summary, start and end')
+            event_id = op.get('event_id') or event_id_for(calendar_id, operation_key(op))
+            return event_id, self.insert_request(
+                op['summary'], op['start'], op['end'], calendar_id, op.get('description'),
+                op.get('location'), attendees, timezone, bool(op.get('all_day')),
+                send_notifications, bool(op.get('meet')), event_id=event_id
+            )
+        if kind in ('update', 'delete') and not event_id:
+            raise ValueError(f'{kind} requires event_id or key')
+        if kind == 'update':
+            return event_id, self.patch_request(
+                event_id, calendar_id, op.get('summary'), op.get('start'), op.get('end'),
+                op.get('description'), op.get('location'), attendees, timezone, send_notifications
+            )
+        if kind == 'delete':
+            return event_id, self.delete_request(event_id, calendar_id, send_notifications)
+        if kind == 'quick-add':
+            if not op.get('text'):
+                raise ValueError('quick-add requires text')
+            return None, self.quick_add_request(op['text'], calendar_id, send_notifications)
+        raise ValueError(f"unknown op {kind!r} (expected one of {', '.join(BULK_OPERATIONS)})")
+
+    def _operation_result(self, op: dict, event_id, result) -> dict:
+        kind = op.get('op')
+        if result.ok:
+            if kind == 'delete':
+                return {'id': event_id, 'status': 'deleted'}
+            response = self._updated(result.response) if kind == 'update' else self._created(result.response)
+            return {key: value for key, value in response.items() if value not in (None, '')}
+
+        status = _status_of(result.error)
+        # Re-running an operation that already went through
+        if kind == 'create' and status == 409:
+            return {'id': event_id, 'status': 'exists'}
+        if kind == 'delete' and status == 410:
+            return {'id': event_id, 'status': 'deleted'}
+        # quick-add has no event ID to dedupe on: it may have created the event
+        if kind == 'quick-add' and _is_ambiguous(result.error):
+            return {'id': event_id, 'status': 'unknown', 'error': str(result.error)}
+        return {'id': event_id, 'status': 'failed', 'error': str(result.error)}
+
+    def iter_operations(self, ops, send_notifications: bool = True, **kwargs):
+        """
+        Run bulk operations in HTTP batch calls.
+
+        Operations run concurrently within a group. A new group starts
+        whenever an operation targets an event already touched by the current
+        group, so a create and a later update/delete of the same event keep
+        their order.
+
+        quick-add cannot be given an event ID, so it is never retried: a
+        failure after which the event may exist (5xx, dropped connection) is
+        reported as 'unknown' instead.
+
+        Args:
+            ops: Iterable of operation dicts (see operation_request)
+            send_notifications: Send notifications to attendees
+            **kwargs: batch_size, max_workers, max_retries (see google_api.batch)
+
+        Yields:
+            (op, result) in input order; result has 'status' (created, exists,
+            updated, deleted, failed, unknown), 'id' and 'error' on failure
+        """
+        group, touched = [], set()
+
+        def run(group):
+            def requests(quick_add):
+                return (
+                    (i, request) for i, (op, _, request, _) in enumerate(group)
+                    if request is not None and (op.get('op') == 'quick-add') == quick_add
+                )
+
+            results = iter_batch(self.service, requests(False), **kwargs)
+            quick_add_results = iter_batch(self.service, requests(True), **{**kwargs, 'max_retries': 0})
+            for op, event_id, request, failure in group:
+                if request is None:
+                    yield op, failure
+                    continue
+                result = next(quick_add_results if op.get('op') == 'quick-add' else results)
+                yield op, self._operation_result(op, event_id, result)
+
+        for op in ops:
+            try:
+                event_id, request = self.operation_request(op, send_notifications)
+            except (ValueError, KeyError) as e:
+                group.append((op, None, None, {'id': op.get('event_id'), 'status': 'failed', 'error': str(e)}))
+                continue
+            if event_id and event_id in touched:
+                yield from run(group)
+                group, touched = [], set()
+            group.append((op, event_id, request, None))
+            if event_id:
+                touched.add(event_id)
+
+        if group:
+            yield from run(group)
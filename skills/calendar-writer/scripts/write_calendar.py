@@ -3,17 +3,160 @@
 Google Calendar Writer
 
 캘린더 이벤트 생성, 수정, 삭제 스크립트.
+
+--action bulk: JSONL/CSV 파일의 작업들을 HTTP 배치 호출로 한꺼번에 실행하고,
+결과를 JSONL 로그에 한 줄씩 기록합니다. 다시 실행하면 성공한 작업은 건너뜁니다.
+quick-add 는 이벤트 ID를 정할 수 없어 재시도하지 않고, 생성됐을 수도 있는 실패는
+'unknown' 으로 기록해 다시 실행해도 건너뜁니다 (--retry-unknown 으로 다시 실행).
 """
 
 import argparse
+import csv
+import hashlib
 import json
 import os
 import sys
+from datetime import datetime
+from pathlib import Path
+
+# 스킬 데몬이 떠 있으면 데몬에서 실행 (무거운 import 전에 확인)
+if __name__ == '__main__':
+    from daemon_client import forward_to_daemon
+    forward_to_daemon(__file__)
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from google_api.calendar import GoogleCalendarWriter
+from google_api.calendar import BULK_OPERATIONS, GoogleCalendarWriter
+
+# 로그에서 성공으로 보는 상태 (다시 실행할 때 건너뜀)
+DONE_STATUSES = ('created', 'exists', 'updated', 'deleted')
+BOOLEAN_FIELDS = ('all_day', 'meet')
+
+
+def load_operations(path: str) -> list:
+    """
+    JSONL 또는 CSV(헤더 필수) 작업 파일 읽기.
+
+    각 작업은 op(또는 action) 열과 write_calendar 인자 이름의 열
+    (summary, start, end, event_id, key, ...) 을 씁니다. CSV 의 빈 칸은 없는 값,
+    all_day/meet 는 true/1/yes 면 참입니다.
+    """
+    path = Path(path).expanduser()
+    with open(path, encoding='utf-8-sig') as f:
+        if path.suffix.lower() in ('.jsonl', '.ndjson'):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    ops = []
+    for row in rows:
+        op = {key.strip().replace('-', '_'): value for key, value in row.items()
+              if key and value not in (None, '')}
+        if 'action' in op and 'op' not in op:
+            op['op'] = op.pop('action')
+        for field in BOOLEAN_FIELDS:
+            if isinstance(op.get(field), str):
+                op[field] = op[field].strip().lower() in ('1', 'true', 'yes', 'y')
+        ops.append(op)
+    return ops
+
+
+def operation_digest(op: dict) -> str:
+    """작업 내용의 해시 (로그에서 같은 작업을 찾는 기준)"""
+    return hashlib.sha256(json.dumps(op, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:16]
+
+
+def load_log(path: Path, retry_unknown: bool = False) -> set:
+    """
+    결과 로그에서 건너뛸 작업의 digest 집합 읽기 (마지막 줄이 잘려 있어도 무시).
+
+    성공한 작업과, retry_unknown 이 아니면 결과를 알 수 없는('unknown') 작업도 포함합니다.
+    """
+    statuses = DONE_STATUSES if retry_unknown else (*DONE_STATUSES, 'unknown')
+    done = set()
+    if not path.exists():
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('status') in statuses:
+                done.add(entry['digest'])
+    return done
+
+
+def run_bulk(writer, args) -> bool:
+    """
+    작업 파일을 배치로 실행. 진행 상황은 stderr, 요약 JSON 은 stdout.
+
+    Returns:
+        실패한 작업이 없으면 True
+    """
+    try:
+        ops = load_operations(args.file)
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot read {args.file}: {e}", file=sys.stderr)
+        return False
+
+    log_path = Path(args.log or f"{args.file}.resultlog.jsonl").expanduser()
+    done = load_log(log_path, args.retry_unknown)
+    pending = []
+    for line, op in enumerate(ops, 1):
+        op.setdefault('calendar_id', args.calendar_id)
+        op.setdefault('timezone', args.timezone)
+        digest = operation_digest(op)
+        if digest not in done:
+            pending.append((line, digest, op))
+
+    print(f"Operations: {len(ops)} ({len(ops) - len(pending)} already done, {len(pending)} to run)",
+          file=sys.stderr)
+    print(f"Log: {log_path}", file=sys.stderr)
+
+    if args.dry_run:
+        for line, _, op in pending:
+            try:
+                event_id, _ = writer.operation_request(op, not args.no_notify)
+            except (ValueError, KeyError) as e:
+                print(f"  {line}: invalid - {e}", file=sys.stderr)
+                continue
+            print(f"  {line}: {op.get('op')} {event_id or ''} {op.get('summary') or op.get('text') or ''}",
+                  file=sys.stderr)
+        print(json.dumps({'total': len(ops), 'done': len(ops) - len(pending), 'pending': len(pending),
+                          'dry_run': True}, ensure_ascii=False, indent=2))
+        return True
+
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    if log_path.exists() and log_path.stat().st_size:
+        with open(log_path, 'rb+') as f:
+            # 기록 중 중단돼 잘린 마지막 줄 뒤에 이어 쓰지 않도록 줄바꿈 보정
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+    counts = {}
+    with open(log_path, 'a', encoding='utf-8') as log:
+        results = writer.iter_operations((op for _, _, op in pending), not args.no_notify)
+        for (line, digest, op), (_, result) in zip(pending, results):
+            entry = {'line': line, 'digest': digest, 'op': op.get('op'), 'key': op.get('key'), **result,
+                     'at': datetime.now().isoformat(timespec='seconds')}
+            log.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            log.flush()
+            os.fsync(log.fileno())
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+            if result['status'] in ('failed', 'unknown'):
+                print(f"  {line}: {op.get('op')} {result['status']} - {result['error']}", file=sys.stderr)
+            else:
+                print(f"  {line}: {op.get('op')} {result['status']} {result.get('id') or ''}", file=sys.stderr)
+
+    print(json.dumps({'total': len(ops), 'skipped': len(ops) - len(pending), **counts, 'log': str(log_path)},
+                     ensure_ascii=False, indent=2))
+    if counts.get('unknown'):
+        print(f"Result unknown for {counts['unknown']} quick-add operation(s): check the calendar, "
+              f"then re-run with --retry-unknown if they are missing.", file=sys.stderr)
+    return not (counts.get('failed') or counts.get('unknown'))
 
 
 def main():
@@ -23,7 +166,7 @@ def main():
                         help='Calendar ID (default: primary)')
 
     # Action
-    parser.add_argument('--action', choices=['create', 'update', 'delete', 'quick-add'],
+    parser.add_argument('--action', choices=[*BULK_OPERATIONS, 'bulk'],
                         required=True, help='Action to perform')
 
     # Event details
@@ -41,7 +184,16 @@ def main():
                         help='Do not send notifications')
     parser.add_argument('--text', help='Natural language text for quick-add')
 
+    # Bulk
+    parser.add_argument('--file', help='Operations file for bulk (JSONL or CSV)')
+    parser.add_argument('--log', help='Result log for bulk (default: <file>.resultlog.jsonl)')
+    parser.add_argument('--dry-run', action='store_true', help='Bulk: validate and list operations only')
+    parser.add_argument('--retry-unknown', action='store_true',
+                        help='Bulk: also re-run quick-add operations logged as unknown (check the calendar first)')
+
     args = parser.parse_args()
+    if args.action == 'bulk' and not args.file:
+        parser.error('--file required for bulk')
 
     # Token path
     token_path = args.token or os.environ.get('GOOGLE_CALENDAR_TOKEN')
@@ -63,7 +215,11 @@ def main():
         writer = GoogleCalendarWriter(token_path)
         send_notifications = not args.no_notify
 
-        if args.action == 'create':
+        if args.action == 'bulk':
+            if not run_bulk(writer, args):
+                sys.exit(1)
+
+        elif args.action == 'create':
             if not args.summary or not args.start or not args.end:
                 print("Error: --summary, --start, --end required for create", file=sys.stderr)
                 sys.exit(1)
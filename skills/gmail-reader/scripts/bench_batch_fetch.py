@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Gmail 메시지 조회 벤치마크 (로컬 가짜 Gmail 엔드포인트)
+
+순차 messages().get 호출과 gmail_batch.batch_get_messages 를 비교합니다.
+실제 계정 없이 127.0.0.1 에 띄운 가짜 서버로 왕복 횟수와 소요 시간을 측정합니다.
+
+사용법:
+    python bench_batch_fetch.py --messages 100 --latency 50
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httplib2
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+sys.path.insert(0, str(Path(__file__).parent))
+from gmail_batch import batch_get_messages, list_message_ids
+
+
+def fake_message(msg_id: str) -> dict:
+    return {
+        'id': msg_id,
+        'threadId': msg_id,
+        'labelIds': ['INBOX'],
+        'snippet': f'snippet {msg_id}',
+        'internalDate': '1767225600000',
+        'payload': {'headers': [
+            {'name': 'From', 'value': 'sender@example.com'},
+            {'name': 'To', 'value': 'me@example.com'},
+            {'name': 'Subject', 'value': f'메일 {msg_id}'},
+            {'name': 'Date', 'value': 'Thu, 1 Jan 2026 09:00:00 +0900'},
+        ]},
+    }
+
+
+class FakeGmailHandler(BaseHTTPRequestHandler):
+    """messages.list / messages.get / batch 만 흉내내는 핸들러"""
+
+    protocol_version = 'HTTP/1.1'
+    wbufsize = 1 << 16  # 헤더와 본문을 한 번에 전송 (Nagle 지연 방지)
+    message_count = 100
+    latency = 0.05
+    round_trips = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _count(self):
+        with FakeGmailHandler.lock:
+            FakeGmailHandler.round_trips += 1
+        time.sleep(self.latency)
+
+    def _send(self, status: int, body: bytes, content_type: str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, path: str):
+        path = path.split('?', 1)[0]
+        if path.endswith('/users/me/messages'):
+            ids = [{'id': f'm{i:05d}', 'threadId': f'm{i:05d}'} for i in range(self.message_count)]
+            return 200, {'messages': ids, 'resultSizeEstimate': len(ids)}
+        match = re.search(r'/users/me/messages/([^/]+)$', path)
+        if match:
+            return 200, fake_message(match.group(1))
+        return 404, {'error': {'code': 404, 'message': 'not found'}}
+
+    def do_GET(self):
+        self._count()
+        status, payload = self._route(self.path)
+        self._send(status, json.dumps(payload).encode())
+
+    def do_POST(self):
+        self._count()
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+        message = BytesParser(policy=HTTP).parsebytes(header + body)
+
+        boundary = 'batch_boundary'
+        out = []
+        for part in message.iter_parts():
+            request_line = part.get_payload(decode=True).decode().split('\n', 1)[0]
+            status, payload = self._route(request_line.split(' ')[1])
+            content_id = part['Content-ID'].strip('<>')
+            data = json.dumps(payload)
+            out.append(
+                f'--{boundary}\r\n'
+                'Content-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id}>\r\n\r\n'
+                f'HTTP/1.1 {status} OK\r\n'
+                'Content-Type: application/json\r\n'
+                f'Content-Length: {len(data.encode())}\r\n\r\n'
+                f'{data}\r\n'
+            )
+        out.append(f'--{boundary}--\r\n')
+        self._send(200, ''.join(out).encode(), f'multipart/mixed; boundary={boundary}')
+
+
+def build_fake_service(port: int):
+    doc = json.loads(get_static_doc('gmail', 'v1'))
+    doc['rootUrl'] = f'http://127.0.0.1:{port}/'
+    return build_from_document(doc, http=httplib2.Http())
+
+
+def run_serial(service, message_ids):
+    return [
+        service.users().messages().get(
+            userId='me', id=msg_id, format='metadata',
+            metadataHeaders=['From', 'To', 'Subject', 'Date'],
+        ).execute()
+        for msg_id in message_ids
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gmail batch 조회 벤치마크')
+    parser.add_argument('--messages', type=int, default=100, help='검색 결과 메일 수 (기본: 100)')
+    parser.add_argument('--latency', type=float, default=50, help='왕복당 지연 (ms, 기본: 50)')
+    parser.add_argument('--workers', type=int, default=4, help='동시 batch 수 (기본: 4)')
+    args = parser.parse_args()
+
+    FakeGmailHandler.message_count = args.messages
+    FakeGmailHandler.latency = args.latency / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGmailHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service = build_fake_service(server.server_address[1])
+
+    print(f"메일 {args.messages}개, 왕복 지연 {args.latency:.0f}ms\n")
+    print(f"{'방식':<10} {'왕복':>6} {'시간(s)':>10}")
+    print('-' * 30)
+
+    for name, fetch in [
+        ('serial', lambda ids: run_serial(service, ids)),
+        ('batch', lambda ids: batch_get_messages(service, ids, max_workers=args.workers)),
+    ]:
+        FakeGmailHandler.round_trips = 0
+        started = time.perf_counter()
+        ids = list_message_ids(service, query='in:inbox', max_results=args.messages)
+        messages = fetch(ids)
+        elapsed = time.perf_counter() - started
+        assert len(messages) == args.messages
+        print(f"{name:<10} {FakeGmailHandler.round_trips:>6} {elapsed:>10.3f}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Gmail partial response(fields 마스크) 벤치마크
+
+fixtures/ 의 기록된 Gmail API 응답에 gmail_batch 의 fields 마스크를 서버와 같은 방식으로
+적용해, 전체 응답 대비 전송 바이트(원본/gzip)와 JSON 디코드 시간을 비교합니다.
+마스크를 적용한 응답으로 parse_email 결과가 달라지지 않는지도 함께 확인합니다.
+
+사용법:
+    python bench_field_masks.py --repeat 2000
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from gmail_batch import message_fields, thread_fields
+from search_emails import parse_email
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+FIELD_PATH_RE = re.compile(r'\w+(?:/\w+)*')
+
+
+def parse_fields(spec: str, pos: int = 0) -> tuple:
+    """fields 문법 ('a,b/c,d(e,f)') 을 {이름: 하위 트리 또는 True} 트리로 파싱"""
+    tree = {}
+    while pos < len(spec) and spec[pos] != ')':
+        match = FIELD_PATH_RE.match(spec, pos)
+        if not match:
+            raise ValueError(f"fields 구문 오류: {spec[pos:]!r}")
+        *parents, name = match.group().split('/')
+        pos = match.end()
+
+        node = tree
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        if pos < len(spec) and spec[pos] == '(':
+            node[name], pos = parse_fields(spec, pos + 1)
+            pos += 1
+        else:
+            node[name] = True
+        if pos < len(spec) and spec[pos] == ',':
+            pos += 1
+    return tree, pos
+
+
+def apply_fields(resource, tree):
+    """파싱한 fields 트리로 리소스를 잘라냄 (리스트는 원소마다 적용)"""
+    if tree is True:
+        return resource
+    if isinstance(resource, list):
+        return [apply_fields(item, tree) for item in resource]
+    if isinstance(resource, dict):
+        return {key: apply_fields(resource[key], sub) for key, sub in tree.items() if key in resource}
+    return resource
+
+
+def measure(resource: dict, fields: str, repeat: int) -> dict:
+    masked = apply_fields(resource, parse_fields(fields)[0])
+    result = {'full': resource, 'masked': masked}
+    stats = {}
+    for name, data in result.items():
+        # Gmail API는 들여쓰기 된 JSON을 돌려줌
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            json.loads(payload)
+        stats[name] = {
+            'bytes': len(payload),
+            'gzip': len(gzip.compress(payload)),
+            'decode_us': (time.perf_counter() - started) / repeat * 1e6,
+        }
+    return {'stats': stats, 'masked': masked}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gmail fields 마스크 벤치마크')
+    parser.add_argument('--repeat', type=int, default=2000, help='JSON 디코드 반복 횟수 (기본: 2000)')
+    args = parser.parse_args()
+
+    cases = [
+        ('message metadata', 'gmail_message_metadata.json', message_fields('metadata'), False),
+        ('message full', 'gmail_message_full.json', message_fields('full'), True),
+        ('thread full', 'gmail_thread_full.json', thread_fields('full'), True),
+    ]
+
+    print(f"{'응답':<18} {'전체(B)':>9} {'마스크(B)':>10} {'gzip 전체':>10} {'gzip 마스크':>11} "
+          f"{'디코드(us)':>16}")
+    print('-' * 80)
+    for name, fixture, fields, include_body in cases:
+        resource = json.loads((FIXTURES / fixture).read_text())
+        result = measure(resource, fields, args.repeat)
+        full, masked = result['stats']['full'], result['stats']['masked']
+
+        messages = resource.get('messages', [resource])
+        masked_messages = result['masked'].get('messages', [result['masked']])
+        for original, trimmed in zip(messages, masked_messages):
+            assert parse_email(original, include_body) == parse_email(trimmed, include_body), name
+
+        print(f"{name:<18} {full['bytes']:>9} {masked['bytes']:>10} {full['gzip']:>10} {masked['gzip']:>11} "
+              f"{full['decode_us']:>7.1f} → {masked['decode_us']:>6.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Gmail 첨부파일 다운로드 스크립트
+- 검색 쿼리에 걸린 메일의 첨부파일을 동시에 내려받아 내용 주소 저장소에 보관
+- 같은 내용은 한 번만 저장, 이미 받은 첨부파일은 건너뜀
+- --out 을 주면 원래 파일명으로 해당 폴더에 링크
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from gmail_client import get_gmail_service
+from gmail_batch import DEFAULT_MAX_WORKERS, iter_message_ids, iter_messages
+from gmail_attachments import (
+    ATTACHMENT_FIELDS, ATTACHMENT_STORE, AttachmentStore, download_attachments, iter_attachment_parts,
+)
+
+STATUS_TEXT = {
+    'downloaded': '다운로드',
+    'duplicate': '중복 내용',
+    'reused': '재사용',
+    'skipped': '이미 있음',
+    'failed': '실패',
+}
+
+
+def _safe_filename(attachment: dict) -> str:
+    name = Path(attachment['filename'].replace('\\', '/')).name.strip()
+    return name or f"{attachment['message_id']}-{attachment['part_id']}.bin"
+
+
+def link_to(out_dir: Path, source: Path, attachment: dict) -> Path:
+    """
+    저장소 파일을 원래 파일명으로 out_dir 에 연결 (하드링크, 안 되면 복사).
+    같은 이름의 다른 파일이 있으면 '이름 (2).pdf' 식으로 번호를 붙입니다.
+    """
+    name = Path(_safe_filename(attachment))
+    target = out_dir / name
+    n = 1
+    while target.exists():
+        if target.samefile(source):
+            return target
+        n += 1
+        target = out_dir / f"{name.stem} ({n}){name.suffix}"
+
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gmail 첨부파일 다운로드')
+    parser.add_argument('--query', '-q', required=True,
+                        help='Gmail 검색 쿼리 (예: "has:attachment from:vendor newer_than:30d")')
+    parser.add_argument('--max', '-n', type=int, default=0, help='최대 메일 수 (기본: 0 = 검색 결과 전체)')
+    parser.add_argument('--workers', '-w', type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f'동시 다운로드 수 (기본: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--store', type=str, default=str(ATTACHMENT_STORE),
+                        help=f'저장소 경로 (기본: {ATTACHMENT_STORE})')
+    parser.add_argument('--out', '-o', type=str, help='원래 파일명으로 링크할 폴더')
+    parser.add_argument('--reuse-by-name', action='store_true',
+                        help='파일명/크기/MIME 이 같으면 내용 확인 없이 같은 파일로 보고 다운로드 생략')
+    parser.add_argument('--dry-run', action='store_true', help='다운로드 없이 첨부파일 목록만 출력')
+    parser.add_argument('--jsonl', action='store_true', help='JSONL 스트리밍 출력 (한 줄에 첨부파일 하나)')
+
+    args = parser.parse_args()
+
+    query = args.query if 'has:attachment' in args.query else f'{args.query} has:attachment'
+    out_dir = Path(args.out).expanduser() if args.out else None
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    store = None
+    try:
+        service = get_gmail_service()
+        message_ids = iter_message_ids(service, query=query, limit=args.max or None)
+
+        if args.dry_run:
+            count = 0
+            for message in iter_messages(service, message_ids, format='full', fields=ATTACHMENT_FIELDS):
+                for attachment in iter_attachment_parts(message):
+                    count += 1
+                    if args.jsonl:
+                        print(json.dumps(attachment, ensure_ascii=False), flush=True)
+                    else:
+                        print(f"  {attachment['filename'][:60]:<60} {attachment['size']:>12,}B")
+            print(f"\n첨부파일 {count}개", file=sys.stderr)
+            return
+
+        store = AttachmentStore(args.store)
+        counts = dict.fromkeys(STATUS_TEXT, 0)
+        results = download_attachments(
+            service, message_ids, store, max_workers=args.workers, dedupe_by_name=args.reuse_by_name,
+        )
+        for result in results:
+            counts[result['status']] += 1
+            if result['sha256']:
+                result['path'] = str(store.object_path(result['sha256']))
+                if out_dir:
+                    result['path'] = str(link_to(out_dir, Path(result['path']), result))
+
+            if args.jsonl:
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+            elif result['error']:
+                print(f"  [{STATUS_TEXT['failed']}] {result['filename']}: {result['error']}", file=sys.stderr)
+            else:
+                print(f"  [{STATUS_TEXT[result['status']]}] {result['filename']} → {result['path']}")
+
+        summary = ', '.join(f"{STATUS_TEXT[status]} {count}개" for status, count in counts.items() if count)
+        print(f"\n완료: {summary or '첨부파일 없음'}", file=sys.stderr)
+        if counts['failed']:
+            sys.exit(1)
+
+    except FileNotFoundError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"다운로드 실패: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if store:
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
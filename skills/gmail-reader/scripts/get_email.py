@@ -10,51 +10,102 @@ import json
 import sys
 from pathlib import Path
 
+# 스킬 데몬이 떠 있으면 데몬에서 실행 (무거운 import 전에 확인)
+if __name__ == '__main__':
+    from daemon_client import forward_to_daemon
+    forward_to_daemon(__file__)
+
 sys.path.insert(0, str(Path(__file__).parent))
 from gmail_client import get_gmail_service
-from search_emails import parse_email, extract_body
+from gmail_batch import batch_get_messages, list_message_ids, message_fields, thread_fields
+from search_emails import parse_email, extract_body, iter_mirror_search
+
+
+def _open_mirror(max_age: float = None):
+    """최신 상태가 보장된 로컬 미러 열기 (max_age 분보다 오래됐으면 증분 동기화)"""
+    from gmail_mirror import GmailMirror
+
+    mirror = GmailMirror()
+    try:
+        mirror.ensure_fresh(max_age, get_gmail_service)
+    except Exception:
+        mirror.close()
+        raise
+    return mirror
 
 
-def get_email_by_id(email_id: str, include_body: bool = True) -> dict:
+def get_email_by_id(email_id: str, include_body: bool = True, use_mirror: bool = False,
+                    max_age: float = None, raw: bool = False) -> dict:
     """
     이메일 ID로 상세 정보 조회
 
     Args:
         email_id: Gmail 메시지 ID
         include_body: 본문 포함 여부
+        use_mirror: 로컬 미러에서 먼저 조회 (없으면 Gmail API)
+        max_age: 미러가 N분보다 오래됐으면 먼저 증분 동기화
+        raw: True면 필드 마스크 없이 받은 Gmail API 리소스를 그대로 반환
 
     Returns:
         이메일 상세 정보
     """
+    if use_mirror and not raw:
+        mirror = _open_mirror(max_age)
+        try:
+            email = mirror.get(email_id, include_body)
+        finally:
+            mirror.close()
+        if email:
+            return email
+
     service = get_gmail_service()
 
     msg_detail = service.users().messages().get(
         userId='me',
         id=email_id,
-        format='full'
+        format='full',
+        fields=None if raw else message_fields('full' if include_body else 'metadata'),
     ).execute()
 
+    if raw:
+        return msg_detail
     return parse_email(msg_detail, include_body)
 
 
-def get_thread(thread_id: str) -> list:
+def get_thread(thread_id: str, use_mirror: bool = False, max_age: float = None, raw: bool = False):
     """
     스레드 전체 이메일 조회
 
     Args:
         thread_id: Gmail 스레드 ID
+        use_mirror: 로컬 미러에서 먼저 조회 (없으면 Gmail API)
+        max_age: 미러가 N분보다 오래됐으면 먼저 증분 동기화
+        raw: True면 필드 마스크 없이 받은 스레드 리소스를 그대로 반환
 
     Returns:
-        스레드 내 모든 이메일 목록
+        스레드 내 모든 이메일 목록 (raw면 스레드 리소스 dict)
     """
+    if use_mirror and not raw:
+        mirror = _open_mirror(max_age)
+        try:
+            emails = mirror.get_thread(thread_id)
+        finally:
+            mirror.close()
+        if emails:
+            return emails
+
     service = get_gmail_service()
 
     thread = service.users().threads().get(
         userId='me',
         id=thread_id,
-        format='full'
+        format='full',
+        fields=None if raw else thread_fields('full'),
     ).execute()
 
+    if raw:
+        return thread
+
     emails = []
     for msg in thread.get('messages', []):
         email_data = parse_email(msg, include_body=True)
@@ -75,28 +126,13 @@ def get_unread_emails(max_results: int = 20) -> list:
     """
     service = get_gmail_service()
 
-    results = service.users().messages().list(
-        userId='me',
-        q='is:unread',
-        maxResults=max_results
-    ).execute()
+    message_ids = list_message_ids(service, query='is:unread', max_results=max_results)
 
-    messages = results.get('messages', [])
-
-    if not messages:
+    if not message_ids:
         return []
 
-    emails = []
-    for msg in messages:
-        msg_detail = service.users().messages().get(
-            userId='me',
-            id=msg['id'],
-            format='metadata',
-            metadataHeaders=['From', 'To', 'Subject', 'Date']
-        ).execute()
-
-        email_data = parse_email(msg_detail, include_body=False)
-        emails.append(email_data)
+    messages = batch_get_messages(service, message_ids, format='metadata')
+    emails = [parse_email(msg_detail, include_body=False) for msg_detail in messages]
 
     return emails
 
@@ -113,28 +149,13 @@ def get_recent_emails(max_results: int = 10) -> list:
     """
     service = get_gmail_service()
 
-    results = service.users().messages().list(
-        userId='me',
-        labelIds=['INBOX'],
-        maxResults=max_results
-    ).execute()
-
-    messages = results.get('messages', [])
+    message_ids = list_message_ids(service, label_ids=['INBOX'], max_results=max_results)
 
-    if not messages:
+    if not message_ids:
         return []
 
-    emails = []
-    for msg in messages:
-        msg_detail = service.users().messages().get(
-            userId='me',
-            id=msg['id'],
-            format='metadata',
-            metadataHeaders=['From', 'To', 'Subject', 'Date']
-        ).execute()
-
-        email_data = parse_email(msg_detail, include_body=False)
-        emails.append(email_data)
+    messages = batch_get_messages(service, message_ids, format='metadata')
+    emails = [parse_email(msg_detail, include_body=False) for msg_detail in messages]
 
     return emails
 
@@ -147,16 +168,31 @@ def main():
     parser.add_argument('--recent', '-r', action='store_true', help='최근 메일 조회')
     parser.add_argument('--max', '-n', type=int, default=10, help='최대 결과 수 (기본: 10)')
     parser.add_argument('--json', '-j', action='store_true', help='JSON 형식 출력')
+    parser.add_argument('--mirror', action='store_true', help='로컬 미러에서 조회 (sync_mailbox.py 필요)')
+    parser.add_argument('--max-age', type=float,
+                        help='미러가 N분보다 오래됐으면 먼저 증분 동기화 (--mirror 포함)')
+    parser.add_argument('--raw', action='store_true',
+                        help='필드 마스크 없이 Gmail API 원본 리소스를 JSON으로 출력 (--id/--thread)')
 
     args = parser.parse_args()
 
     try:
         result = None
+        use_mirror = args.mirror or args.max_age is not None
+
+        if args.raw and (args.id or args.thread):
+            result = (get_email_by_id(args.id, raw=True) if args.id
+                      else get_thread(args.thread, raw=True))
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+            return
 
         if args.id:
-            result = get_email_by_id(args.id)
+            result = get_email_by_id(args.id, use_mirror=use_mirror, max_age=args.max_age)
         elif args.thread:
-            result = get_thread(args.thread)
+            result = get_thread(args.thread, use_mirror=use_mirror, max_age=args.max_age)
+        elif use_mirror:
+            query = 'is:unread' if args.unread else 'in:inbox'
+            result = list(iter_mirror_search(query, args.max, max_age=args.max_age))
         elif args.unread:
             result = get_unread_emails(args.max)
         elif args.recent:
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Gmail 첨부파일 다운로드 (내용 주소 저장소)
+
+- 첨부파일은 SHA-256 으로 주소를 매긴 objects/<앞 2자리>/<해시> 에 한 번만 저장
+- 이미 받은 첨부파일은 (메시지 ID, 파트 ID) 색인으로 건너뜀
+  (attachmentId 는 조회할 때마다 바뀌어 색인 키로 쓸 수 없음)
+- 같은 내용은 받은 뒤 해시로 판단해 한 번만 저장. 파일명/크기/MIME 이 같으면 같은 파일로 보고
+  다운로드도 생략하는 옵션(dedupe_by_name)은 명시적으로 켤 때만 사용
+  (image001.png, scan.pdf 처럼 이름·크기가 같은 다른 파일이 섞일 수 있음)
+- 다운로드는 제한된 스레드 풀에서 실행하고, 응답을 조금씩 디코드해 임시 파일에 바로 기록
+  (큰 첨부파일도 메모리에 통째로 올리지 않음)
+"""
+
+import base64
+import hashlib
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+
+import requests
+from google.auth.transport.requests import AuthorizedSession
+
+from gmail_batch import DEFAULT_MAX_WORKERS, iter_messages
+from google_batch import MAX_RETRIES
+
+ATTACHMENT_STORE = Path(os.getenv(
+    'GMAIL_ATTACHMENT_STORE', str(Path.home() / '.cache/gmail-reader/attachments')
+))
+
+CHUNK_SIZE = 1 << 16
+DOWNLOAD_TIMEOUT = 60
+
+# 첨부파일 목록에 필요한 필드만 요청 (본문 데이터는 받지 않음)
+_PART_FIELDS = 'partId,filename,mimeType,body(attachmentId,size)'
+ATTACHMENT_FIELDS = (
+    f'id,internalDate,payload({_PART_FIELDS},'
+    f'parts({_PART_FIELDS},parts({_PART_FIELDS},parts({_PART_FIELDS},parts))))'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attachments (
+    message_id TEXT NOT NULL,
+    part_id TEXT NOT NULL,
+    filename TEXT,
+    mime_type TEXT,
+    size INTEGER,
+    sha256 TEXT NOT NULL,
+    internal_date INTEGER,
+    stored_at REAL,
+    PRIMARY KEY (message_id, part_id)
+);
+CREATE INDEX IF NOT EXISTS idx_attachments_sha256 ON attachments(sha256);
+CREATE INDEX IF NOT EXISTS idx_attachments_name ON attachments(filename, size, mime_type);
+"""
+
+_local = threading.local()
+
+
+class AttachmentStore:
+    """SHA-256 내용 주소 첨부파일 저장소 + (메시지, 파트) 색인"""
+
+    def __init__(self, path=ATTACHMENT_STORE):
+        self.path = Path(path).expanduser()
+        (self.path / 'objects').mkdir(parents=True, exist_ok=True)
+        (self.path / 'tmp').mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(self.path / 'index.sqlite3')
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def object_path(self, sha256: str) -> Path:
+        return self.path / 'objects' / sha256[:2] / sha256
+
+    def lookup(self, message_id: str, part_id: str):
+        """이미 색인된 첨부파일이면 해시 반환"""
+        row = self.conn.execute(
+            'SELECT sha256 FROM attachments WHERE message_id = ? AND part_id = ?',
+            (message_id, part_id),
+        ).fetchone()
+        if row and self.object_path(row['sha256']).exists():
+            return row['sha256']
+        return None
+
+    def find_same(self, filename: str, size: int, mime_type: str):
+        """파일명/크기/MIME 이 같은 첨부파일이 이미 저장돼 있으면 해시 반환"""
+        rows = self.conn.execute(
+            'SELECT DISTINCT sha256 FROM attachments WHERE filename = ? AND size = ? AND mime_type = ?',
+            (filename, size, mime_type),
+        )
+        for row in rows:
+            if self.object_path(row['sha256']).exists():
+                return row['sha256']
+        return None
+
+    def record(self, attachment: dict, sha256: str):
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO attachments
+                (message_id, part_id, filename, mime_type, size, sha256, internal_date, stored_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                attachment['message_id'], attachment['part_id'], attachment['filename'],
+                attachment['mime_type'], attachment['size'], sha256,
+                attachment['internal_date'], time.time(),
+            ),
+        )
+        self.conn.commit()
+
+    def write(self, chunks) -> tuple:
+        """
+        바이트 청크를 임시 파일에 기록하며 해시를 계산한 뒤 objects/ 로 옮김 (스레드 안전).
+
+        Returns:
+            (sha256, 크기, 새로 저장됐는지)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.path / 'tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+
+            sha256 = digest.hexdigest()
+            target = self.object_path(sha256)
+            if target.exists():
+                return sha256, size, False
+            target.parent.mkdir(exist_ok=True)
+            os.replace(tmp_path, target)
+            return sha256, size, True
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+
+def iter_attachment_parts(message: dict):
+    """메시지 파트 트리에서 attachmentId 가 있는 첨부파일 파트를 yield"""
+    stack = [message.get('payload', {})]
+    while stack:
+        part = stack.pop()
+        body = part.get('body', {})
+        if part.get('filename') and body.get('attachmentId'):
+            yield {
+                'message_id': message['id'],
+                'part_id': part.get('partId', ''),
+                'filename': part['filename'],
+                'mime_type': part.get('mimeType', ''),
+                'size': body.get('size', 0),
+                'attachment_id': body['attachmentId'],
+                'internal_date': int(message.get('internalDate', 0)),
+            }
+        stack.extend(reversed(part.get('parts', [])))
+
+
+def _thread_session(service):
+    """현재 스레드 전용 requests 세션 (서비스 인증 정보 재사용)"""
+    cache = _local.__dict__.setdefault('session', {})
+    key = id(service._http)
+    if key not in cache:
+        credentials = getattr(service._http, 'credentials', None)
+        if credentials is not None:
+            cache[key] = AuthorizedSession(credentials)
+        else:
+            cache[key] = requests.Session()
+    return cache[key]
+
+
+def _iter_attachment_data(chunks):
+    """
+    attachments.get 응답({"data": "<base64url>"})을 받는 대로 디코드해 바이트 청크로 yield.
+    """
+    chunks = iter(chunks)
+    buffer = b''
+    for chunk in chunks:
+        buffer += chunk
+        key = buffer.find(b'"data"')
+        quote = buffer.find(b'"', key + len(b'"data"')) if key >= 0 else -1
+        if quote >= 0:
+            buffer = buffer[quote + 1:]
+            break
+    else:
+        raise ValueError('응답에 첨부파일 데이터가 없습니다')
+
+    pending = b''
+    for chunk in chain([buffer], chunks):
+        end = chunk.find(b'"')
+        pending += chunk if end < 0 else chunk[:end]
+        usable = len(pending) - len(pending) % 4
+        if usable:
+            yield base64.urlsafe_b64decode(pending[:usable])
+            pending = pending[usable:]
+        if end >= 0:
+            break
+    if pending:
+        yield base64.urlsafe_b64decode(pending + b'=' * (-len(pending) % 4))
+
+
+def _is_retryable(error) -> bool:
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def fetch_attachment(service, store: AttachmentStore, attachment: dict) -> tuple:
+    """
+    첨부파일 하나를 스트리밍으로 받아 저장소에 기록 (429/5xx는 지수 백오프 후 재시도).
+
+    Returns:
+        (sha256, 크기, 새로 저장됐는지)
+    """
+    uri = service.users().messages().attachments().get(
+        userId='me',
+        messageId=attachment['message_id'],
+        id=attachment['attachment_id'],
+        fields='data',
+    ).uri
+
+    # 다운로드는 requests 세션으로 직접 받으므로 쿼터 토큰도 직접 차감
+    governor = getattr(service._http, 'governor', None)
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(min(2 ** attempt, 16) + random.random())
+        if governor:
+            governor.wait()
+        try:
+            with _thread_session(service).get(uri, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                response.raise_for_status()
+                return store.write(_iter_attachment_data(response.iter_content(CHUNK_SIZE)))
+        except requests.RequestException as e:
+            if attempt == MAX_RETRIES or not _is_retryable(e):
+                raise
+
+
+def download_attachments(
+    service,
+    message_ids,
+    store: AttachmentStore,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    dedupe_by_name: bool = False,
+):
+    """
+    메시지들의 첨부파일을 받아 저장소에 넣으며 결과를 하나씩 yield.
+
+    메시지 조회는 gmail_batch 로 흘려보내고, 다운로드는 max_workers 개 스레드에서
+    동시에 진행합니다. 대기 중인 다운로드는 max_workers * 2 개까지만 쌓아 둡니다.
+
+    Args:
+        service: Gmail API 서비스 객체
+        message_ids: 메시지 ID 이터러블
+        store: 첨부파일 저장소
+        max_workers: 동시 다운로드 수
+        dedupe_by_name: 파일명/크기/MIME 이 같은 첨부파일은 내용 확인 없이 같은 파일로 보고 다시 받지 않음
+            (기본 False: 모두 받아 SHA-256 으로만 중복 판단)
+
+    Yields:
+        첨부파일 dict + 'sha256', 'status', 'error'
+        status: 'downloaded' (새로 저장), 'duplicate' (받았지만 같은 내용이 이미 있음),
+                'reused' (같은 파일로 보고 다운로드 생략), 'skipped' (이미 색인됨), 'failed'
+    """
+    inflight = deque()
+    leaders = {}
+
+    def name_key(attachment):
+        return attachment['filename'], attachment['size'], attachment['mime_type']
+
+    def finish(attachment, future):
+        """완료된 다운로드를 색인하고 같은 파일을 기다리던 첨부파일도 함께 처리"""
+        waiters = leaders.pop(name_key(attachment), [])
+        try:
+            sha256, _, created = future.result()
+        except Exception as e:
+            yield {**attachment, 'sha256': None, 'status': 'failed', 'error': str(e)}
+            # 대표 다운로드가 실패하면 기다리던 첨부파일은 각자 받음
+            for waiter in waiters:
+                inflight.append((waiter, executor.submit(fetch_attachment, service, store, waiter)))
+            return
+
+        store.record(attachment, sha256)
+        yield {**attachment, 'sha256': sha256, 'status': 'downloaded' if created else 'duplicate', 'error': None}
+        for waiter in waiters:
+            store.record(waiter, sha256)
+            yield {**waiter, 'sha256': sha256, 'status': 'reused', 'error': None}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        messages = iter_messages(service, message_ids, format='full', fields=ATTACHMENT_FIELDS)
+        for message in messages:
+            for attachment in iter_attachment_parts(message):
+                sha256 = store.lookup(attachment['message_id'], attachment['part_id'])
+                if sha256:
+                    yield {**attachment, 'sha256': sha256, 'status': 'skipped', 'error': None}
+                    continue
+
+                if dedupe_by_name:
+                    key = name_key(attachment)
+                    if key in leaders:
+                        leaders[key].append(attachment)
+                        continue
+                    sha256 = store.find_same(*key)
+                    if sha256:
+                        store.record(attachment, sha256)
+                        yield {**attachment, 'sha256': sha256, 'status': 'reused', 'error': None}
+                        continue
+                    leaders[key] = []
+
+                inflight.append((attachment, executor.submit(fetch_attachment, service, store, attachment)))
+                while len(inflight) >= max_workers * 2:
+                    yield from finish(*inflight.popleft())
+
+        while inflight:
+            yield from finish(*inflight.popleft())
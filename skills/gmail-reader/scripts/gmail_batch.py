@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Gmail 메시지 일괄 조회 (HTTP batch)
+
+messages().get 을 한 건씩 호출하는 대신 Gmail batch 엔드포인트로 묶어서 보냅니다.
+- 배치 묶기/병렬 실행/재시도는 공용 실행기(google_batch.py)가 담당
+  (배치당 최대 BATCH_LIMIT 건, 스레드마다 별도 HTTP 전송 객체, 요청 순서대로 결과 반환)
+- messages().list 는 nextPageToken 을 따라가며 ID를 스트리밍
+"""
+
+import sys
+
+from google_batch import DEFAULT_MAX_WORKERS, iter_batch
+
+# Gmail batch 요청 한도는 100건이지만, 50건을 넘기면 rateLimitExceeded가 잦아짐
+DEFAULT_BATCH_SIZE = 50
+LIST_PAGE_LIMIT = 500  # messages().list maxResults 상한
+
+METADATA_HEADERS = ['From', 'To', 'Subject', 'Date']
+
+# parse_email / extract_body 가 실제로 읽는 필드만 요청 (partial response)
+# 본문 파트는 3단계까지만 골라 받고, 그보다 깊은 파트는 통째로 받음
+_PART_FIELDS = 'mimeType,body/data'
+_NESTED_PARTS = f'{_PART_FIELDS},parts({_PART_FIELDS},parts({_PART_FIELDS},parts))'
+_MESSAGE_BASE_FIELDS = 'id,threadId,labelIds,snippet,internalDate'
+
+MESSAGE_FIELDS = {
+    'metadata': f'{_MESSAGE_BASE_FIELDS},payload/headers',
+    'full': f'{_MESSAGE_BASE_FIELDS},payload(headers,{_NESTED_PARTS})',
+}
+
+
+def message_fields(format: str = 'metadata') -> str:
+    """messages().get 용 fields 마스크 (마스크가 없는 format이면 None)"""
+    return MESSAGE_FIELDS.get(format)
+
+
+def thread_fields(format: str = 'full') -> str:
+    """threads().get 용 fields 마스크"""
+    fields = message_fields(format)
+    return f'id,messages({fields})' if fields else None
+
+
+def iter_message_results(
+    service,
+    message_ids,
+    format: str = 'metadata',
+    metadata_headers: list = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    fields: str = 'auto',
+):
+    """
+    iter_messages 와 같지만 실패한 메시지도 건너뛰지 않고 BatchResult 그대로 yield.
+
+    실패를 호출하는 쪽에서 직접 판단해야 할 때 사용합니다 (예: 404 만 건너뛰고 나머지는 재시도).
+
+    Yields:
+        BatchResult(key=메시지 ID, response=메시지 리소스, error=예외)
+    """
+    if format == 'metadata' and metadata_headers is None:
+        metadata_headers = METADATA_HEADERS
+    if fields == 'auto':
+        fields = message_fields(format)
+
+    def make_request(msg_id):
+        params = {'userId': 'me', 'id': msg_id, 'format': format}
+        if format == 'metadata':
+            params['metadataHeaders'] = metadata_headers
+        if fields:
+            params['fields'] = fields
+        return service.users().messages().get(**params)
+
+    requests = ((msg_id, make_request(msg_id)) for msg_id in message_ids)
+    yield from iter_batch(service, requests, batch_size, max_workers)
+
+
+def iter_messages(
+    service,
+    message_ids,
+    format: str = 'metadata',
+    metadata_headers: list = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    fields: str = 'auto',
+):
+    """
+    메시지 ID 이터러블을 batch 요청으로 조회하며 결과를 순서대로 하나씩 yield.
+
+    ID를 batch_size 단위로 끊어 최대 max_workers 개의 batch를 동시에 진행시키고,
+    앞선 batch가 끝나는 대로 바로 내보냅니다. 메모리에는 진행 중인 batch만 남습니다.
+
+    Args:
+        service: Gmail API 서비스 객체
+        message_ids: 메시지 ID 이터러블 (제너레이터 가능)
+        format: 'metadata', 'full', 'minimal', 'raw'
+        metadata_headers: format='metadata'일 때 가져올 헤더
+        batch_size: 배치당 요청 수 (최대 BATCH_LIMIT)
+        max_workers: 동시에 실행할 배치 수
+        fields: partial response 마스크 ('auto'면 format에 맞는 기본값, None이면 전체 리소스)
+
+    Yields:
+        메시지 리소스 (끝내 실패한 메시지는 건너뜀)
+    """
+    for result in iter_message_results(
+        service, message_ids, format, metadata_headers, batch_size, max_workers, fields,
+    ):
+        if result.ok:
+            yield result.response
+        else:
+            print(f"메일 {result.key} 조회 실패: {result.error}", file=sys.stderr)
+
+
+def batch_get_messages(
+    service,
+    message_ids: list,
+    format: str = 'metadata',
+    metadata_headers: list = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    fields: str = 'auto',
+) -> list:
+    """
+    여러 메시지를 batch 요청으로 조회.
+
+    Args:
+        service: Gmail API 서비스 객체
+        message_ids: 메시지 ID 목록
+        format: 'metadata', 'full', 'minimal', 'raw'
+        metadata_headers: format='metadata'일 때 가져올 헤더
+        batch_size: 배치당 요청 수 (최대 BATCH_LIMIT)
+        max_workers: 동시에 실행할 배치 수
+        fields: partial response 마스크 ('auto'면 format에 맞는 기본값, None이면 전체 리소스)
+
+    Returns:
+        message_ids 순서대로 메시지 리소스 목록 (끝내 실패한 메시지는 제외)
+    """
+    fetched = {
+        msg['id']: msg
+        for msg in iter_messages(
+            service, dict.fromkeys(message_ids), format, metadata_headers,
+            batch_size, max_workers, fields,
+        )
+    }
+    return [fetched[msg_id] for msg_id in message_ids if msg_id in fetched]
+
+
+def iter_message_ids(
+    service,
+    query: str = None,
+    label_ids: list = None,
+    limit: int = None,
+    page_size: int = LIST_PAGE_LIMIT,
+):
+    """
+    messages().list 를 nextPageToken 끝까지 따라가며 메시지 ID를 yield.
+
+    Args:
+        service: Gmail API 서비스 객체
+        query: Gmail 검색 쿼리
+        label_ids: 라벨 ID 필터
+        limit: 최대 ID 수 (None이면 전체)
+        page_size: 페이지당 요청 수 (최대 LIST_PAGE_LIMIT)
+    """
+    params = {'userId': 'me'}
+    if query:
+        params['q'] = query
+    if label_ids:
+        params['labelIds'] = label_ids
+
+    count = 0
+    page_token = None
+    while limit is None or count < limit:
+        remaining = page_size if limit is None else limit - count
+        params['maxResults'] = max(1, min(remaining, page_size, LIST_PAGE_LIMIT))
+        params['fields'] = 'messages/id,nextPageToken'
+        if page_token:
+            params['pageToken'] = page_token
+
+        results = service.users().messages().list(**params).execute()
+        for msg in results.get('messages', []):
+            yield msg['id']
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return
+
+
+def list_message_ids(service, query: str = None, label_ids: list = None, max_results: int = 20) -> list:
+    """messages().list 로 메시지 ID 목록 조회 (max_results가 None/0이면 전체)"""
+    return list(iter_message_ids(service, query, label_ids, limit=max_results or None))
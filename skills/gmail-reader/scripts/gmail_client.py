@@ -4,13 +4,14 @@ Gmail API Client - OAuth2 인증 (Gmail 전용)
 """
 
 import os
-import pickle
+from itertools import islice
 from pathlib import Path
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 
+from google_quota import govern
+from google_token_store import load_token, needs_refresh, save_token
+
 # Gmail API 스코프
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',
@@ -22,35 +23,58 @@ CREDS_DIR = Path(os.getenv('GOOGLE_CREDS_DIR', str(Path.home() / 'work/vault-wor
 CREDENTIALS_FILE = CREDS_DIR / 'oauth_client.json'
 TOKEN_FILE = CREDS_DIR / 'google_token.pickle'
 
+# 프로세스 안에서 재사용하는 서비스 객체 (토큰 파일이 바뀌면 다시 생성)
+_service_cache = {}
+
+
+def _token_key():
+    """토큰 파일 상태 (경로, 수정 시각) - 없으면 None"""
+    try:
+        return str(TOKEN_FILE), TOKEN_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
 
 def get_gmail_service():
-    """Gmail API 서비스 객체 반환 (OAuth2 방식)"""
-    creds = None
+    """
+    Gmail API 서비스 객체 반환 (OAuth2 방식).
 
-    if TOKEN_FILE.exists():
-        with open(TOKEN_FILE, 'rb') as token:
-            creds = pickle.load(token)
+    프로세스당 한 번만 토큰을 읽고 서비스를 만들며, 이후 호출은 캐시된 객체를 돌려줍니다.
+    discovery 문서는 라이브러리에 포함된 정적 JSON을 씁니다 (네트워크 조회 없음).
+    토큰 갱신은 여러 프로세스 중 하나만 하고 나머지는 저장된 결과를 씁니다 (google_token_store.py).
+    """
+    cache_key = _token_key()
+    cached = _service_cache.get(cache_key)
+    if cached and not needs_refresh(cached[0]):
+        return cached[1]
+
+    creds = _load_credentials()
+    service = govern(build('gmail', 'v1', credentials=creds, static_discovery=True, cache_discovery=False),
+                     'gmail', creds)
+    _service_cache.clear()
+    _service_cache[_token_key()] = (creds, service)
+    return service
 
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            if not CREDENTIALS_FILE.exists():
-                raise FileNotFoundError(
-                    f"OAuth credentials 파일이 없습니다: {CREDENTIALS_FILE}\n"
-                    "Google Cloud Console에서 OAuth 2.0 클라이언트 ID를 생성하고\n"
-                    "credentials.json을 다운로드하여 위 경로에 저장하세요."
-                )
 
-            flow = InstalledAppFlow.from_client_secrets_file(
-                str(CREDENTIALS_FILE), SCOPES
-            )
-            creds = flow.run_local_server(port=0)
+def _load_credentials():
+    """저장된 토큰 로드 (만료 임박 시 갱신), 없거나 갱신할 수 없으면 브라우저 인증"""
+    creds = load_token(TOKEN_FILE)
+    if creds and creds.valid:
+        return creds
 
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(creds, token)
+    if not CREDENTIALS_FILE.exists():
+        raise FileNotFoundError(
+            f"OAuth credentials 파일이 없습니다: {CREDENTIALS_FILE}\n"
+            "Google Cloud Console에서 OAuth 2.0 클라이언트 ID를 생성하고\n"
+            "credentials.json을 다운로드하여 위 경로에 저장하세요."
+        )
 
-    return build('gmail', 'v1', credentials=creds)
+    flow = InstalledAppFlow.from_client_secrets_file(
+        str(CREDENTIALS_FILE), SCOPES
+    )
+    creds = flow.run_local_server(port=0)
+    save_token(TOKEN_FILE, creds)
+    return creds
 
 
 def _get_service_with_service_account():
@@ -63,44 +87,16 @@ def _get_service_with_service_account():
     # 특정 사용자를 대신하여 작업 (도메인 전체 위임 필요)
     delegated_creds = creds.with_subject(DELEGATED_USER)
 
-    service = build('gmail', 'v1', credentials=delegated_creds)
+    service = govern(build('gmail', 'v1', credentials=delegated_creds), 'gmail', delegated_creds)
     return service
 
 
 def _get_service_with_oauth():
     """OAuth2 클라이언트 방식으로 Gmail 서비스 생성"""
-    creds = None
-
-    # 저장된 토큰 확인
-    if TOKEN_FILE.exists():
-        with open(TOKEN_FILE, 'rb') as token:
-            creds = pickle.load(token)
-
-    # 토큰이 없거나 만료된 경우
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            # 토큰 갱신
-            creds.refresh(Request())
-        else:
-            # 새로운 인증 필요
-            if not CREDENTIALS_FILE.exists():
-                raise FileNotFoundError(
-                    f"OAuth credentials 파일이 없습니다: {CREDENTIALS_FILE}\n"
-                    "Google Cloud Console에서 OAuth 2.0 클라이언트 ID를 생성하고\n"
-                    "credentials.json을 다운로드하여 위 경로에 저장하세요."
-                )
-
-            flow = InstalledAppFlow.from_client_secrets_file(
-                str(CREDENTIALS_FILE), SCOPES
-            )
-            creds = flow.run_local_server(port=0)
-
-        # 토큰 저장
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(creds, token)
+    creds = _load_credentials()
 
     # Gmail API 서비스 생성
-    service = build('gmail', 'v1', credentials=creds)
+    service = govern(build('gmail', 'v1', credentials=creds), 'gmail', creds)
     return service
 
 
@@ -110,6 +106,102 @@ def get_user_email(service):
     return profile.get('emailAddress', 'me')
 
 
+# users.messages.batchModify 한 번에 보낼 수 있는 최대 ID 수
+BATCH_MODIFY_LIMIT = 1000
+
+# 라벨 이름이 곧 ID인 시스템 라벨
+SYSTEM_LABELS = {
+    'INBOX', 'UNREAD', 'STARRED', 'IMPORTANT', 'SPAM', 'TRASH', 'SENT', 'DRAFT',
+    'CATEGORY_PERSONAL', 'CATEGORY_SOCIAL', 'CATEGORY_PROMOTIONS',
+    'CATEGORY_UPDATES', 'CATEGORY_FORUMS',
+}
+
+
+def resolve_label_ids(service, label_names):
+    """
+    라벨 이름 목록을 라벨 ID 목록으로 변환.
+
+    시스템 라벨(INBOX, UNREAD 등)은 그대로, 사용자 라벨은 labels().list 로 조회합니다.
+
+    Raises:
+        ValueError: 존재하지 않는 라벨 이름
+    """
+    if not label_names:
+        return []
+
+    label_ids = []
+    user_labels = None
+    for name in label_names:
+        if name.upper() in SYSTEM_LABELS:
+            label_ids.append(name.upper())
+            continue
+        if user_labels is None:
+            labels = service.users().labels().list(userId='me').execute().get('labels', [])
+            user_labels = {label['name']: label['id'] for label in labels}
+            user_labels.update({label['id']: label['id'] for label in labels})
+        if name not in user_labels:
+            raise ValueError(f"라벨을 찾을 수 없습니다: {name}")
+        label_ids.append(user_labels[name])
+
+    return label_ids
+
+
+def modify_labels(service, message_ids, add_label_ids=None, remove_label_ids=None,
+                  chunk_size=BATCH_MODIFY_LIMIT):
+    """
+    여러 메일의 라벨을 batchModify 로 일괄 변경.
+
+    message_ids 는 제너레이터여도 되며, chunk_size 개씩 모이는 대로 전송합니다.
+    단 이 변경으로 결과가 바뀌는 검색(예: 'is:unread' 읽음 처리)의 페이지를 따라가는 제너레이터는
+    페이지가 밀려 메일을 건너뛰므로, ID를 먼저 모두 모아서 넘기세요.
+
+    Args:
+        service: Gmail API 서비스 객체
+        message_ids: 메일 ID 이터러블
+        add_label_ids: 추가할 라벨 ID 목록
+        remove_label_ids: 제거할 라벨 ID 목록
+        chunk_size: 호출당 ID 수 (최대 BATCH_MODIFY_LIMIT)
+
+    Yields:
+        청크별 결과 {'chunk': 번호, 'count': ID 수, 'success': bool, 'error': 오류 메시지}
+    """
+    chunk_size = max(1, min(chunk_size, BATCH_MODIFY_LIMIT))
+    body = {}
+    if add_label_ids:
+        body['addLabelIds'] = list(add_label_ids)
+    if remove_label_ids:
+        body['removeLabelIds'] = list(remove_label_ids)
+    if not body:
+        raise ValueError("추가하거나 제거할 라벨이 필요합니다.")
+
+    ids = iter(message_ids)
+    chunk_no = 0
+    while True:
+        chunk = list(islice(ids, chunk_size))
+        if not chunk:
+            break
+        chunk_no += 1
+        try:
+            service.users().messages().batchModify(
+                userId='me',
+                body={'ids': chunk, **body}
+            ).execute()
+            yield {'chunk': chunk_no, 'count': len(chunk), 'success': True, 'error': None}
+        except Exception as e:
+            yield {'chunk': chunk_no, 'count': len(chunk), 'success': False, 'error': str(e)}
+
+
+def _count_modified(results):
+    """modify_labels 결과에서 성공한 메일 수 합산 (실패 청크는 출력)"""
+    success_count = 0
+    for result in results:
+        if result['success']:
+            success_count += result['count']
+        else:
+            print(f"청크 {result['chunk']} ({result['count']}개) 처리 실패: {result['error']}")
+    return success_count
+
+
 def mark_as_read(service, message_ids):
     """
     메일을 읽음 상태로 변경.
@@ -124,19 +216,7 @@ def mark_as_read(service, message_ids):
     if isinstance(message_ids, str):
         message_ids = [message_ids]
 
-    success_count = 0
-    for msg_id in message_ids:
-        try:
-            service.users().messages().modify(
-                userId='me',
-                id=msg_id,
-                body={'removeLabelIds': ['UNREAD']}
-            ).execute()
-            success_count += 1
-        except Exception as e:
-            print(f"메일 {msg_id} 처리 실패: {e}")
-
-    return success_count
+    return _count_modified(modify_labels(service, message_ids, remove_label_ids=['UNREAD']))
 
 
 def mark_as_unread(service, message_ids):
@@ -144,19 +224,7 @@ def mark_as_unread(service, message_ids):
     if isinstance(message_ids, str):
         message_ids = [message_ids]
 
-    success_count = 0
-    for msg_id in message_ids:
-        try:
-            service.users().messages().modify(
-                userId='me',
-                id=msg_id,
-                body={'addLabelIds': ['UNREAD']}
-            ).execute()
-            success_count += 1
-        except Exception as e:
-            print(f"메일 {msg_id} 처리 실패: {e}")
-
-    return success_count
+    return _count_modified(modify_labels(service, message_ids, add_label_ids=['UNREAD']))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+로컬 미러 본문 전문 검색 (SQLite FTS5)
+
+한국어는 조사가 붙어 단어 경계가 흐려지므로 ('회의록을', '회의는') 한글 구간을
+글자 2-gram으로 쪼개 색인합니다. 검색어도 같은 방식으로 쪼개 인접 구문으로 찾기 때문에
+'회의록'은 '회의록을', '주간회의록' 모두에 걸립니다. 영문/숫자는 단어 단위로 색인합니다.
+
+FTS5 토크나이저는 파이썬에서 등록할 수 없어, 색인/검색 전에 파이썬에서 토큰화한 뒤
+공백으로 이어 unicode61 토크나이저에 넘깁니다.
+"""
+
+import re
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS message_fts USING fts5(
+    subject, sender, body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# 색인 형식이 바뀌면 올려서 기존 색인을 다시 만들게 함
+FTS_VERSION = '1'
+
+# bm25 열 가중치 (subject, sender, body)
+RANK_WEIGHTS = (5.0, 3.0, 1.0)
+
+HANGUL = '가-힣'
+WORD_RE = re.compile(rf'[{HANGUL}]+|[^\W_{HANGUL}]+')
+HANGUL_RE = re.compile(rf'[{HANGUL}]+')
+
+
+def _word_tokens(word: str) -> list:
+    """한 단어를 색인 토큰으로 (한글은 2-gram, 그 외는 그대로)"""
+    if HANGUL_RE.fullmatch(word) and len(word) > 1:
+        return [word[i:i + 2] for i in range(len(word) - 1)]
+    return [word]
+
+
+def tokenize(text: str) -> str:
+    """색인용 텍스트: 토큰을 공백으로 이어 붙인 문자열"""
+    tokens = []
+    for word in WORD_RE.findall((text or '').lower()):
+        tokens.extend(_word_tokens(word))
+    return ' '.join(tokens)
+
+
+QUERY_RE = re.compile(r'\s*(?:(-?\()|(\))|(-?"[^"]*")|([^\s()"]+))')
+
+
+def _term_clause(raw: str):
+    """단어/구문 하나의 MATCH 구문 (검색할 토큰이 없으면 None)"""
+    words = WORD_RE.findall(raw.strip('"').lower())
+    if not words:
+        return None
+    if len(words) == 1 and HANGUL_RE.fullmatch(words[0]) and len(words[0]) == 1:
+        return f'"{words[0]}"*'
+    tokens = [token for word in words for token in _word_tokens(word)]
+    return '"' + ' '.join(tokens) + '"'
+
+
+def _combine(positive: list, negative: list):
+    """AND 로 묶은 긍정 구문에서 부정 구문을 NOT 으로 뺌 (긍정 구문이 없으면 None)"""
+    if not positive:
+        if negative:
+            raise ValueError("부정어만으로는 전문 색인 검색식을 만들 수 없습니다")
+        return None
+    expr = positive[0] if len(positive) == 1 else '(' + ' AND '.join(positive) + ')'
+    if negative:
+        expr = '(' + expr + ''.join(f' NOT {clause}' for clause in negative) + ')'
+    return expr
+
+
+class _MatchParser:
+    def __init__(self, text: str):
+        self.tokens, pos = [], 0
+        while text[pos:].strip():
+            match = QUERY_RE.match(text, pos)
+            if not match:
+                raise ValueError(f"해석할 수 없는 검색어: {text}")
+            self.tokens.append(next(group for group in match.groups() if group is not None))
+            pos = match.end()
+        self.pos = 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def parse(self):
+        positive, negative = self._or()
+        if self.pos < len(self.tokens):
+            raise ValueError("괄호가 맞지 않습니다")
+        return positive, negative
+
+    def _or(self):
+        parts = [self._and()]
+        while self._peek() == 'OR':
+            self.pos += 1
+            parts.append(self._and())
+        parts = [part for part in parts if part != ([], [])]
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return [], []
+        return ['(' + ' OR '.join(_combine(*part) for part in parts) + ')'], []
+
+    def _and(self):
+        positive, negative = [], []
+        while self._peek() not in (None, ')', 'OR'):
+            token = self._peek()
+            self.pos += 1
+            if token in ('(', '-('):
+                inner = self._or()
+                if self._peek() != ')':
+                    raise ValueError("괄호가 닫히지 않았습니다")
+                self.pos += 1
+                if token == '(':
+                    positive.extend(inner[0])
+                    negative.extend(inner[1])
+                elif inner != ([], []):
+                    negative.append(_combine(*inner))
+                continue
+            clause = _term_clause(token.lstrip('-'))
+            if clause:
+                (negative if token.startswith('-') and len(token) > 1 else positive).append(clause)
+        return positive, negative
+
+
+def build_match(text: str) -> str:
+    """
+    검색어를 FTS5 MATCH 식으로 변환.
+
+    단어는 AND로 묶이고, 'OR'와 괄호는 그대로 연산자로 씁니다. '-단어', '-"구문"', '-(...)'는
+    NOT 으로 뺍니다. 한글 단어는 2-gram 구문, 한 글자 한글은 접두 검색으로 바꿉니다.
+
+    Returns:
+        MATCH 식 (검색할 토큰이 없으면 빈 문자열)
+
+    Raises:
+        ValueError: 부정어만 있는 식 (예: '-invoice', 'a OR -b') 등 FTS5 로 표현할 수 없는 검색어
+    """
+    return _combine(*_MatchParser(text or '').parse()) or ''
+
+
+def index_message(conn, rowid: int, subject: str, sender: str, body: str):
+    """메시지 하나를 색인 (이미 있으면 교체)"""
+    conn.execute('DELETE FROM message_fts WHERE rowid = ?', (rowid,))
+    conn.execute(
+        'INSERT INTO message_fts (rowid, subject, sender, body) VALUES (?, ?, ?, ?)',
+        (rowid, tokenize(subject), tokenize(sender), tokenize(body)),
+    )
+
+
+def unindex_message(conn, rowid: int):
+    conn.execute('DELETE FROM message_fts WHERE rowid = ?', (rowid,))
+
+
+def rebuild(conn):
+    """messages 테이블 전체로 색인을 새로 만듦"""
+    conn.execute('DELETE FROM message_fts')
+    rows = conn.execute('SELECT rowid, subject, sender, body FROM messages')
+    conn.executemany(
+        'INSERT INTO message_fts (rowid, subject, sender, body) VALUES (?, ?, ?, ?)',
+        ((row[0], tokenize(row[1]), tokenize(row[2]), tokenize(row[3])) for row in rows),
+    )
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Gmail 로컬 미러 (SQLite)
+
+- 첫 동기화: 메일함 전체(또는 지정 쿼리)를 내려받아 저장
+- 이후 동기화: users.history.list 로 저장된 historyId 이후 변경분만 반영
+- 검색/조회: 자주 쓰는 Gmail 검색 연산자를 SQL로 변환해 로컬에서 응답
+
+저장 필드는 parse_email 결과와 같습니다 (id, thread_id, date, from, to, subject,
+snippet, labels, date_iso, body).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from googleapiclient.errors import HttpError
+
+import gmail_fts
+from gmail_batch import iter_message_ids, iter_messages
+from search_emails import parse_email
+
+MIRROR_PATH = Path(os.getenv(
+    'GMAIL_MIRROR_PATH',
+    str(Path.home() / '.cache/gmail-reader/mirror.sqlite3'),
+))
+
+# 몇 건마다 커밋할지 (대량 동기화 중 중단돼도 진행분 보존)
+COMMIT_EVERY = 500
+
+HISTORY_TYPES = ['messageAdded', 'messageDeleted', 'labelAdded', 'labelRemoved']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL,
+    date TEXT,
+    sender TEXT,
+    recipient TEXT,
+    subject TEXT,
+    snippet TEXT,
+    labels TEXT,
+    date_iso TEXT,
+    body TEXT,
+    internal_date INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_messages_thread ON messages(thread_id);
+CREATE INDEX IF NOT EXISTS idx_messages_date ON messages(internal_date);
+CREATE TABLE IF NOT EXISTS labels (
+    id TEXT PRIMARY KEY,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+COLUMNS = 'id, thread_id, date, sender, recipient, subject, snippet, labels, date_iso, body, internal_date'
+
+
+class MirrorNotReady(Exception):
+    """미러가 아직 동기화되지 않음"""
+
+
+class UnsupportedQuery(Exception):
+    """로컬에서 처리할 수 없는 검색 연산자"""
+
+
+class GmailMirror:
+    """Gmail 메일함의 로컬 SQLite 사본"""
+
+    def __init__(self, path=MIRROR_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.executescript(gmail_fts.SCHEMA)
+        if self.get_state('fts_version') != gmail_fts.FTS_VERSION:
+            # 색인이 없거나 형식이 바뀐 미러는 저장된 메일로 색인을 다시 만듦
+            gmail_fts.rebuild(self.conn)
+            self.set_state('fts_version', gmail_fts.FTS_VERSION)
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    # ----- 상태 -----
+
+    def get_state(self, key: str, default=None):
+        row = self.conn.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else default
+
+    def set_state(self, key: str, value):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', (key, str(value))
+        )
+
+    @property
+    def last_sync(self) -> float:
+        """마지막 동기화 시각 (epoch 초, 없으면 0)"""
+        return float(self.get_state('last_sync', 0))
+
+    def is_fresh(self, max_age_minutes: float) -> bool:
+        return time.time() - self.last_sync <= max_age_minutes * 60
+
+    # ----- 저장 -----
+
+    def upsert(self, msg_detail: dict):
+        """format='full' 메시지 리소스를 parse_email 형태로 저장하고 전문 색인 갱신"""
+        email = parse_email(msg_detail, include_body=True)
+        # ON CONFLICT ... DO UPDATE 는 rowid를 유지하므로 FTS 색인 rowid와 계속 맞음
+        self.conn.execute(
+            f'INSERT INTO messages ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT(id) DO UPDATE SET ' + ', '.join(
+                f'{col} = excluded.{col}' for col in COLUMNS.split(', ')[1:]
+            ),
+            (
+                email['id'], email['thread_id'], email['date'], email['from'], email['to'],
+                email['subject'], email['snippet'], json.dumps(email['labels']),
+                email['date_iso'], email['body'], int(msg_detail.get('internalDate', 0)),
+            ),
+        )
+        rowid = self.conn.execute('SELECT rowid FROM messages WHERE id = ?', (email['id'],)).fetchone()[0]
+        gmail_fts.index_message(self.conn, rowid, email['subject'], email['from'], email['body'])
+
+    def delete(self, message_id: str):
+        row = self.conn.execute('SELECT rowid FROM messages WHERE id = ?', (message_id,)).fetchone()
+        if row:
+            gmail_fts.unindex_message(self.conn, row[0])
+            self.conn.execute('DELETE FROM messages WHERE id = ?', (message_id,))
+
+    def update_labels(self, message_id: str, label_ids: list) -> bool:
+        """라벨만 갱신. 미러에 없는 메일이면 False"""
+        cursor = self.conn.execute(
+            'UPDATE messages SET labels = ? WHERE id = ?', (json.dumps(label_ids), message_id)
+        )
+        return cursor.rowcount > 0
+
+    def _store_messages(self, service, message_ids) -> int:
+        count = 0
+        for msg_detail in iter_messages(service, message_ids, format='full'):
+            self.upsert(msg_detail)
+            count += 1
+            if count % COMMIT_EVERY == 0:
+                self.conn.commit()
+        return count
+
+    def _store_labels(self, service):
+        labels = service.users().labels().list(userId='me').execute().get('labels', [])
+        self.conn.execute('DELETE FROM labels')
+        self.conn.executemany(
+            'INSERT INTO labels (id, name) VALUES (?, ?)',
+            [(label['id'], label['name']) for label in labels],
+        )
+
+    # ----- 동기화 -----
+
+    def full_sync(self, service, query: str = None) -> dict:
+        """
+        전체 동기화. 시작 시점의 historyId를 먼저 받아 두어 동기화 중 도착한 메일도 놓치지 않음.
+        historyId 는 모든 메일을 저장한 뒤에 기록하므로, 중단된 전체 동기화는 다음 sync 때 처음부터 다시 합니다.
+
+        Args:
+            service: Gmail API 서비스 객체
+            query: 첫 동기화 범위를 제한할 Gmail 쿼리 (예: "newer_than:1y")
+        """
+        history_id = service.users().getProfile(userId='me').execute()['historyId']
+
+        # 비우면서 동기화 상태도 같은 트랜잭션에서 지움: 중간에 끊기면 미러는 '비어 있음'으로 남고
+        # 다음 sync 가 증분 대신 전체 동기화를 다시 함
+        self.conn.execute('DELETE FROM messages')
+        self.conn.execute('DELETE FROM message_fts')
+        self.conn.execute("DELETE FROM state WHERE key IN ('history_id', 'last_sync')")
+        self.set_state('sync_query', query or '')
+        self.conn.commit()
+        self._store_labels(service)
+        count = self._store_messages(service, iter_message_ids(service, query=query))
+
+        self.set_state('history_id', history_id)
+        self.set_state('last_sync', time.time())
+        self.conn.commit()
+        return {'mode': 'full', 'added': count, 'deleted': 0, 'relabeled': 0}
+
+    def incremental_sync(self, service) -> dict:
+        """
+        history.list 로 마지막 historyId 이후 변경분만 반영.
+        historyId가 만료되어 404가 나면 전체 동기화로 전환.
+        """
+        start_id = self.get_state('history_id')
+        if not start_id:
+            raise MirrorNotReady("미러가 비어 있습니다. 먼저 sync_mailbox.py 로 전체 동기화하세요.")
+
+        added, deleted, relabeled = set(), set(), {}
+        params = {'userId': 'me', 'startHistoryId': start_id, 'historyTypes': HISTORY_TYPES}
+        latest_id = start_id
+
+        try:
+            while True:
+                result = service.users().history().list(**params).execute()
+                for record in result.get('history', []):
+                    for item in record.get('messagesAdded', []):
+                        added.add(item['message']['id'])
+                        deleted.discard(item['message']['id'])
+                    for item in record.get('messagesDeleted', []):
+                        deleted.add(item['message']['id'])
+                        added.discard(item['message']['id'])
+                        relabeled.pop(item['message']['id'], None)
+                    for item in record.get('labelsAdded', []) + record.get('labelsRemoved', []):
+                        message = item['message']
+                        if message['id'] not in deleted:
+                            relabeled[message['id']] = message.get('labelIds', [])
+                latest_id = result.get('historyId', latest_id)
+                if not result.get('nextPageToken'):
+                    break
+                params['pageToken'] = result['nextPageToken']
+        except HttpError as e:
+            if e.resp.status == 404:
+                return self.full_sync(service, self.get_state('sync_query') or None)
+            raise
+
+        scope = self._scope_clause()
+        for message_id in deleted:
+            self.delete(message_id)
+        # 미러에 없는 메일의 라벨 변경은 새 메일처럼 전체를 받아옴
+        # (범위를 로컬에서 판정할 수 없는 미러는 받지 않음: 범위 안 메일이면 이미 미러에 있음)
+        for message_id, label_ids in relabeled.items():
+            if message_id not in added and not self.update_labels(message_id, label_ids) and scope is not False:
+                added.add(message_id)
+        count = self._store_messages(service, sorted(added))
+        if relabeled:
+            self._store_labels(service)
+        if scope:
+            count -= len(self._drop_out_of_scope(scope, added | set(relabeled)) & added)
+
+        self.set_state('history_id', latest_id)
+        self.set_state('last_sync', time.time())
+        self.conn.commit()
+        return {'mode': 'incremental', 'added': count, 'deleted': len(deleted), 'relabeled': len(relabeled)}
+
+    def _scope_clause(self):
+        """
+        sync_query 범위의 WHERE 절 (sql, params).
+        범위가 없으면 None, 로컬에서 해석할 수 없으면 False.
+        """
+        query = self.get_state('sync_query')
+        if not query:
+            return None
+        try:
+            return QueryTranslator(self).translate(query)
+        except UnsupportedQuery:
+            return False
+
+    def _drop_out_of_scope(self, scope: tuple, message_ids) -> set:
+        """message_ids 중 sync_query 범위를 벗어난 메일을 미러에서 지우고 지운 ID를 반환"""
+        where, params = scope
+        message_ids = sorted(message_ids)
+        outside = set()
+        for i in range(0, len(message_ids), COMMIT_EVERY):
+            chunk = message_ids[i:i + COMMIT_EVERY]
+            rows = self.conn.execute(
+                f'SELECT id FROM messages WHERE id IN ({", ".join("?" * len(chunk))}) '
+                f'AND NOT COALESCE(({where}), 0)',
+                chunk + params,
+            )
+            outside.update(row['id'] for row in rows)
+        for message_id in outside:
+            self.delete(message_id)
+        return outside
+
+    def sync(self, service, query: str = None, full: bool = False) -> dict:
+        """
+        historyId가 있으면 증분, 없거나 full=True면 전체 동기화.
+        query 를 주지 않은 전체 동기화는 이전 범위(중단된 동기화 포함)를 그대로 씀.
+        """
+        if full or not self.get_state('history_id'):
+            if query is None:
+                query = self.get_state('sync_query') or None
+            return self.full_sync(service, query)
+        return self.incremental_sync(service)
+
+    def ensure_fresh(self, max_age_minutes: float = None, get_service=None):
+        """
+        마지막 동기화가 max_age_minutes 보다 오래됐으면 증분 동기화.
+        max_age_minutes가 None이면 네트워크 없이 현재 상태 그대로 사용.
+        """
+        if not self.get_state('history_id'):
+            raise MirrorNotReady("미러가 비어 있습니다. 먼저 sync_mailbox.py 로 전체 동기화하세요.")
+        if max_age_minutes is not None and not self.is_fresh(max_age_minutes):
+            self.incremental_sync(get_service())
+
+    # ----- 조회 -----
+
+    def _to_email(self, row, include_body: bool) -> dict:
+        email = {
+            'id': row['id'],
+            'thread_id': row['thread_id'],
+            'date': row['date'],
+            'from': row['sender'],
+            'to': row['recipient'],
+            'subject': row['subject'],
+            'snippet': row['snippet'],
+            'labels': json.loads(row['labels'] or '[]'),
+            'date_iso': row['date_iso'],
+        }
+        if include_body:
+            email['body'] = row['body']
+        return email
+
+    def get(self, message_id: str, include_body: bool = True):
+        row = self.conn.execute(
+            f'SELECT {COLUMNS} FROM messages WHERE id = ?', (message_id,)
+        ).fetchone()
+        return self._to_email(row, include_body) if row else None
+
+    def get_thread(self, thread_id: str) -> list:
+        rows = self.conn.execute(
+            f'SELECT {COLUMNS} FROM messages WHERE thread_id = ? ORDER BY internal_date',
+            (thread_id,),
+        ).fetchall()
+        return [self._to_email(row, include_body=True) for row in rows]
+
+    def search(self, query: str, limit: int = None, include_body: bool = False, label_ids: list = None):
+        """
+        Gmail 검색 쿼리를 로컬에서 실행 (최신순).
+
+        Returns:
+            이메일 딕셔너리 이터레이터
+
+        Raises:
+            UnsupportedQuery: 로컬에서 처리할 수 없는 연산자가 포함된 경우
+        """
+        where, params = QueryTranslator(self).translate(query or '', label_ids)
+
+        sql = f'SELECT {COLUMNS} FROM messages WHERE {where} ORDER BY internal_date DESC'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        rows = self.conn.execute(sql, params)
+        return (self._to_email(row, include_body) for row in rows)
+
+    def search_text(self, text: str, limit: int = 20, include_body: bool = False):
+        """
+        전문 색인으로 본문/제목/발신자를 검색해 관련도 순으로 반환 (API 호출 없음).
+
+        검색어 중 'from:', 'after:' 같은 연산자는 search 와 같은 필터로 적용하고, '-키워드'는 제외합니다.
+        색인으로 표현할 수 없는 식('-invoice'만 있는 경우 등)은 search 로 처리합니다 (관련도 없이 최신순).
+
+        Returns:
+            이메일 딕셔너리 이터레이터 (각 항목에 'score' 포함, 낮을수록 관련도 높음)
+
+        Raises:
+            UnsupportedQuery: 로컬에서 처리할 수 없는 연산자가 포함된 경우
+        """
+        # 전체 식이 로컬에서 해석되는지 먼저 확인 ('{a b}', 지원하지 않는 연산자 등은 UnsupportedQuery)
+        QueryTranslator(self).translate(text or '')
+        words = re.findall(r'[^\s"]*"[^"]*"|\S+', text or '')
+        is_filter = [bool(re.match(r'-?[^\s":]+:', w)) for w in words]
+        filters = ' '.join(w for w, f in zip(words, is_filter) if f)
+        keywords = [w for w, f in zip(words, is_filter) if not f]
+        if filters and ('OR' in keywords or any(c in text for c in '()')):
+            # 연산자와 키워드가 OR/괄호로 얽힌 식은 나눠 처리할 수 없어 일반 검색으로
+            return self.search(text, limit, include_body)
+        try:
+            match = gmail_fts.build_match(' '.join(keywords))
+        except ValueError:
+            # 부정어만 있는 식 등 FTS5 로 표현할 수 없는 식은 일반 검색 (최신순)
+            return self.search(text, limit, include_body)
+        if not match:
+            # 키워드가 없으면 일반 검색과 같음
+            return self.search(filters, limit, include_body)
+
+        where, params = QueryTranslator(self).translate(filters)
+        weights = ', '.join(str(w) for w in gmail_fts.RANK_WEIGHTS)
+        sql = (
+            f'SELECT {COLUMNS}, hits.score FROM messages JOIN ('
+            f'SELECT rowid AS fts_rowid, bm25(message_fts, {weights}) AS score '
+            'FROM message_fts WHERE message_fts MATCH ?'
+            f') AS hits ON messages.rowid = hits.fts_rowid WHERE {where} ORDER BY hits.score'
+        )
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        rows = self.conn.execute(sql, [match] + params)
+        return ({**self._to_email(row, include_body), 'score': round(row['score'], 3)} for row in rows)
+
+    def resolve_label(self, name: str) -> str:
+        """label: 연산자 값을 라벨 ID로 변환 (Gmail처럼 '-'와 '/'는 같은 것으로 취급)"""
+        normalized = name.lower().replace('/', '-').replace(' ', '-')
+        for row in self.conn.execute('SELECT id, name FROM labels'):
+            if normalized in (row['id'].lower(), row['name'].lower().replace('/', '-').replace(' ', '-')):
+                return row['id']
+        return name.upper()
+
+
+def _label_clause() -> str:
+    return 'EXISTS (SELECT 1 FROM json_each(messages.labels) WHERE value = ?)'
+
+
+def _like_pattern(value: str) -> str:
+    """LIKE 부분 일치 패턴 (값의 %, _, \\ 는 글자 그대로 비교하도록 이스케이프)"""
+    return '%' + re.sub(r'([\\%_])', r'\\\1', value) + '%'
+
+
+class QueryTranslator:
+    """
+    Gmail 검색 문법의 부분집합을 SQL WHERE 절로 변환.
+
+    지원: from: to: subject: label: is: in: after: before: newer_than: older_than:,
+    일반 키워드, "구문", OR, 괄호, -부정, 연산자 그룹 (예: subject:(미팅 OR 회의))
+
+    Gmail처럼 in:trash, in:spam, in:anywhere (또는 label:trash 등) 가 없으면
+    휴지통/스팸 메일은 결과에서 뺍니다.
+    """
+
+    # 괄호, 그룹/구문 앞 '-', "구문", 연산자 그룹 (name:( 또는 값이 따옴표인 name:"a b"), 일반 단어
+    TOKEN_RE = re.compile(
+        r'\s*(?:(\()|(\))|(-(?=[("]))|("[^"]*")|(-?[^\s()"]+:(?:"[^"]*"|(?=\()))|([^\s()"]+))'
+    )
+    UNSUPPORTED_CHARS = set('{}')
+    TEXT_COLUMNS = ('subject', 'snippet', 'body', 'sender', 'recipient')
+    IS_LABELS = {'unread': 'UNREAD', 'starred': 'STARRED', 'important': 'IMPORTANT'}
+    IN_LABELS = {'inbox': 'INBOX', 'sent': 'SENT', 'trash': 'TRASH', 'spam': 'SPAM', 'draft': 'DRAFT'}
+    UNITS = {'d': 1, 'm': 30, 'y': 365}
+    # 쿼리에서 직접 가리키지 않으면 제외하는 라벨
+    HIDDEN_LABELS = ('TRASH', 'SPAM')
+
+    def __init__(self, mirror: GmailMirror):
+        self.mirror = mirror
+
+    def translate(self, query: str, label_ids: list = None) -> tuple:
+        """
+        Returns:
+            (WHERE 절, 파라미터 목록). label_ids 를 주면 그 라벨이 모두 붙은 메일로 한정
+        """
+        self.tokens = self._tokenize(query)
+        self.pos = 0
+        self.params = []
+        self.show_hidden = False
+        sql = self._parse_or(None) if self.tokens else '1'
+        if self.pos < len(self.tokens):
+            raise UnsupportedQuery(f"해석할 수 없는 쿼리: {query}")
+        for label_id in label_ids or []:
+            sql = f'({sql}) AND {self._label(label_id)}'
+        if not self.show_hidden:
+            placeholders = ', '.join('?' * len(self.HIDDEN_LABELS))
+            sql = (f'({sql}) AND NOT EXISTS (SELECT 1 FROM json_each(messages.labels) '
+                   f'WHERE value IN ({placeholders}))')
+            self.params.extend(self.HIDDEN_LABELS)
+        return sql, self.params
+
+    def _tokenize(self, query: str) -> list:
+        tokens, pos = [], 0
+        while query[pos:].strip():
+            match = self.TOKEN_RE.match(query, pos)
+            if not match:
+                # 닫히지 않은 따옴표 등
+                raise UnsupportedQuery(f"해석할 수 없는 쿼리: {query}")
+            token = next(group for group in match.groups() if group is not None)
+            if self.UNSUPPORTED_CHARS & set(token):
+                raise UnsupportedQuery(f"로컬 미러에서 지원하지 않는 검색 문법: {token}")
+            tokens.append(token)
+            pos = match.end()
+        return tokens
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _parse_or(self, field):
+        parts = [self._parse_and(field)]
+        while self._peek() == 'OR':
+            self.pos += 1
+            parts.append(self._parse_and(field))
+        return parts[0] if len(parts) == 1 else '(' + ' OR '.join(parts) + ')'
+
+    def _parse_and(self, field):
+        parts = []
+        while self._peek() not in (None, ')', 'OR'):
+            parts.append(self._parse_unary(field))
+        if not parts:
+            raise UnsupportedQuery("빈 검색식")
+        return parts[0] if len(parts) == 1 else '(' + ' AND '.join(parts) + ')'
+
+    def _parse_unary(self, field):
+        token = self._peek()
+        if token == '-':
+            # -(a OR b), -"구문"
+            self.pos += 1
+            return f'NOT {self._parse_unary(field)}'
+        if token.startswith('-') and len(token) > 1:
+            self.tokens[self.pos] = token[1:]
+            return f'NOT {self._parse_unary(field)}'
+        if token == '(':
+            return self._parse_group(field)
+        self.pos += 1
+        if token.endswith(':') and self._peek() == '(':
+            # 연산자 그룹: subject:(a OR b)
+            return self._parse_group(token[:-1].lower())
+        if ':' in token and not token.startswith('"'):
+            name, value = token.split(':', 1)
+            return self._operator(name.lower(), value.strip('"'))
+        return self._term(field, token.strip('"'))
+
+    def _parse_group(self, field):
+        self.pos += 1
+        sql = self._parse_or(field)
+        if self._peek() != ')':
+            raise UnsupportedQuery("괄호가 닫히지 않았습니다")
+        self.pos += 1
+        return sql
+
+    def _term(self, field, value):
+        if field:
+            return self._operator(field, value)
+        self.params.extend([_like_pattern(value)] * len(self.TEXT_COLUMNS))
+        return '(' + ' OR '.join(f"{col} LIKE ? ESCAPE '\\'" for col in self.TEXT_COLUMNS) + ')'
+
+    def _like(self, column, value):
+        self.params.append(_like_pattern(value))
+        return f"{column} LIKE ? ESCAPE '\\'"
+
+    def _label(self, label_id):
+        if label_id in self.HIDDEN_LABELS:
+            self.show_hidden = True
+        self.params.append(label_id)
+        return _label_clause()
+
+    def _date(self, op, value):
+        try:
+            day = datetime.strptime(value.replace('-', '/'), '%Y/%m/%d')
+        except ValueError:
+            raise UnsupportedQuery(f"날짜 형식을 해석할 수 없습니다: {value}")
+        self.params.append(int(day.timestamp() * 1000))
+        return f'internal_date {op} ?'
+
+    def _relative(self, op, value):
+        match = re.fullmatch(r'(\d+)([dmy])', value.lower())
+        if not match:
+            raise UnsupportedQuery(f"기간 형식을 해석할 수 없습니다: {value}")
+        days = int(match.group(1)) * self.UNITS[match.group(2)]
+        self.params.append(int((datetime.now() - timedelta(days=days)).timestamp() * 1000))
+        return f'internal_date {op} ?'
+
+    def _operator(self, name, value):
+        if name == 'from':
+            return self._like('sender', value)
+        if name == 'to':
+            return self._like('recipient', value)
+        if name == 'subject':
+            return self._like('subject', value)
+        if name == 'label':
+            return self._label(self.mirror.resolve_label(value))
+        if name == 'is' and value.lower() in self.IS_LABELS:
+            return self._label(self.IS_LABELS[value.lower()])
+        if name == 'is' and value.lower() == 'read':
+            return f'NOT {self._label("UNREAD")}'
+        if name == 'in' and value.lower() in self.IN_LABELS:
+            return self._label(self.IN_LABELS[value.lower()])
+        if name == 'in' and value.lower() == 'anywhere':
+            self.show_hidden = True
+            return '1'
+        if name in ('after', 'before'):
+            return self._date('>=' if name == 'after' else '<', value)
+        if name in ('newer_than', 'older_than'):
+            return self._relative('>=' if name == 'newer_than' else '<', value)
+        raise UnsupportedQuery(f"로컬 미러에서 지원하지 않는 연산자: {name}:{value}")
@@ -1,99 +1,142 @@
 #!/usr/bin/env python3
 """
-Gmail 메일 상태 변경 스크립트 - 읽음/읽지않음 처리
+Gmail 메일 상태 변경 스크립트 - 읽음/읽지않음/보관 처리 및 라벨 추가/제거
 """
 
 import argparse
 import sys
-from gmail_client import get_gmail_service, mark_as_read, mark_as_unread
-
-
-def search_and_mark(query: str, action: str = 'read', max_results: int = 100, dry_run: bool = False):
+from gmail_client import get_gmail_service, modify_labels, resolve_label_ids
+from gmail_batch import batch_get_messages, iter_message_ids
+
+# action별 (추가 라벨, 제거 라벨)
+ACTION_LABELS = {
+    'read': ([], ['UNREAD']),
+    'unread': (['UNREAD'], []),
+    'archive': ([], ['INBOX']),
+    'label': ([], []),
+}
+
+ACTION_TEXT = {
+    'read': '읽음',
+    'unread': '읽지 않음',
+    'archive': '보관',
+    'label': '라벨 변경',
+}
+
+
+def search_and_mark(query: str, action: str = 'read', max_results: int = None, dry_run: bool = False,
+                    add_labels: list = None, remove_labels: list = None):
     """
     쿼리로 메일 검색 후 상태 변경.
 
+    검색 결과의 ID를 끝까지 모두 모은 뒤 batchModify 청크(최대 1,000개)로 변경합니다.
+    ('is:unread' 를 읽음 처리하듯 변경이 검색 결과 자체를 바꾸므로, 페이지를 넘기는 도중에
+    변경하면 결과가 앞으로 당겨져 일부 메일을 건너뜀)
+
     Args:
         query: Gmail 검색 쿼리
-        action: 'read' 또는 'unread'
-        max_results: 최대 검색 결과 수
+        action: 'read', 'unread', 'archive', 'label'
+        max_results: 최대 처리 메일 수 (None 또는 0이면 전체)
         dry_run: True면 실제 변경 없이 미리보기만
+        add_labels: 추가로 붙일 라벨 이름 목록
+        remove_labels: 추가로 뗄 라벨 이름 목록
+
+    Returns:
+        dry_run이면 검색된 메일 수, 아니면 변경에 성공한 메일 수
     """
     service = get_gmail_service()
 
-    # 메일 검색
-    print(f"검색 중: {query}")
-    results = service.users().messages().list(
-        userId='me',
-        q=query,
-        maxResults=max_results
-    ).execute()
-
-    messages = results.get('messages', [])
-    if not messages:
-        print("검색 결과가 없습니다.")
-        return 0
+    add_ids, remove_ids = ACTION_LABELS[action]
+    add_ids = add_ids + resolve_label_ids(service, add_labels)
+    remove_ids = remove_ids + resolve_label_ids(service, remove_labels)
+    if not add_ids and not remove_ids:
+        raise ValueError("--add-label 또는 --remove-label 이 필요합니다.")
 
-    print(f"총 {len(messages)}개 메일 발견")
+    print(f"검색 중: {query}")
+    message_ids = list(iter_message_ids(service, query=query, limit=max_results or None))
 
     if dry_run:
+        preview_ids = message_ids[:10]
+        total = len(message_ids)
+        if total == 0:
+            print("검색 결과가 없습니다.")
+            return 0
+
+        print(f"총 {total}개 메일 발견")
         print("\n[Dry Run] 실제 변경 없이 미리보기:")
-        for i, msg in enumerate(messages[:10], 1):
-            detail = service.users().messages().get(
-                userId='me',
-                id=msg['id'],
-                format='metadata',
-                metadataHeaders=['Subject', 'From', 'Date']
-            ).execute()
+        details = batch_get_messages(
+            service,
+            preview_ids,
+            format='metadata',
+            metadata_headers=['Subject', 'From', 'Date'],
+        )
+        for i, detail in enumerate(details, 1):
             headers = {h['name']: h['value'] for h in detail.get('payload', {}).get('headers', [])}
             print(f"  [{i}] {headers.get('Subject', '(제목 없음)')[:60]}")
-        if len(messages) > 10:
-            print(f"  ... 외 {len(messages) - 10}개")
-        return len(messages)
-
-    # 상태 변경
-    message_ids = [msg['id'] for msg in messages]
-    if action == 'read':
-        success = mark_as_read(service, message_ids)
-        print(f"\n{success}/{len(messages)}개 메일을 읽음 처리했습니다.")
-    else:
-        success = mark_as_unread(service, message_ids)
-        print(f"\n{success}/{len(messages)}개 메일을 읽지 않음 처리했습니다.")
+        if total > 10:
+            print(f"  ... 외 {total - 10}개")
+        return total
+
+    # 상태 변경 (청크 단위 결과 보고)
+    total = 0
+    success = 0
+    for result in modify_labels(service, message_ids, add_ids, remove_ids):
+        total += result['count']
+        if result['success']:
+            success += result['count']
+            print(f"  청크 {result['chunk']}: {result['count']}개 완료")
+        else:
+            print(f"  청크 {result['chunk']}: {result['count']}개 실패 - {result['error']}")
+
+    if total == 0:
+        print("검색 결과가 없습니다.")
+        return 0
 
+    print(f"\n{success}/{total}개 메일을 '{ACTION_TEXT[action]}' 처리했습니다.")
     return success
 
 
 def main():
-    parser = argparse.ArgumentParser(description='Gmail 메일 읽음/읽지않음 처리')
+    parser = argparse.ArgumentParser(description='Gmail 메일 읽음/읽지않음/보관/라벨 처리')
     parser.add_argument('--query', '-q', required=True, help='Gmail 검색 쿼리 (예: from:vercel)')
-    parser.add_argument('--action', '-a', choices=['read', 'unread'], default='read',
+    parser.add_argument('--action', '-a', choices=list(ACTION_LABELS), default='read',
                         help='처리 방식 (기본: read)')
-    parser.add_argument('--max', '-m', type=int, default=100,
-                        help='최대 처리 메일 수 (기본: 100)')
+    parser.add_argument('--add-label', action='append', default=[],
+                        help='붙일 라벨 이름 (여러 번 지정 가능)')
+    parser.add_argument('--remove-label', action='append', default=[],
+                        help='뗄 라벨 이름 (여러 번 지정 가능)')
+    parser.add_argument('--max', '-m', type=int, default=0,
+                        help='최대 처리 메일 수 (기본: 0 = 검색 결과 전체)')
     parser.add_argument('--dry-run', '-n', action='store_true',
                         help='실제 변경 없이 미리보기만')
     parser.add_argument('--yes', '-y', action='store_true',
                         help='확인 없이 바로 실행')
 
     args = parser.parse_args()
+    options = dict(add_labels=args.add_label, remove_labels=args.remove_label)
 
-    # Dry run 먼저 실행
-    if args.dry_run:
-        search_and_mark(args.query, args.action, args.max, dry_run=True)
-        return
-
-    # 확인 프롬프트
-    if not args.yes:
-        count = search_and_mark(args.query, args.action, args.max, dry_run=True)
-        if count == 0:
-            return
-        action_text = '읽음' if args.action == 'read' else '읽지 않음'
-        confirm = input(f"\n위 {count}개 메일을 '{action_text}' 처리하시겠습니까? (y/N): ")
-        if confirm.lower() != 'y':
-            print("취소되었습니다.")
+    try:
+        # Dry run 먼저 실행
+        if args.dry_run:
+            search_and_mark(args.query, args.action, args.max, dry_run=True, **options)
             return
 
-    # 실행
-    search_and_mark(args.query, args.action, args.max, dry_run=False)
+        # 확인 프롬프트
+        if not args.yes:
+            count = search_and_mark(args.query, args.action, args.max, dry_run=True, **options)
+            if count == 0:
+                return
+            confirm = input(f"\n위 {count}개 메일을 '{ACTION_TEXT[args.action]}' 처리하시겠습니까? (y/N): ")
+            if confirm.lower() != 'y':
+                print("취소되었습니다.")
+                return
+
+        # 실행
+        search_and_mark(args.query, args.action, args.max, dry_run=False, **options)
+
+    except ValueError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -12,51 +12,94 @@ import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+# 스킬 데몬이 떠 있으면 데몬에서 실행 (무거운 import 전에 확인)
+if __name__ == '__main__':
+    from daemon_client import forward_to_daemon
+    forward_to_daemon(__file__)
+
 # 같은 디렉토리의 gmail_client 임포트
 sys.path.insert(0, str(Path(__file__).parent))
 from gmail_client import get_gmail_service
+from gmail_batch import iter_message_ids, iter_messages
 
 
-def search_emails(query: str, max_results: int = 20, include_body: bool = False):
+def iter_search_emails(query: str, limit: int = None, include_body: bool = False, label_ids: list = None):
     """
-    Gmail 검색 쿼리로 이메일 검색
+    Gmail 검색 결과를 페이지를 넘겨가며 하나씩 yield (메모리 사용량 일정)
 
     Args:
-        query: Gmail 검색 쿼리 (예: "from:someone@example.com", "subject:미팅")
-        max_results: 최대 결과 수
+        query: Gmail 검색 쿼리
+        limit: 최대 결과 수 (None이면 전체)
         include_body: 본문 포함 여부
+        label_ids: 라벨 ID 필터
 
-    Returns:
-        검색된 이메일 목록
+    Yields:
+        파싱된 이메일 딕셔너리
     """
     service = get_gmail_service()
 
-    # 메시지 목록 검색
-    results = service.users().messages().list(
-        userId='me',
-        q=query,
-        maxResults=max_results
-    ).execute()
+    message_ids = iter_message_ids(service, query=query, label_ids=label_ids, limit=limit)
+    for msg_detail in iter_messages(
+        service,
+        message_ids,
+        format='full' if include_body else 'metadata',
+    ):
+        yield parse_email(msg_detail, include_body)
 
-    messages = results.get('messages', [])
 
-    if not messages:
-        return []
+def iter_mirror_search(query: str, limit: int = None, include_body: bool = False, max_age: float = None,
+                       full_text: bool = False):
+    """
+    로컬 미러에서 검색 (네트워크 왕복 없음)
 
-    emails = []
-    for msg in messages:
-        # 메시지 상세 정보 가져오기
-        msg_detail = service.users().messages().get(
-            userId='me',
-            id=msg['id'],
-            format='full' if include_body else 'metadata',
-            metadataHeaders=['From', 'To', 'Subject', 'Date']
-        ).execute()
+    Args:
+        query: Gmail 검색 쿼리
+        limit: 최대 결과 수 (None이면 전체)
+        include_body: 본문 포함 여부
+        max_age: 미러가 이 시간(분)보다 오래됐으면 먼저 증분 동기화 (None이면 동기화 안 함)
+        full_text: 키워드를 전문 색인(FTS5)으로 찾아 관련도 순으로 반환
 
-        email_data = parse_email(msg_detail, include_body)
-        emails.append(email_data)
+    Yields:
+        파싱된 이메일 딕셔너리 (미러가 처리할 수 없는 쿼리면 Gmail API 결과, full_text 이면 UnsupportedQuery)
+    """
+    from gmail_mirror import GmailMirror, UnsupportedQuery
 
-    return emails
+    mirror = GmailMirror()
+    try:
+        mirror.ensure_fresh(max_age, get_gmail_service)
+        try:
+            if full_text:
+                emails = mirror.search_text(query, limit, include_body)
+            else:
+                emails = mirror.search(query, limit, include_body)
+        except UnsupportedQuery as e:
+            if full_text:
+                # --local 은 API를 호출하지 않음
+                raise UnsupportedQuery(f"{e} (--local 은 로컬 미러에서만 검색합니다)")
+            print(f"{e} - Gmail API로 검색합니다.", file=sys.stderr)
+            emails = None
+        if emails is not None:
+            yield from emails
+            return
+    finally:
+        mirror.close()
+
+    yield from iter_search_emails(query, limit, include_body)
+
+
+def search_emails(query: str, max_results: int = 20, include_body: bool = False):
+    """
+    Gmail 검색 쿼리로 이메일 검색
+
+    Args:
+        query: Gmail 검색 쿼리 (예: "from:someone@example.com", "subject:미팅")
+        max_results: 최대 결과 수 (0 또는 None이면 전체)
+        include_body: 본문 포함 여부
+
+    Returns:
+        검색된 이메일 목록
+    """
+    return list(iter_search_emails(query, max_results or None, include_body))
 
 
 def parse_email(msg_detail: dict, include_body: bool = False) -> dict:
@@ -117,14 +160,8 @@ def extract_body(payload: dict) -> str:
     return body[:5000] if body else ''  # 본문 길이 제한
 
 
-def search_meeting_emails(days: int = 7, max_results: int = 20):
-    """
-    미팅/일정 관련 이메일 검색
-
-    Args:
-        days: 최근 N일 이내
-        max_results: 최대 결과 수
-    """
+def meeting_query(days: int = 7) -> str:
+    """최근 N일 미팅/일정 관련 메일 검색 쿼리"""
     # 날짜 계산
     after_date = (datetime.now() - timedelta(days=days)).strftime('%Y/%m/%d')
 
@@ -135,8 +172,18 @@ def search_meeting_emails(days: int = 7, max_results: int = 20):
         'from:calendar-notification@google.com',  # Google Calendar 알림
     ]
 
-    query = f"({' OR '.join(meeting_keywords)}) after:{after_date}"
-    return search_emails(query, max_results, include_body=True)
+    return f"({' OR '.join(meeting_keywords)}) after:{after_date}"
+
+
+def search_meeting_emails(days: int = 7, max_results: int = 20):
+    """
+    미팅/일정 관련 이메일 검색
+
+    Args:
+        days: 최근 N일 이내
+        max_results: 최대 결과 수
+    """
+    return search_emails(meeting_query(days), max_results, include_body=True)
 
 
 def search_from_person(email_or_name: str, max_results: int = 20):
@@ -164,6 +211,22 @@ def search_with_person(email_or_name: str, max_results: int = 30):
     return search_emails(query, max_results, include_body=False)
 
 
+def resolve_search(args) -> tuple:
+    """CLI 인자로부터 (검색 쿼리, 본문 포함 여부) 결정"""
+    if args.meetings:
+        return meeting_query(args.days), True
+    if args.from_person:
+        return f"from:{args.from_person}", False
+    if args.with_person:
+        return f"from:{args.with_person} OR to:{args.with_person}", False
+    if args.query:
+        return args.query, args.body
+
+    # 기본: 최근 메일 조회
+    after_date = (datetime.now() - timedelta(days=args.days)).strftime('%Y/%m/%d')
+    return f"after:{after_date}", args.body
+
+
 def main():
     parser = argparse.ArgumentParser(description='Gmail 이메일 검색')
     parser.add_argument('--query', '-q', type=str, help='Gmail 검색 쿼리')
@@ -171,27 +234,35 @@ def main():
     parser.add_argument('--from-person', '-f', type=str, help='특정 인물로부터 받은 메일')
     parser.add_argument('--with-person', '-w', type=str, help='특정 인물과의 메일 히스토리')
     parser.add_argument('--days', '-d', type=int, default=7, help='최근 N일 이내 (기본: 7)')
-    parser.add_argument('--max', '-n', type=int, default=20, help='최대 결과 수 (기본: 20)')
+    parser.add_argument('--max', '-n', type=int, default=20, help='최대 결과 수 (기본: 20, 0이면 전체)')
     parser.add_argument('--body', '-b', action='store_true', help='본문 포함')
     parser.add_argument('--json', '-j', action='store_true', help='JSON 형식 출력')
+    parser.add_argument('--jsonl', action='store_true', help='JSONL 스트리밍 출력 (한 줄에 메일 하나)')
+    parser.add_argument('--mirror', action='store_true', help='로컬 미러에서 검색 (sync_mailbox.py 필요)')
+    parser.add_argument('--local', '-l', type=str,
+                        help='로컬 전문 색인으로 키워드 검색, 관련도 순 (API 호출 없음)')
+    parser.add_argument('--max-age', type=float,
+                        help='미러가 N분보다 오래됐으면 먼저 증분 동기화 (--mirror 포함)')
 
     args = parser.parse_args()
 
     try:
-        emails = []
-
-        if args.meetings:
-            emails = search_meeting_emails(args.days, args.max)
-        elif args.from_person:
-            emails = search_from_person(args.from_person, args.max)
-        elif args.with_person:
-            emails = search_with_person(args.with_person, args.max)
-        elif args.query:
-            emails = search_emails(args.query, args.max, args.body)
+        query, include_body = resolve_search(args)
+
+        if args.local:
+            results = iter_mirror_search(args.local, args.max or None, args.body, args.max_age, full_text=True)
+        elif args.mirror or args.max_age is not None:
+            results = iter_mirror_search(query, args.max or None, include_body, args.max_age)
         else:
-            # 기본: 최근 메일 조회
-            after_date = (datetime.now() - timedelta(days=args.days)).strftime('%Y/%m/%d')
-            emails = search_emails(f"after:{after_date}", args.max, args.body)
+            results = iter_search_emails(query, args.max or None, include_body)
+
+        if args.jsonl:
+            # 한 줄에 하나씩, 파싱되는 즉시 출력
+            for email in results:
+                print(json.dumps(email, ensure_ascii=False), flush=True)
+            return
+
+        emails = list(results)
 
         if args.json:
             print(json.dumps(emails, ensure_ascii=False, indent=2))
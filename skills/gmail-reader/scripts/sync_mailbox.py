@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Gmail 로컬 미러 동기화 스크립트
+- 첫 실행: 전체 동기화 (--query 로 범위 제한 가능)
+- 이후 실행: history.list 로 변경분만 반영
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from gmail_client import get_gmail_service
+from gmail_mirror import GmailMirror, MIRROR_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gmail 로컬 미러 동기화')
+    parser.add_argument('--query', '-q', type=str,
+                        help='전체 동기화 범위 Gmail 쿼리 (예: "newer_than:1y", 생략하면 이전 범위)')
+    parser.add_argument('--full', action='store_true', help='저장된 historyId를 무시하고 전체 동기화')
+    parser.add_argument('--status', action='store_true', help='미러 상태만 출력')
+    parser.add_argument('--path', type=str, default=str(MIRROR_PATH),
+                        help=f'미러 파일 경로 (기본: {MIRROR_PATH})')
+    parser.add_argument('--json', '-j', action='store_true', help='JSON 형식 출력')
+
+    args = parser.parse_args()
+
+    mirror = GmailMirror(args.path)
+    try:
+        if args.status:
+            count = mirror.conn.execute('SELECT COUNT(*) FROM messages').fetchone()[0]
+            last_sync = mirror.last_sync
+            status = {
+                'path': str(mirror.path),
+                'messages': count,
+                'history_id': mirror.get_state('history_id'),
+                'last_sync': datetime.fromtimestamp(last_sync).isoformat() if last_sync else None,
+            }
+            if args.json:
+                print(json.dumps(status, ensure_ascii=False, indent=2))
+            else:
+                print(f"미러: {status['path']}")
+                print(f"메일 수: {status['messages']}")
+                print(f"마지막 동기화: {status['last_sync'] or '없음'}")
+            return
+
+        service = get_gmail_service()
+        result = mirror.sync(service, query=args.query, full=args.full)
+
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        else:
+            mode = '전체' if result['mode'] == 'full' else '증분'
+            print(f"{mode} 동기화 완료: 추가 {result['added']}개, "
+                  f"삭제 {result['deleted']}개, 라벨 변경 {result['relabeled']}개")
+
+    except FileNotFoundError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"동기화 실패: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        mirror.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Gmail 새 메일 감시 스크립트
+
+인증된 서비스 하나를 유지한 채 history.list 를 마지막 historyId 부터 폴링하고,
+새로 들어온 메일만 JSONL 로 출력합니다.
+- 폴링 간격은 적응형: 새 메일이 오면 --min-interval 로 줄이고, 조용하면 --max-interval 까지 늘림
+- 변경이 없을 때는 폴링 한 번에 API 호출 1회 (history.list)
+- --rules 로 규칙 파일을 주면 같은 프로세스에서 라벨 변경/읽음 처리까지 수행
+- 마지막 historyId 는 상태 파일에 저장해 재시작해도 이어서 감시
+- 일시적 오류(429, 5xx, 네트워크, 새 메일 조회 실패)는 지터를 둔 지수 백오프 뒤 다시 시도, 인증/권한 오류에만 종료
+
+규칙 파일 예시 (JSON 배열, match 의 조건은 모두 만족해야 하며 대소문자 무시 부분 일치):
+    [
+      {"name": "vercel", "match": {"from": "vercel.com"},
+       "add_labels": ["개발/알림"], "remove_labels": ["INBOX"], "mark_read": true}
+    ]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import httplib2
+from google.auth.exceptions import TransportError
+from googleapiclient.errors import HttpError
+
+sys.path.insert(0, str(Path(__file__).parent))
+from gmail_client import get_gmail_service, modify_labels, resolve_label_ids
+from gmail_batch import iter_message_results
+from search_emails import parse_email
+
+STATE_PATH = Path(os.getenv(
+    'GMAIL_WATCH_STATE', str(Path.home() / '.cache/gmail-reader/watch_state.json')
+))
+
+DEFAULT_MIN_INTERVAL = 2.0
+DEFAULT_MAX_INTERVAL = 60.0
+BACKOFF_FACTOR = 1.5
+# 일시적 오류가 이어질 때 재시도 간격 상한 (초)
+ERROR_BACKOFF_CAP = 300.0
+
+HISTORY_FIELDS = 'history(messagesAdded(message(id,labelIds))),historyId,nextPageToken'
+MATCH_FIELDS = ('from', 'to', 'subject', 'snippet')
+
+
+def load_state(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(path: Path, state: dict):
+    """상태 파일을 임시 파일에 쓴 뒤 교체 (중간에 죽어도 깨지지 않음)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(state))
+    os.replace(tmp_path, path)
+
+
+def load_rules(service, path: str) -> list:
+    """
+    규칙 파일을 읽고 라벨 이름을 ID로 미리 변환.
+
+    Raises:
+        ValueError: 규칙 형식 오류 또는 존재하지 않는 라벨
+    """
+    rules = json.loads(Path(path).expanduser().read_text())
+    if not isinstance(rules, list):
+        raise ValueError("규칙 파일은 JSON 배열이어야 합니다.")
+
+    compiled = []
+    for i, rule in enumerate(rules, 1):
+        match = {key: str(value).lower() for key, value in rule.get('match', {}).items()}
+        unknown = set(match) - set(MATCH_FIELDS)
+        if unknown:
+            raise ValueError(f"규칙 {i}: 지원하지 않는 조건 {', '.join(sorted(unknown))} "
+                             f"(가능: {', '.join(MATCH_FIELDS)})")
+
+        add_ids = resolve_label_ids(service, rule.get('add_labels'))
+        remove_ids = resolve_label_ids(service, rule.get('remove_labels'))
+        if rule.get('mark_read'):
+            remove_ids.append('UNREAD')
+        if not add_ids and not remove_ids:
+            raise ValueError(f"규칙 {i}: add_labels, remove_labels, mark_read 중 하나가 필요합니다.")
+
+        compiled.append({
+            'name': rule.get('name', f'rule-{i}'),
+            'match': match,
+            'add_label_ids': add_ids,
+            'remove_label_ids': remove_ids,
+        })
+    return compiled
+
+
+def matches(rule: dict, email: dict) -> bool:
+    return all(value in (email.get(key) or '').lower() for key, value in rule['match'].items())
+
+
+def apply_rules(service, rules: list, emails: list):
+    """
+    메일마다 걸린 규칙 이름을 email['rules'] 에 기록하고, 규칙별로 한 번의 batchModify 로 적용.
+    """
+    for email in emails:
+        email['rules'] = []
+
+    for rule in rules:
+        targets = [email for email in emails if matches(rule, email)]
+        if not targets:
+            continue
+        for result in modify_labels(
+            service, [email['id'] for email in targets], rule['add_label_ids'], rule['remove_label_ids']
+        ):
+            if not result['success']:
+                print(f"규칙 '{rule['name']}' 적용 실패: {result['error']}", file=sys.stderr)
+                break
+        else:
+            for email in targets:
+                email['rules'].append(rule['name'])
+
+
+def poll_history(service, start_id: str, label_id: str = None) -> tuple:
+    """
+    start_id 이후 추가된 메일 ID 조회.
+
+    Returns:
+        (새 메일 ID 목록 (도착 순), 최신 historyId)
+    """
+    params = {
+        'userId': 'me',
+        'startHistoryId': start_id,
+        'historyTypes': ['messageAdded'],
+        'fields': HISTORY_FIELDS,
+    }
+    if label_id:
+        params['labelId'] = label_id
+
+    added = {}
+    latest_id = start_id
+    while True:
+        result = service.users().history().list(**params).execute()
+        for record in result.get('history', []):
+            for item in record.get('messagesAdded', []):
+                message = item['message']
+                # 내가 보낸 메일/임시보관함은 제외
+                if not {'DRAFT', 'SENT'} & set(message.get('labelIds', [])):
+                    added[message['id']] = None
+        latest_id = result.get('historyId', latest_id)
+        if not result.get('nextPageToken'):
+            break
+        params['pageToken'] = result['nextPageToken']
+
+    return list(added), latest_id
+
+
+class FetchIncomplete(Exception):
+    """새 메일 일부를 조회하지 못함 (historyId 를 그대로 두고 다시 시도)"""
+
+
+def _is_transient(error) -> bool:
+    """기다렸다 다시 하면 풀릴 오류 (속도 제한, 서버 오류, 네트워크, 일부 메일 조회 실패)"""
+    if isinstance(error, FetchIncomplete):
+        return True
+    if isinstance(error, HttpError):
+        return error.resp.status in (429, 500, 502, 503, 504) or (
+            error.resp.status == 403 and 'ratelimitexceeded' in str(error).lower()
+        )
+    return isinstance(error, (OSError, httplib2.HttpLib2Error, TransportError))
+
+
+def fetch_messages(service, message_ids: list) -> list:
+    """
+    새 메일 상세 조회. 그 사이 삭제된 메일(404)만 건너뜀.
+
+    Raises:
+        FetchIncomplete: 그 밖의 이유로 끝내 조회하지 못한 메일이 있음
+    """
+    messages = []
+    failed = []
+    for result in iter_message_results(service, message_ids):
+        if result.ok:
+            messages.append(result.response)
+        elif isinstance(result.error, HttpError) and result.error.resp.status == 404:
+            print(f"메일 {result.key} 이(가) 삭제되어 건너뜁니다.", file=sys.stderr)
+        else:
+            failed.append(result)
+    if failed:
+        raise FetchIncomplete(
+            f"메일 {len(failed)}건 조회 실패 (첫 오류 {failed[0].key}: {failed[0].error})"
+        )
+    return messages
+
+
+def watch(service, state_path: Path, label_id: str = 'INBOX', rules: list = None,
+          min_interval: float = DEFAULT_MIN_INTERVAL, max_interval: float = DEFAULT_MAX_INTERVAL,
+          once: bool = False):
+    """
+    새 메일을 감시하며 파싱한 메일을 하나씩 yield.
+
+    Args:
+        service: Gmail API 서비스 객체 (감시하는 동안 재사용)
+        state_path: 마지막 historyId 를 저장할 파일
+        label_id: 이 라벨이 붙은 메일만 감시 (None이면 전체)
+        rules: load_rules 로 읽은 규칙 목록
+        min_interval: 새 메일이 있을 때의 폴링 간격 (초)
+        max_interval: 조용할 때 늘어나는 최대 폴링 간격 (초)
+        once: True면 한 번만 폴링하고 종료 (cron 용)
+    """
+    state = load_state(state_path)
+    if not state.get('history_id'):
+        # 첫 실행: 지금 시점부터 감시
+        state['history_id'] = service.users().getProfile(userId='me').execute()['historyId']
+        save_state(state_path, state)
+
+    interval = min_interval
+    failures = 0
+    while True:
+        try:
+            try:
+                message_ids, latest_id = poll_history(service, state['history_id'], label_id)
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+                # historyId 가 만료됨 (약 1주일 이상 중단): 현재 시점부터 다시 감시
+                print("historyId가 만료되어 현재 시점부터 다시 감시합니다.", file=sys.stderr)
+                message_ids = []
+                latest_id = service.users().getProfile(userId='me').execute()['historyId']
+
+            emails = [parse_email(detail) for detail in fetch_messages(service, message_ids)]
+            if rules and emails:
+                apply_rules(service, rules, emails)
+        except Exception as e:
+            # 인증/권한 오류 등은 기다려도 풀리지 않으므로 종료
+            if once or not _is_transient(e):
+                raise
+            failures += 1
+            delay = min(ERROR_BACKOFF_CAP, max(min_interval, 1.0) * 2 ** failures)
+            delay = random.uniform(delay / 2, delay)
+            print(f"일시적 오류, {delay:.0f}초 뒤 다시 시도합니다: {e}", file=sys.stderr)
+            time.sleep(delay)
+            continue
+        failures = 0
+
+        if message_ids:
+            yield from emails
+            interval = min_interval
+        else:
+            interval = min(interval * BACKOFF_FACTOR, max_interval)
+
+        # 출력까지 끝난 뒤에 저장해, 도중에 죽으면 같은 메일을 다시 받음
+        state['history_id'] = latest_id
+        state['last_poll'] = time.time()
+        save_state(state_path, state)
+
+        if once:
+            return
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gmail 새 메일 감시 (JSONL 출력)')
+    parser.add_argument('--label', type=str, default='INBOX',
+                        help='이 라벨의 새 메일만 감시 (기본: INBOX, "ALL"이면 전체)')
+    parser.add_argument('--rules', type=str, help='라벨 변경/읽음 처리 규칙 JSON 파일')
+    parser.add_argument('--min-interval', type=float, default=DEFAULT_MIN_INTERVAL,
+                        help=f'최소 폴링 간격 초 (기본: {DEFAULT_MIN_INTERVAL:g})')
+    parser.add_argument('--max-interval', type=float, default=DEFAULT_MAX_INTERVAL,
+                        help=f'최대 폴링 간격 초 (기본: {DEFAULT_MAX_INTERVAL:g})')
+    parser.add_argument('--state', type=str, default=str(STATE_PATH),
+                        help=f'historyId 상태 파일 (기본: {STATE_PATH})')
+    parser.add_argument('--reset', action='store_true', help='저장된 historyId를 버리고 지금부터 감시')
+    parser.add_argument('--once', action='store_true', help='한 번만 폴링하고 종료 (cron 용)')
+
+    args = parser.parse_args()
+
+    state_path = Path(args.state).expanduser()
+    if args.reset and state_path.exists():
+        state_path.unlink()
+
+    try:
+        service = get_gmail_service()
+        rules = load_rules(service, args.rules) if args.rules else None
+        label_id = None if args.label.upper() == 'ALL' else resolve_label_ids(service, [args.label])[0]
+
+        for email in watch(service, state_path, label_id, rules,
+                           args.min_interval, args.max_interval, args.once):
+            print(json.dumps(email, ensure_ascii=False), flush=True)
+
+    except KeyboardInterrupt:
+        pass
+    except FileNotFoundError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"규칙 오류: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"감시 실패: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
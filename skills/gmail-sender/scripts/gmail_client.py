@@ -4,13 +4,13 @@ Gmail API Client - OAuth2 인증 및 API 연결 관리 (발송 권한 포함)
 """
 
 import os
-import pickle
 from pathlib import Path
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 
+from google_quota import govern
+from google_token_store import load_token, needs_refresh, save_token
+
 # Gmail API 스코프 (읽기 + 발송)
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',
@@ -23,44 +23,58 @@ CREDS_DIR = Path(os.getenv('GMAIL_CREDS_DIR', str(Path.home() / '.claude/.creds'
 CREDENTIALS_FILE = CREDS_DIR / 'oauth_client.json'
 TOKEN_FILE = CREDS_DIR / 'gmail_send_token.pickle'  # 발송용 별도 토큰
 
+# 프로세스 안에서 재사용하는 서비스 객체 (토큰 파일이 바뀌면 다시 생성)
+_service_cache = {}
+
+
+def _token_key():
+    """토큰 파일 상태 (경로, 수정 시각) - 없으면 None"""
+    try:
+        return str(TOKEN_FILE), TOKEN_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
 
 def get_gmail_service():
     """
     Gmail API 서비스 객체 반환.
     첫 실행 시 브라우저에서 OAuth2 인증 필요.
+
+    프로세스당 한 번만 토큰을 읽고 서비스를 만들며, 이후 호출은 캐시된 객체를 돌려줍니다.
+    discovery 문서는 라이브러리에 포함된 정적 JSON을 씁니다 (네트워크 조회 없음).
+    토큰 갱신은 여러 프로세스 중 하나만 하고 나머지는 저장된 결과를 씁니다 (google_token_store.py).
     """
-    creds = None
+    cache_key = _token_key()
+    cached = _service_cache.get(cache_key)
+    if cached and not needs_refresh(cached[0]):
+        return cached[1]
 
-    # 저장된 토큰 확인
-    if TOKEN_FILE.exists():
-        with open(TOKEN_FILE, 'rb') as token:
-            creds = pickle.load(token)
+    # 저장된 토큰 확인 (만료 임박 시 갱신 후 저장)
+    creds = load_token(TOKEN_FILE)
 
-    # 토큰이 없거나 만료된 경우
+    # 토큰이 없거나 갱신할 수 없는 경우
     if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            # 토큰 갱신
-            creds.refresh(Request())
-        else:
-            # 새로운 인증 필요
-            if not CREDENTIALS_FILE.exists():
-                raise FileNotFoundError(
-                    f"OAuth credentials 파일이 없습니다: {CREDENTIALS_FILE}\n"
-                    "Google Cloud Console에서 OAuth 2.0 클라이언트 ID를 생성하고\n"
-                    "oauth_client.json을 다운로드하여 위 경로에 저장하세요."
-                )
-
-            flow = InstalledAppFlow.from_client_secrets_file(
-                str(CREDENTIALS_FILE), SCOPES
+        # 새로운 인증 필요
+        if not CREDENTIALS_FILE.exists():
+            raise FileNotFoundError(
+                f"OAuth credentials 파일이 없습니다: {CREDENTIALS_FILE}\n"
+                "Google Cloud Console에서 OAuth 2.0 클라이언트 ID를 생성하고\n"
+                "oauth_client.json을 다운로드하여 위 경로에 저장하세요."
             )
-            creds = flow.run_local_server(port=0)
+
+        flow = InstalledAppFlow.from_client_secrets_file(
+            str(CREDENTIALS_FILE), SCOPES
+        )
+        creds = flow.run_local_server(port=0)
 
         # 토큰 저장
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(creds, token)
+        save_token(TOKEN_FILE, creds)
 
     # Gmail API 서비스 생성
-    service = build('gmail', 'v1', credentials=creds)
+    service = govern(build('gmail', 'v1', credentials=creds, static_discovery=True, cache_discovery=False),
+                     'gmail', creds)
+    _service_cache.clear()
+    _service_cache[_token_key()] = (creds, service)
     return service
 
 
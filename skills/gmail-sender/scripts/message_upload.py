@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+MIME 메시지 스풀링 + Gmail 업로드
+
+첨부파일을 메모리에 통째로 올리지 않도록 MIME 메시지를 직접 조립해
+SpooledTemporaryFile 에 기록하고, messages().send 의 media_body 로 업로드합니다.
+- 첨부파일은 57의 배수 바이트씩 읽어 76자 줄 단위 base64로 바로 기록
+- 메시지 전체를 다시 base64로 감싸지 않음 (message/rfc822 원문 그대로 업로드)
+- 큰 메시지는 resumable 업로드: 청크 단위 전송, 끊기면 받은 위치부터 이어서 전송
+"""
+
+import base64
+import mimetypes
+import os
+import uuid
+from email import headerregistry, policy
+from email.message import EmailMessage
+from tempfile import SpooledTemporaryFile
+
+from googleapiclient.http import MediaIoBaseUpload
+
+# 이 크기까지는 메모리, 넘으면 임시 파일로 넘어감
+SPOOL_MAX_MEMORY = 1024 * 1024
+# base64 한 줄(76자)이 57바이트이므로 57의 배수로 읽음
+READ_SIZE = 57 * 1024
+# resumable 업로드 청크 크기 (256KB의 배수)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# 이보다 큰 메시지만 resumable 업로드 (작으면 한 번의 요청으로 전송)
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+# resumable 청크 재시도 횟수 (세션 URI 로 보내므로 다시 보내도 메일은 한 번만 발송됨)
+UPLOAD_RETRIES = 5
+
+CRLF = b'\r\n'
+# 비구조 헤더(제목 등)를 접을 때 쓰는 정책 (email.header.Header 인코딩, CRLF 줄바꿈)
+HEADER_POLICY = policy.compat32.clone(linesep='\r\n')
+
+
+def _fold_header(name: str, value) -> bytes:
+    """
+    헤더 한 줄을 RFC 2047/2231 인코딩해 접어서 직렬화.
+
+    policy.SMTP 는 긴 비ASCII 제목을 접을 때 encoded-word 경계의 공백을 빠뜨리므로
+    (받는 쪽에서 단어가 붙어 보임) 비구조 헤더는 email.header.Header 로 인코딩하는
+    compat32 방식으로 접습니다. 주소/파라미터 헤더는 policy.SMTP 가 구조를 지켜 접습니다.
+    """
+    if isinstance(value, headerregistry.UnstructuredHeader):
+        return HEADER_POLICY.fold_binary(name, str(value))
+    return policy.SMTP.fold_binary(name, value)
+
+
+def _header_block(headers: EmailMessage) -> bytes:
+    """헤더를 RFC 2047/2231 인코딩해 빈 줄까지 직렬화"""
+    return b''.join(_fold_header(name, value) for name, value in headers.items()) + CRLF
+
+
+def _write_base64(fp, data: bytes):
+    fp.write(base64.encodebytes(data).replace(b'\n', CRLF))
+
+
+def _write_file_base64(fp, path: str):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                break
+            _write_base64(fp, chunk)
+
+
+def write_message(fp, to: str, subject: str, body: str, sender: str = None, attachments: list = None) -> int:
+    """
+    multipart/mixed MIME 메시지를 파일 객체에 기록.
+
+    Args:
+        fp: 바이너리 쓰기 가능한 파일 객체
+        to: 수신자
+        subject: 제목
+        body: 본문 (text/plain, UTF-8)
+        sender: 발신자 (생략 가능)
+        attachments: 첨부 파일 경로 리스트 (없는 파일은 건너뜀)
+
+    Returns:
+        기록한 바이트 수
+    """
+    start = fp.tell()
+    boundary = f'=_{uuid.uuid4().hex}'
+
+    headers = EmailMessage(policy=policy.SMTP)
+    headers['To'] = to
+    headers['Subject'] = subject
+    if sender:
+        headers['From'] = sender
+    headers['MIME-Version'] = '1.0'
+    headers['Content-Type'] = f'multipart/mixed; boundary="{boundary}"'
+    fp.write(_header_block(headers))
+
+    part = EmailMessage(policy=policy.SMTP)
+    part['Content-Type'] = 'text/plain; charset="utf-8"'
+    part['Content-Transfer-Encoding'] = 'base64'
+    fp.write(f'--{boundary}'.encode() + CRLF + _header_block(part))
+    _write_base64(fp, body.encode('utf-8'))
+
+    for file_path in attachments or []:
+        if not os.path.exists(file_path):
+            continue
+        content_type, _ = mimetypes.guess_type(file_path)
+        part = EmailMessage(policy=policy.SMTP)
+        part['Content-Type'] = content_type or 'application/octet-stream'
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.add_header('Content-Disposition', 'attachment', filename=os.path.basename(file_path))
+        fp.write(f'--{boundary}'.encode() + CRLF + _header_block(part))
+        _write_file_base64(fp, file_path)
+
+    fp.write(f'--{boundary}--'.encode() + CRLF)
+    return fp.tell() - start
+
+
+def spool_message(*args, **kwargs):
+    """
+    write_message 결과를 SpooledTemporaryFile 에 담아 반환 (읽기 위치는 처음).
+    닫는 것은 호출하는 쪽 책임입니다.
+    """
+    spool = SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    try:
+        write_message(spool, *args, **kwargs)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+class ChunkedUpload(MediaIoBaseUpload):
+    """
+    청크를 bytes 로 읽어 보내는 업로드.
+
+    MediaIoBaseUpload 는 청크를 스트림 조각으로 넘기는데, 5xx 후 재시도하면 이미 읽힌
+    조각을 다시 보내 본문이 비어 버립니다. bytes 로 읽으면 재시도해도 같은 청크가 전송되고,
+    메모리는 여전히 청크 하나 크기입니다.
+    """
+
+    def has_stream(self):
+        return False
+
+
+def upload_message(service, fp, size: int = None, progress=None) -> dict:
+    """
+    스풀된 MIME 메시지를 messages().send 로 업로드.
+
+    RESUMABLE_THRESHOLD 보다 크면 UPLOAD_CHUNK_SIZE 단위 resumable 업로드를 쓰며,
+    청크 전송이 실패하면 서버가 받은 위치를 확인해 거기서부터 다시 보냅니다.
+    한 번에 보내는 작은 메시지는 재시도하지 않습니다: messages.send 는 멱등이 아니어서
+    5xx나 끊긴 연결 뒤에 다시 보내면 같은 메일이 두 번 갈 수 있습니다 (재시도 여부는 호출자가 판단).
+
+    Args:
+        service: Gmail API 서비스 객체
+        fp: 처음 위치로 되감긴 메시지 파일 객체
+        size: 메시지 크기 (생략하면 fp 에서 계산)
+        progress: 청크마다 호출할 콜백 (보낸 바이트, 전체 바이트)
+
+    Returns:
+        messages().send 응답 (id, threadId, labelIds)
+    """
+    if size is None:
+        size = fp.seek(0, os.SEEK_END)
+        fp.seek(0)
+
+    resumable = size > RESUMABLE_THRESHOLD
+    media = ChunkedUpload(
+        fp,
+        mimetype='message/rfc822',
+        chunksize=UPLOAD_CHUNK_SIZE if resumable else -1,
+        resumable=resumable,
+    )
+    request = service.users().messages().send(userId='me', body={}, media_body=media)
+    if not resumable:
+        return request.execute()
+
+    response = None
+    while response is None:
+        status, response = request.next_chunk(num_retries=UPLOAD_RETRIES)
+        if status and progress:
+            progress(status.resumable_progress, status.total_size)
+    if progress:
+        progress(size, size)
+    return response
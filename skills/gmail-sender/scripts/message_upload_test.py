@@ -0,0 +1,53 @@
+import unittest
+import io
+import os
+import tempfile
+from email import message_from_bytes, policy
+from message_upload import write_message
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestWriteMessage(unittest.TestCase):
+
+    def parse(self, **kwargs):
+        """Helper to write a message and parse it back"""
+        fp = io.BytesIO()
+        write_message(fp, **kwargs)
+        return message_from_bytes(fp.getvalue(), policy=policy.default)
+
+    def test_long_korean_subject_round_trip(self):
+        """Folded encoded-words decode back to the original subject, spaces included"""
+        subject = '한글 제목 입니다 아주 긴 제목 ' * 3
+        message = self.parse(to='a@example.com', subject=subject, body='본문')
+        self.assertEqual(str(message['Subject']), subject)
+
+    def test_header_lines_use_crlf(self):
+        """Folded header lines end in CRLF like the rest of the message"""
+        fp = io.BytesIO()
+        write_message(fp, to='a@example.com', subject='한글 제목 ' * 10, body='본문')
+        headers = fp.getvalue().split(b'\r\n\r\n', 1)[0]
+        self.assertNotIn(b'\n', headers.replace(b'\r\n', b''))
+
+    def test_korean_display_name_keeps_address(self):
+        """Address headers keep the addr-spec outside the encoded display name"""
+        message = self.parse(to='홍길동 담당자님 <hong@example.com>', subject='제목', body='본문')
+        self.assertEqual(message['To'].addresses[0].display_name, '홍길동 담당자님')
+        self.assertEqual(message['To'].addresses[0].addr_spec, 'hong@example.com')
+
+    def test_body_and_attachment_round_trip(self):
+        """Body and a Korean-named attachment decode back to their original content"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, '보고서 최종본.txt')
+            data = os.urandom(200 * 1024)
+            with open(path, 'wb') as f:
+                f.write(data)
+            message = self.parse(to='a@example.com', subject='제목', body='안녕하세요', attachments=[path])
+
+        body, attachment = list(message.iter_parts())
+        self.assertEqual(body.get_content(), '안녕하세요')
+        self.assertEqual(attachment.get_filename(), '보고서 최종본.txt')
+        self.assertEqual(attachment.get_payload(decode=True), data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Gmail 대량 발송 (메일 머지) 스크립트
+
+수신자 목록(CSV/JSONL)과 제목/본문 템플릿으로 수신자별 메일을 만들어 발송합니다.
+- 인증/서비스 생성은 한 번만, 모든 메일을 같은 서비스로 발송
+- 메시지 렌더링(템플릿 치환 + MIME 조립)은 스레드 풀에서 미리 진행
+- 토큰 버킷으로 발송 속도 제한 (Gmail 사용자당 초당 250 quota unit, send 1회 100 unit)
+- 발송 결과를 JSONL 로그에 한 줄씩 기록, 다시 실행하면 이미 보낸 수신자는 건너뜀
+- 서버가 처리했을 수도 있는 실패(5xx, 응답 전에 끊긴 연결)는 다시 보내지 않고 'unknown' 으로 기록
+  (messages.send 는 멱등이 아니어서 다시 보내면 같은 메일이 여러 번 갈 수 있음)
+
+템플릿은 string.Template 문법 ($name, ${company}) 이며, 수신자 행의 열 이름을 씁니다.
+수신자 주소 열은 email 또는 to 입니다.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from string import Template
+
+import httplib2
+from google.auth.exceptions import TransportError
+from googleapiclient.errors import HttpError
+
+sys.path.insert(0, str(Path(__file__).parent))
+from gmail_client import get_gmail_service, get_user_email
+from message_upload import spool_message, upload_message
+
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 5
+DEFAULT_WORKERS = 4
+MAX_RETRIES = 5
+ADDRESS_COLUMNS = ('email', 'to')
+
+
+class TokenBucket:
+    """초당 rate 개, 최대 burst 개까지 몰아 쓸 수 있는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rate: float, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def load_recipients(path: str) -> list:
+    """
+    CSV(헤더 필수) 또는 JSONL 수신자 목록 읽기.
+
+    같은 주소(대소문자 무시)가 여러 번 나오면 첫 행만 남기고 나머지는 경고 후 제외합니다.
+
+    Raises:
+        ValueError: 주소 열(email/to)이 없는 행
+    """
+    path = Path(path).expanduser()
+    with open(path, encoding='utf-8-sig') as f:
+        if path.suffix.lower() in ('.jsonl', '.ndjson'):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    recipients = {}
+    for i, row in enumerate(rows, 1):
+        address = next((row[col] for col in ADDRESS_COLUMNS if row.get(col)), None)
+        if not address:
+            raise ValueError(f"{i}번째 수신자에 email/to 열이 없습니다: {row}")
+        row['_to'] = address.strip()
+        first = recipients.setdefault(row['_to'].lower(), (i, row))[0]
+        if first != i:
+            print(f"{i}번째 수신자 {row['_to']} 는 {first}번째와 중복이라 제외합니다.", file=sys.stderr)
+    return [row for _, row in recipients.values()]
+
+
+def load_log(path: Path, retry_unknown: bool = False) -> set:
+    """
+    발송 로그에서 건너뛸 수신자 주소 집합 읽기 (마지막 줄이 잘려 있어도 무시).
+
+    보낸 수신자와, retry_unknown 이 아니면 발송 여부를 알 수 없는('unknown') 수신자도 포함합니다.
+    """
+    done = {'sent'} if retry_unknown else {'sent', 'unknown'}
+    sent = set()
+    if not path.exists():
+        return sent
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('status') in done:
+                sent.add(entry['to'].lower())
+    return sent
+
+
+def render(row: dict, subject: Template, body: Template) -> tuple:
+    """
+    수신자 행으로 템플릿 치환.
+
+    Raises:
+        KeyError: 템플릿 변수가 행에 없음
+    """
+    values = {key: '' if value is None else str(value) for key, value in row.items()}
+    return subject.substitute(values), body.substitute(values)
+
+
+def _is_retryable(error) -> bool:
+    """요청이 처리되지 않은 것이 확실한 일시적 실패 (다시 보내도 중복 발송 없음)"""
+    if isinstance(error, HttpError):
+        # 속도 제한 응답은 서버가 메일을 받지 않은 것
+        return error.resp.status == 429 or (
+            error.resp.status == 403 and 'ratelimitexceeded' in str(error).lower() and not _is_quota_exhausted(error)
+        )
+    # 연결 전 실패: 연결 거부, 주소 조회 실패, 토큰 갱신 실패
+    return isinstance(error, (ConnectionRefusedError, httplib2.ServerNotFoundError, TransportError))
+
+
+def _is_ambiguous(error) -> bool:
+    """서버가 메일을 이미 보냈을 수도 있는 실패 (5xx, 요청 전송 뒤 끊긴 연결, 타임아웃)"""
+    if isinstance(error, HttpError):
+        return error.resp.status >= 500
+    return isinstance(error, (OSError, httplib2.HttpLib2Error))
+
+
+def _is_quota_exhausted(error) -> bool:
+    """일일 발송 한도 초과 (기다려도 풀리지 않음)"""
+    return isinstance(error, HttpError) and error.resp.status in (403, 429) and 'daily' in str(error).lower()
+
+
+def send_bulk(service, recipients: list, subject: str, body: str, log_path: Path,
+              attachments: list = None, rate: float = DEFAULT_RATE, workers: int = DEFAULT_WORKERS,
+              retry_unknown: bool = False):
+    """
+    수신자마다 메일을 렌더링해 발송하며 결과를 하나씩 yield.
+
+    Args:
+        service: Gmail API 서비스 객체 (모든 발송에 재사용)
+        recipients: load_recipients 결과
+        subject: 제목 템플릿
+        body: 본문 템플릿
+        log_path: 발송 로그 JSONL 경로 (이미 보낸 수신자와 목록 안의 중복 주소는 건너뜀)
+        attachments: 모든 메일에 붙일 첨부 파일 경로 리스트
+        rate: 초당 최대 발송 수
+        workers: 렌더링 스레드 수
+        retry_unknown: 발송 여부를 알 수 없는('unknown') 수신자에게도 다시 보냄
+
+    Yields:
+        {'to', 'subject', 'status': 'sent'|'failed'|'unknown'|'skipped', 'id', 'error'}
+        'unknown': 서버가 처리했을 수도 있는 실패라 다시 보내지 않음 (보낸편지함 확인 필요)
+    """
+    sender = get_user_email(service)
+    subject_template, body_template = Template(subject), Template(body)
+    already_sent = load_log(log_path, retry_unknown)
+    bucket = TokenBucket(rate)
+
+    def prepare(row):
+        rendered_subject, rendered_body = render(row, subject_template, body_template)
+        spool = spool_message(row['_to'], rendered_subject, rendered_body, sender, attachments)
+        return rendered_subject, spool
+
+    def send(row, future):
+        result = {'to': row['_to'], 'subject': None, 'status': 'failed', 'id': None, 'error': None}
+        try:
+            result['subject'], spool = future.result()
+        except KeyError as e:
+            result['error'] = f"템플릿 변수 없음: {e}"
+            return result
+        except ValueError as e:
+            result['error'] = f"템플릿 오류: {e}"
+            return result
+
+        with spool:
+            for attempt in range(MAX_RETRIES + 1):
+                bucket.acquire()
+                try:
+                    response = upload_message(service, spool)
+                    result.update(status='sent', id=response.get('id'))
+                    break
+                except Exception as e:
+                    if _is_quota_exhausted(e):
+                        raise
+                    if attempt == MAX_RETRIES or not _is_retryable(e):
+                        result['error'] = str(e)
+                        if _is_ambiguous(e):
+                            result['status'] = 'unknown'
+                        break
+                    spool.seek(0)
+                    time.sleep(min(2 ** attempt, 32) + random.random())
+        return result
+
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    if log_path.exists() and log_path.stat().st_size:
+        with open(log_path, 'rb+') as f:
+            # 기록 중 중단돼 잘린 마지막 줄 뒤에 이어 쓰지 않도록 줄바꿈 보정
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+    pending = deque()
+    queued = set()
+    try:
+        with open(log_path, 'a', encoding='utf-8') as log, ThreadPoolExecutor(max_workers=workers) as executor:
+            rows = iter(recipients)
+            while True:
+                # 렌더링은 발송보다 workers * 2 개까지 앞서 진행
+                while len(pending) < workers * 2:
+                    row = next(rows, None)
+                    if row is None:
+                        break
+                    address = row['_to'].lower()
+                    if address in already_sent or address in queued:
+                        yield {'to': row['_to'], 'subject': None, 'status': 'skipped', 'id': None, 'error': None}
+                        continue
+                    queued.add(address)
+                    pending.append((row, executor.submit(prepare, row)))
+                if not pending:
+                    break
+
+                result = send(*pending.popleft())
+                log.write(json.dumps({**result, 'at': datetime.now().isoformat(timespec='seconds')},
+                                     ensure_ascii=False) + '\n')
+                log.flush()
+                os.fsync(log.fileno())
+                if result['status'] in ('sent', 'unknown'):
+                    already_sent.add(result['to'].lower())
+                yield result
+    finally:
+        # 한도 초과 등으로 중단되면 렌더링해 둔 임시 파일 정리
+        for _, future in pending:
+            if not future.cancelled() and future.exception() is None:
+                future.result()[1].close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gmail 대량 발송 (메일 머지)')
+    parser.add_argument('--recipients', required=True, help='수신자 목록 CSV 또는 JSONL (email/to 열 필수)')
+    parser.add_argument('--subject', required=True, help='제목 템플릿 (예: "$name님, 행사 안내드립니다")')
+    parser.add_argument('--body', help='본문 템플릿')
+    parser.add_argument('--body-file', help='본문 템플릿을 파일에서 읽기')
+    parser.add_argument('--attachment', action='append', help='모든 메일에 붙일 첨부 파일 (여러 개 가능)')
+    parser.add_argument('--log', help='발송 로그 JSONL (기본: <수신자 파일>.sendlog.jsonl)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'초당 최대 발송 수 (기본: {DEFAULT_RATE:g})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'렌더링 스레드 수 (기본: {DEFAULT_WORKERS})')
+    parser.add_argument('--retry-unknown', action='store_true',
+                        help='로그에 발송 여부 불명(unknown)으로 남은 수신자에게도 다시 발송 (보낸편지함 확인 후)')
+    parser.add_argument('--dry-run', action='store_true', help='발송 없이 첫 메일 미리보기와 대상 수만 출력')
+    parser.add_argument('--yes', '-y', action='store_true', help='확인 없이 바로 발송')
+
+    args = parser.parse_args()
+
+    body = args.body
+    if args.body_file:
+        with open(args.body_file, 'r', encoding='utf-8') as f:
+            body = f.read()
+    if body is None:
+        print("--body 또는 --body-file 이 필요합니다.", file=sys.stderr)
+        sys.exit(1)
+
+    attachments = args.attachment or []
+    for att in attachments:
+        if not os.path.exists(att):
+            print(f"첨부 파일을 찾을 수 없습니다: {att}", file=sys.stderr)
+            sys.exit(1)
+
+    try:
+        recipients = load_recipients(args.recipients)
+    except (OSError, ValueError) as e:
+        print(f"수신자 목록 오류: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    log_path = Path(args.log or f"{args.recipients}.sendlog.jsonl").expanduser()
+    already_sent = load_log(log_path, args.retry_unknown)
+    targets = [row for row in recipients if row['_to'].lower() not in already_sent]
+
+    # 미리보기 출력
+    print("=" * 50)
+    print("대량 발송 미리보기")
+    print("=" * 50)
+    print(f"수신자: {len(recipients)}명 (이미 발송 {len(recipients) - len(targets)}명, 남은 대상 {len(targets)}명)")
+    print(f"발송 속도: 초당 {args.rate:g}통 (예상 {len(targets) / args.rate / 60:.1f}분)")
+    print(f"로그: {log_path}")
+    if targets:
+        try:
+            preview_subject, preview_body = render(targets[0], Template(args.subject), Template(body))
+        except (KeyError, ValueError) as e:
+            print(f"템플릿 오류: {e}", file=sys.stderr)
+            sys.exit(1)
+        print("-" * 50)
+        print(f"To: {targets[0]['_to']}")
+        print(f"Subject: {preview_subject}")
+        print("-" * 50)
+        print(preview_body)
+    print("=" * 50)
+
+    if args.dry_run:
+        print("\n[Dry Run] 실제 발송되지 않았습니다.")
+        return
+    if not targets:
+        print("보낼 대상이 없습니다.")
+        return
+
+    if not args.yes:
+        confirm = input(f"\n{len(targets)}명에게 발송하시겠습니까? (y/N): ").strip().lower()
+        if confirm != 'y':
+            print("발송이 취소되었습니다.")
+            return
+
+    try:
+        service = get_gmail_service()
+        counts = {'sent': 0, 'failed': 0, 'unknown': 0, 'skipped': 0}
+        for result in send_bulk(service, recipients, args.subject, body, log_path,
+                                attachments, args.rate, args.workers, args.retry_unknown):
+            counts[result['status']] += 1
+            if result['status'] == 'sent':
+                print(f"  [{counts['sent']}/{len(targets)}] {result['to']}")
+            elif result['status'] == 'failed':
+                print(f"  실패: {result['to']} - {result['error']}", file=sys.stderr)
+            elif result['status'] == 'unknown':
+                print(f"  발송 여부 불명 (다시 보내지 않음): {result['to']} - {result['error']}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("\n중단되었습니다. 다시 실행하면 남은 대상부터 이어서 발송합니다.", file=sys.stderr)
+        sys.exit(130)
+    except Exception as e:
+        print(f"\n발송 중단: {e}", file=sys.stderr)
+        print("다시 실행하면 남은 대상부터 이어서 발송합니다.", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"\n발송 완료: 성공 {counts['sent']}통, 실패 {counts['failed']}통")
+    if counts['unknown']:
+        print(f"발송 여부 불명 {counts['unknown']}통: 보낸편지함을 확인한 뒤 필요하면 --retry-unknown 으로 다시 보내세요.")
+    if counts['failed'] or counts['unknown']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,54 +5,32 @@ Gmail 이메일 발송 스크립트
 
 import argparse
 import base64
-import mimetypes
 import os
 import sys
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
 from gmail_client import get_gmail_service, get_user_email
+from message_upload import spool_message, upload_message
 
 
 def create_message(to: str, subject: str, body: str, sender: str = None, attachments: list = None) -> dict:
-    """이메일 메시지 생성"""
-    message = MIMEMultipart()
-    message['to'] = to
-    message['subject'] = subject
-    if sender:
-        message['from'] = sender
-
-    # 본문 추가 (UTF-8)
-    msg_body = MIMEText(body, 'plain', 'utf-8')
-    message.attach(msg_body)
-
-    # 첨부 파일 추가
-    if attachments:
-        for file_path in attachments:
-            if os.path.exists(file_path):
-                content_type, _ = mimetypes.guess_type(file_path)
-                if content_type is None:
-                    content_type = 'application/octet-stream'
-                main_type, sub_type = content_type.split('/', 1)
-
-                with open(file_path, 'rb') as f:
-                    attachment = MIMEBase(main_type, sub_type)
-                    attachment.set_payload(f.read())
-                    encoders.encode_base64(attachment)
-                    filename = os.path.basename(file_path)
-                    attachment.add_header('Content-Disposition', 'attachment', filename=filename)
-                    message.attach(attachment)
-
-    # base64 인코딩
-    raw = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+    """
+    이메일 메시지 생성 (messages().send body 용 raw 형식).
+
+    메시지 전체를 메모리에 올리므로 작은 메시지에만 쓰세요.
+    첨부파일이 큰 경우 send_email 이 쓰는 spool_message + upload_message 를 사용합니다.
+    """
+    with spool_message(to, subject, body, sender, attachments) as spool:
+        raw = base64.urlsafe_b64encode(spool.read()).decode('utf-8')
     return {'raw': raw}
 
 
-def send_email(service, to: str, subject: str, body: str, dry_run: bool = False, attachments: list = None) -> dict:
+def send_email(service, to: str, subject: str, body: str, dry_run: bool = False, attachments: list = None,
+               progress=None) -> dict:
     """
     이메일 발송
 
+    MIME 메시지는 SpooledTemporaryFile 에 조립해 media 업로드로 보냅니다.
+    첨부파일이 커도 메모리 사용량은 버퍼 크기 수준이며, 큰 메시지는 끊겨도 이어서 업로드합니다.
+
     Args:
         service: Gmail API 서비스 객체
         to: 수신자 이메일
@@ -60,12 +38,12 @@ def send_email(service, to: str, subject: str, body: str, dry_run: bool = False,
         body: 본문
         dry_run: True면 실제 발송 안 함 (미리보기)
         attachments: 첨부 파일 경로 리스트
+        progress: 업로드 진행 콜백 (보낸 바이트, 전체 바이트)
 
     Returns:
         발송 결과 (message id 등)
     """
     sender = get_user_email(service)
-    message = create_message(to, subject, body, sender, attachments)
 
     if dry_run:
         return {
@@ -76,7 +54,8 @@ def send_email(service, to: str, subject: str, body: str, dry_run: bool = False,
             'body': body
         }
 
-    result = service.users().messages().send(userId='me', body=message).execute()
+    with spool_message(to, subject, body, sender, attachments) as spool:
+        result = upload_message(service, spool, progress=progress)
     return {
         'status': 'sent',
         'id': result.get('id'),
@@ -149,7 +128,12 @@ def main():
 
     # 발송
     try:
-        result = send_email(service, args.to, args.subject, body, attachments=attachments)
+        def progress(sent, total):
+            if total > 1024 * 1024:
+                print(f"\r   업로드 {sent / total:.0%} ({sent / (1024 * 1024):.1f}/{total / (1024 * 1024):.1f}MB)",
+                      end='', file=sys.stderr, flush=True)
+
+        result = send_email(service, args.to, args.subject, body, attachments=attachments, progress=progress)
         print(f"\n발송 완료!")
         print(f"   Message ID: {result.get('id')}")
     except Exception as e:
@@ -0,0 +1,292 @@
+"""
+Google API Quota Governor
+
+Coordinates request rate for every process on this machine that calls the
+same API with the same project's credentials.
+
+- Token bucket per (api, project) kept in a small state file under
+  ~/.cache/google-quota and updated under flock, so scripts running in
+  parallel draw from one budget instead of each assuming the whole quota.
+- Throttling responses (429, 403 rateLimitExceeded) are retried after
+  Retry-After when the server sends one. The pause is also written to the
+  shared bucket so other processes hold off too. Otherwise retries use
+  full-jitter exponential backoff. 5xx responses are retried for
+  idempotent methods only.
+- In-flight requests per process are capped by an AIMD limit: it grows by
+  1/limit per success and halves (at most once a second) on throttling.
+
+Wrap a discovery client with govern(service, api, credentials). Batch calls
+are charged one token per request inside the batch.
+
+The same module ships as google_api/quota.py in every skill with a
+google_api package and as scripts/google_quota.py next to standalone scripts.
+"""
+
+import email.utils
+import fcntl
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+QUOTA_DIR = Path(os.getenv('GOOGLE_QUOTA_DIR', str(Path.home() / '.cache/google-quota')))
+
+# (requests per second, burst) per user and project, kept under the published quotas
+QUOTAS = {
+    'gmail': (40.0, 80),     # 250 quota units/s per user; messages.get costs 5
+    'calendar': (10.0, 20),  # 600 queries/min per user
+    'sheets': (1.0, 30),     # 60 read requests/min per user
+}
+DEFAULT_QUOTA = (10.0, 20)
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 32.0
+# Longer Retry-After values (daily quotas) are returned to the caller right away
+MAX_RETRY_AFTER = 60.0
+
+INITIAL_CONCURRENCY = 8
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 32
+DECREASE_INTERVAL = 1.0
+
+RATE_LIMIT_REASONS = (b'rateLimitExceeded', b'userRateLimitExceeded')
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE'}
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+
+_BATCH_URI = re.compile(r'/batch(?:[/?]|$)')
+_BATCH_PART = re.compile(r'^Content-ID:', re.MULTILINE | re.IGNORECASE)
+
+
+class SharedTokenBucket:
+    """Token bucket whose state lives in a file shared by all processes."""
+
+    def __init__(self, path: Path, rate: float, burst: int):
+        self.path = path
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._lock = threading.Lock()
+
+    def _update(self, change):
+        """Run change(state, now) on the shared state under both locks and save it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    state = json.loads(os.read(fd, 4096) or b'{}')
+                except ValueError:
+                    state = {}
+                now = time.time()
+                elapsed = max(0.0, now - state.get('updated', now))
+                state['tokens'] = min(self.capacity, state.get('tokens', self.capacity) + elapsed * self.rate)
+                state['updated'] = now
+                result = change(state, now)
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, json.dumps(state).encode())
+                return result
+            finally:
+                os.close(fd)
+
+    def acquire(self, cost: int = 1):
+        """
+        Block until the shared bucket can pay for cost requests.
+
+        A cost above the burst size is allowed once the bucket is full; the
+        balance goes negative and later callers wait for it to refill.
+        """
+        needed = min(cost, self.capacity)
+
+        def take(state, now):
+            blocked_until = state.get('blocked_until', 0)
+            if blocked_until > now:
+                return blocked_until - now
+            if state['tokens'] >= needed:
+                state['tokens'] -= cost
+                return 0
+            return (needed - state['tokens']) / self.rate
+
+        while True:
+            wait = self._update(take)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def block(self, seconds: float):
+        """Stop every process from drawing tokens for the next seconds."""
+        def pause(state, now):
+            state['blocked_until'] = max(state.get('blocked_until', 0), now + seconds)
+        self._update(pause)
+
+
+class AIMDLimiter:
+    """Concurrency limit: additive increase on success, multiplicative decrease on throttling."""
+
+    def __init__(self, initial: int = INITIAL_CONCURRENCY, minimum: int = MIN_CONCURRENCY,
+                 maximum: int = MAX_CONCURRENCY):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.active = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.active >= int(self.limit):
+                self._cond.wait()
+            self.active += 1
+
+    def release(self, throttled: bool = None):
+        """Free a slot; throttled=True halves the limit, False grows it, None leaves it."""
+        with self._cond:
+            self.active -= 1
+            now = time.monotonic()
+            if throttled:
+                # Requests that were already in flight often fail together: halve once
+                if now - self._last_decrease >= DECREASE_INTERVAL:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self._last_decrease = now
+            elif throttled is not None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+class Governor:
+    """Shared bucket plus per-process concurrency limit for one (api, project)."""
+
+    def __init__(self, api: str, project: str):
+        rate, burst = QUOTAS.get(api, DEFAULT_QUOTA)
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', f'{api}-{project}')
+        self.api = api
+        self.bucket = SharedTokenBucket(QUOTA_DIR / f'{name}.json', rate, burst)
+        self.limiter = AIMDLimiter()
+
+    def wait(self, cost: int = 1):
+        """Draw tokens for requests sent outside GovernedHttp (e.g. streamed downloads)."""
+        self.bucket.acquire(cost)
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(api: str, project: str) -> Governor:
+    with _governors_lock:
+        key = (api, project)
+        if key not in _governors:
+            _governors[key] = Governor(api, project)
+        return _governors[key]
+
+
+def project_key(credentials) -> str:
+    """Project that the credentials bill quota to (best effort)."""
+    project = getattr(credentials, 'quota_project_id', None) or getattr(credentials, 'project_id', None)
+    if not project:
+        # OAuth client IDs start with the project number: 1234567890-abc.apps.googleusercontent.com
+        project = (getattr(credentials, 'client_id', None) or '').split('-', 1)[0]
+    return project or 'default'
+
+
+def _content_bytes(content) -> bytes:
+    if isinstance(content, bytes):
+        return content
+    return str(content or '').encode()
+
+
+def is_throttled(status: int, content) -> bool:
+    if status == 429:
+        return True
+    return status == 403 and any(reason in _content_bytes(content) for reason in RATE_LIMIT_REASONS)
+
+
+def retry_after(resp):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = resp.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def request_cost(uri: str, body) -> int:
+    """Number of API requests a call represents (the parts of a batch call)."""
+    if body and _BATCH_URI.search(uri):
+        text = body if isinstance(body, str) else _content_bytes(body).decode('latin-1')
+        return max(1, len(_BATCH_PART.findall(text)))
+    return 1
+
+
+class GovernedHttp:
+    """httplib2-compatible transport that routes every request through a Governor."""
+
+    def __init__(self, http, governor: Governor):
+        self.http = http
+        self.governor = governor
+
+    def __getattr__(self, name):
+        # credentials, timeout, redirect_codes, ... come from the wrapped transport
+        return getattr(self.http, name)
+
+    def with_transport(self, http):
+        """Same governor over another transport (one per thread for batch calls)."""
+        return GovernedHttp(http, self.governor)
+
+    def _retry_delay(self, resp, content, method: str, attempt: int):
+        wait = None
+        if is_throttled(resp.status, content):
+            if b'daily' in _content_bytes(content).lower():
+                return None
+            wait = retry_after(resp)
+            if wait is not None:
+                if wait > MAX_RETRY_AFTER:
+                    return None
+                self.governor.bucket.block(wait)
+        elif not (resp.status in RETRYABLE_STATUSES and method.upper() in IDEMPOTENT_METHODS):
+            return None
+        backoff = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        return max(backoff, wait or 0)
+
+    def request(self, uri, method='GET', body=None, headers=None, *args, **kwargs):
+        cost = request_cost(uri, body)
+        for attempt in range(MAX_RETRIES + 1):
+            self.governor.bucket.acquire(cost)
+            self.governor.limiter.acquire()
+            try:
+                resp, content = self.http.request(uri, method, body, headers, *args, **kwargs)
+            except BaseException:
+                self.governor.limiter.release()
+                raise
+            self.governor.limiter.release(is_throttled(resp.status, content))
+
+            delay = self._retry_delay(resp, content, method, attempt) if attempt < MAX_RETRIES else None
+            if delay is None:
+                return resp, content
+            time.sleep(delay)
+
+
+def govern(service, api: str, credentials=None):
+    """
+    Route a discovery client's requests through the governor for its API and project.
+
+    Safe to call more than once. Set GOOGLE_QUOTA_DISABLE=1 to leave the client unchanged.
+
+    Returns:
+        The same service
+    """
+    if os.getenv('GOOGLE_QUOTA_DISABLE') == '1' or isinstance(service._http, GovernedHttp):
+        return service
+    credentials = credentials or getattr(service._http, 'credentials', None)
+    service._http = GovernedHttp(service._http, get_governor(api, project_key(credentials)))
+    return service
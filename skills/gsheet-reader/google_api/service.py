@@ -0,0 +1,94 @@
+"""
+Google API Service Factory
+
+Builds discovery clients once per process and reuses them.
+
+- Discovery documents come from the static copies bundled with
+  google-api-python-client (no network fetch, no discovery cache file).
+- Services are memoized per (api, version, credentials).
+- Every service's requests go through the quota governor (see quota.py).
+- Credentials are memoized per token/key file and reloaded only when the
+  file changes on disk or the token is about to expire. Refreshing is
+  coordinated across processes by the token store (see token_store.py).
+"""
+
+import threading
+from pathlib import Path
+
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+
+from .quota import govern
+from .token_store import load_token, needs_refresh
+
+_lock = threading.RLock()
+_services = {}
+_credentials = {}
+
+
+def get_service(api: str, version: str, credentials):
+    """
+    Get a memoized discovery client.
+
+    Args:
+        api: API name (e.g., 'calendar', 'sheets', 'gmail')
+        version: API version (e.g., 'v3')
+        credentials: google-auth credentials
+
+    Returns:
+        googleapiclient Resource
+    """
+    key = (api, version, id(credentials))
+    with _lock:
+        cached = _services.get(key)
+        if cached is None:
+            service = govern(build(api, version, credentials=credentials,
+                                   static_discovery=True, cache_discovery=False), api, credentials)
+            # Keep the credentials alive so id() stays unique for this entry
+            cached = _services[key] = (credentials, service)
+        return cached[1]
+
+
+def _file_key(path: Path, *extra):
+    stat = path.stat()
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size) + extra
+
+
+def load_oauth_token(token_path: str):
+    """
+    Load pickled OAuth user credentials, refreshing and saving them if they are about to expire.
+
+    Raises:
+        FileNotFoundError: If the token file does not exist.
+    """
+    token_file = Path(token_path).expanduser()
+    if not token_file.exists():
+        raise FileNotFoundError(f"Token file not found: {token_path}")
+
+    with _lock:
+        key = _file_key(token_file)
+        credentials = _credentials.get(key)
+        if credentials is None or needs_refresh(credentials):
+            credentials = load_token(token_file)
+            _credentials[_file_key(token_file)] = credentials
+        return credentials
+
+
+def load_service_account(key_file: str, scopes):
+    """
+    Load service account credentials for the given scopes.
+
+    Raises:
+        FileNotFoundError: If the key file does not exist.
+    """
+    path = Path(key_file).expanduser()
+    if not path.exists():
+        raise FileNotFoundError(f"Service account key file not found: {key_file}")
+
+    with _lock:
+        key = _file_key(path, tuple(sorted(scopes)))
+        credentials = _credentials.get(key)
+        if credentials is None:
+            credentials = _credentials[key] = service_account.Credentials.from_service_account_file(
+                str(path), scopes=scopes)
+        return credentials
@@ -0,0 +1,112 @@
+"""
+OAuth Token Store
+
+Loads and refreshes pickled OAuth user credentials safely when several
+processes share one token file.
+
+- Writes go to a temporary file in the same directory, are fsynced and then
+  renamed over the token, so readers never see a truncated pickle and
+  reading needs no lock.
+- Refreshing takes an exclusive flock on <token>.lock and re-reads the
+  token first: when many processes start right after expiry, one refreshes
+  and the rest pick up its result.
+- Tokens are refreshed REFRESH_AHEAD seconds before they expire, so a token
+  handed out here does not run out in the middle of a command.
+
+The same module ships as google_api/token_store.py in every skill with a
+google_api package and as scripts/google_token_store.py next to standalone
+scripts.
+"""
+
+import fcntl
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+REFRESH_AHEAD = 300  # seconds
+
+
+def _utcnow() -> datetime:
+    # google-auth keeps expiry as a naive UTC datetime
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def needs_refresh(credentials, refresh_ahead: float = REFRESH_AHEAD) -> bool:
+    """Whether the credentials are invalid or expire within refresh_ahead seconds."""
+    if credentials is None:
+        return True
+    if not credentials.valid:
+        return True
+    expiry = getattr(credentials, 'expiry', None)
+    return expiry is not None and expiry - _utcnow() < timedelta(seconds=refresh_ahead)
+
+
+def read_token(token_path):
+    """Unpickle the token file (None if it does not exist)."""
+    try:
+        with open(token_path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_token(token_path, credentials):
+    """Atomically replace the token file with pickled credentials."""
+    path = Path(token_path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(credentials, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def token_lock(token_path):
+    """Exclusive lock shared by every process using token_path."""
+    lock_path = Path(f'{token_path}.lock')
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_token(token_path, refresh_ahead: float = REFRESH_AHEAD):
+    """
+    Load credentials, refreshing and saving them if they are about to expire.
+
+    Credentials that cannot be refreshed (no refresh token) are returned as
+    they are; the caller decides whether to start a new authorization flow.
+
+    Args:
+        token_path: Path to the pickled credentials
+        refresh_ahead: Refresh when fewer than this many seconds remain
+
+    Returns:
+        Credentials, or None if the token file does not exist
+
+    Raises:
+        google.auth.exceptions.RefreshError: If the refresh request fails
+    """
+    credentials = read_token(token_path)
+    if not needs_refresh(credentials, refresh_ahead) or not getattr(credentials, 'refresh_token', None):
+        return credentials
+
+    with token_lock(token_path):
+        # Another process may have refreshed while we waited for the lock
+        credentials = read_token(token_path)
+        if needs_refresh(credentials, refresh_ahead) and getattr(credentials, 'refresh_token', None):
+            from google.auth.transport.requests import Request
+
+            credentials.refresh(Request())
+            save_token(token_path, credentials)
+    return credentials
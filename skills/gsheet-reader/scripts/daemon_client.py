@@ -0,0 +1,101 @@
+"""
+스킬 데몬 클라이언트
+
+스킬 스크립트 맨 앞(무거운 import 전)에서 호출하면, 스킬 데몬(skillsd.py)이 떠 있을 때
+같은 명령을 데몬에 넘기고 그 종료 코드로 바로 종료합니다.
+데몬이 없거나 요청을 받지 않으면 아무 일 없이 돌아와 평소처럼 실행됩니다.
+
+    if __name__ == '__main__':
+        from daemon_client import forward_to_daemon
+        forward_to_daemon(__file__)
+
+표준 라이브러리만 사용합니다 (이 파일 자체가 import 비용이 되지 않도록).
+같은 파일이 각 스킬의 scripts/ 에 복사되어 있으며, 원본은 skills-daemon/scripts/daemon_client.py 입니다.
+"""
+
+import array
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+from pathlib import Path
+
+SOCKET_PATH = Path(os.getenv(
+    'SKILLS_DAEMON_SOCKET', str(Path.home() / '.cache/skills-daemon/skillsd.sock')
+))
+# 데몬이 실행 중인 자식 프로세스에 설정 (다시 데몬으로 넘기지 않도록)
+CHILD_ENV = 'SKILLS_DAEMON_CHILD'
+# 1이면 데몬이 떠 있어도 항상 직접 실행
+DISABLE_ENV = 'SKILLS_DAEMON_DISABLE'
+
+
+def _connect():
+    if os.getenv(CHILD_ENV) or os.getenv(DISABLE_ENV) == '1' or not SOCKET_PATH.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(SOCKET_PATH))
+    except OSError:
+        # 데몬이 비정상 종료해 소켓 파일만 남은 경우
+        sock.close()
+        return None
+    return sock
+
+
+def _send_request(sock, script: str):
+    """요청(JSON)과 함께 stdin/stdout/stderr 파일 디스크립터를 SCM_RIGHTS 로 전달"""
+    payload = json.dumps({
+        'script': os.path.abspath(script),
+        'argv': sys.argv[1:],
+        'cwd': os.getcwd(),
+        'env': dict(os.environ),
+        'prefix': sys.prefix,
+        'encoding': getattr(sys.stdout, 'encoding', None) or 'utf-8',
+    }).encode('utf-8')
+    data = struct.pack('!I', len(payload)) + payload
+    fds = array.array('i', [0, 1, 2])
+    sent = sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)])
+    sock.sendall(data[sent:])
+
+
+def forward_to_daemon(script: str):
+    """
+    데몬에서 script 를 현재 인자로 실행하고 그 종료 코드로 종료.
+
+    데몬이 없거나 요청을 거절하면 그냥 반환합니다 (호출한 쪽에서 직접 실행).
+    """
+    sock = _connect()
+    if sock is None:
+        return
+
+    with sock:
+        try:
+            _send_request(sock, script)
+            replies = sock.makefile('r', encoding='utf-8')
+            first = json.loads(replies.readline() or '{}')
+        except (OSError, ValueError):
+            return
+        pid = first.get('pid')
+        if not pid:
+            # 다른 Python 환경, 허용되지 않은 경로 등: 직접 실행
+            return
+
+        # 데몬 쪽 프로세스는 터미널의 포그라운드 그룹이 아니므로 Ctrl-C 등을 대신 전달
+        def relay(signum, frame):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+        for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(signum, relay)
+
+        try:
+            code = json.loads(replies.readline())['exit']
+        except (OSError, ValueError, KeyError):
+            # 실행 도중 데몬 쪽 프로세스가 죽음 (이미 출력이 나갔을 수 있어 다시 실행하지 않음)
+            print("스킬 데몬 실행이 비정상 종료되었습니다.", file=sys.stderr)
+            code = 1
+    sys.exit(code)
@@ -10,6 +10,11 @@ import json
 import os
 import sys
 
+# 스킬 데몬이 떠 있으면 데몬에서 실행 (무거운 import 전에 확인)
+if __name__ == '__main__':
+    from daemon_client import forward_to_daemon
+    forward_to_daemon(__file__)
+
 # Add parent directory to path for google_api import
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
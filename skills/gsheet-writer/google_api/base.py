@@ -4,7 +4,7 @@ Base Google API Manager
 This module provides the base class for all Google API managers.
 """
 
-from google.oauth2 import service_account
+from .service import load_service_account
 
 class GoogleAPIManager:
     """
@@ -18,8 +18,7 @@ class GoogleAPIManager:
             raise ValueError("At least one scope must be provided")
 
         try:
-            self.credentials = service_account.Credentials.from_service_account_file(
-                key_file, scopes=scopes)
+            self.credentials = load_service_account(key_file, scopes)
         except FileNotFoundError:
             raise FileNotFoundError(f"Service account key file not found: {key_file}")
         except Exception as e:
@@ -4,8 +4,9 @@ Google Sheets API Manager - Writer
 This module provides write operations for Google Sheets.
 """
 
-import googleapiclient.discovery
 from .base import GoogleAPIManager
+from .batch import execute_batch
+from .service import get_service
 
 class GoogleSheetAPIManager(GoogleAPIManager):
     """
@@ -14,10 +15,22 @@ class GoogleSheetAPIManager(GoogleAPIManager):
 
     def __init__(self, key_file, scopes):
         super().__init__(key_file, scopes)
-        self.sheet_service = googleapiclient.discovery.build(
-            'sheets', 'v4', credentials=self.credentials)
+        self.sheet_service = get_service('sheets', 'v4', self.credentials)
         self.spreadsheet_id = None
 
+    def execute_batch(self, requests, **kwargs):
+        """
+        Execute many requests built from self.sheet_service in HTTP batch calls.
+
+        Args:
+            requests: Iterable of HttpRequest or (key, HttpRequest)
+            **kwargs: batch_size, max_workers, max_retries (see google_api.batch)
+
+        Returns:
+            List of BatchResult(key, response, error) in request order
+        """
+        return execute_batch(self.sheet_service, requests, **kwargs)
+
     def set_spreadsheet_id(self, spreadsheet_id):
         if not spreadsheet_id:
             raise ValueError("Spreadsheet ID must be provided")
@@ -0,0 +1,148 @@
+"""
+참석자 × 시간 비트맵으로 여러 명의 가용성을 한꺼번에 계산합니다 (NumPy 필요).
+
+freebusy 결과의 바쁜 시간을 참석자마다 한 행, resolution 분 칸마다 한 열인 bool 행렬로 그린 뒤
+(칸에 조금이라도 걸치면 바쁨), 슬롯 판정은 모두 행렬 연산으로 처리합니다.
+참석자가 30명을 넘고 기간이 한 달쯤 되어도 aware datetime 튜플 리스트를 만들고 정렬할 필요가 없습니다.
+
+- everyone_free: 모든 참석자가 빈 슬롯
+- at_most(k): 바쁜 참석자가 k명 이하인 슬롯
+- required_and_optional: 필수 참석자는 모두, 선택 참석자는 min_optional 명 이상 빈 슬롯
+
+슬롯 경계가 칸 경계와 맞으면(resolution_for 참고) 결과는 바쁜 시간을 직접 비교한 것과 같습니다.
+"""
+
+from datetime import datetime, timedelta
+from math import gcd
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_RESOLUTION = 5  # 분
+
+
+def resolution_for(*minutes: int) -> int:
+    """슬롯 시작/길이(분)가 모두 칸 경계에 오는 가장 큰 해상도 (DEFAULT_RESOLUTION 의 약수)"""
+    resolution = DEFAULT_RESOLUTION
+    for value in minutes:
+        resolution = gcd(resolution, value)
+    return resolution or 1
+
+
+def _offset_seconds(suffix: str) -> int:
+    if suffix == 'Z':
+        return 0
+    sign = -1 if suffix[0] == '-' else 1
+    return sign * (int(suffix[1:3]) * 3600 + int(suffix[4:6]) * 60)
+
+
+def epochs(values: List[str]) -> np.ndarray:
+    """
+    RFC3339 문자열들의 epoch 초.
+
+    freebusy 가 돌려주는 'YYYY-MM-DDTHH:MM:SS' + 'Z' 또는 '±HH:MM' 형식은 NumPy 로 한 번에 변환하고,
+    그 밖의 형식이 섞여 있으면 하나씩 변환합니다.
+    """
+    if not all(len(v) == 25 or (len(v) == 20 and v[19] == 'Z') for v in values):
+        return np.array([datetime.fromisoformat(v.replace('Z', '+00:00')).timestamp() for v in values])
+    local = np.array([v[:19] for v in values], dtype='datetime64[s]').astype(np.int64)
+    offsets = {suffix: _offset_seconds(suffix) for suffix in {v[19:] for v in values}}
+    return (local - np.array([offsets[v[19:]] for v in values], dtype=np.int64)).astype(np.float64)
+
+
+class AvailabilityMatrix:
+    """참석자 × 시간 칸 바쁨 행렬"""
+
+    def __init__(self, attendees: List[str], busy: np.ndarray, start: datetime, resolution: int):
+        self.attendees = attendees
+        self.busy = busy
+        self.start = start
+        self.resolution = resolution
+        # 행별 누적 합 (앞에 0 한 칸): 구간 [i, j) 의 바쁜 칸 수 = cumulative[:, j] - cumulative[:, i]
+        self.cumulative = np.zeros((busy.shape[0], busy.shape[1] + 1), dtype=np.int32)
+        np.cumsum(busy, axis=1, out=self.cumulative[:, 1:])
+
+    @classmethod
+    def from_freebusy(cls, freebusy: Dict, time_min: datetime, time_max: datetime,
+                      resolution: int = DEFAULT_RESOLUTION) -> 'AvailabilityMatrix':
+        """
+        freebusy 결과({캘린더 ID: {'busy': [{'start', 'end'}, ...]}})로 행렬 만들기.
+
+        Args:
+            freebusy: get_freebusy / query_freebusy 결과
+            time_min: 시간 축 시작 (timezone-aware)
+            time_max: 시간 축 끝 (timezone-aware)
+            resolution: 칸 크기 (분)
+        """
+        attendees = list(freebusy)
+        origin = time_min.timestamp()
+        cell = resolution * 60
+        cells = max(0, int(np.ceil((time_max.timestamp() - origin) / cell)))
+
+        rows, starts, ends = [], [], []
+        for row, cal_id in enumerate(attendees):
+            for period in freebusy[cal_id].get('busy', []):
+                rows.append(row)
+                starts.append(period['start'])
+                ends.append(period['end'])
+
+        # 차분 배열: 시작 칸 +1, 끝 칸 -1 → 누적 합이 양수인 칸이 바쁨
+        diff = np.zeros((len(attendees), cells + 1), dtype=np.int32)
+        if rows:
+            rows = np.asarray(rows)
+            first = np.clip(np.floor((epochs(starts) - origin) / cell), 0, cells).astype(np.int64)
+            last = np.clip(np.ceil((epochs(ends) - origin) / cell), 0, cells).astype(np.int64)
+            keep = first < last
+            np.add.at(diff, (rows[keep], first[keep]), 1)
+            np.add.at(diff, (rows[keep], last[keep]), -1)
+        busy = np.cumsum(diff[:, :cells], axis=1) > 0
+        return cls(attendees, busy, time_min, resolution)
+
+    # ----- 칸 단위 -----
+
+    def conflicts(self) -> np.ndarray:
+        """칸마다 바쁜 참석자 수"""
+        return self.busy.sum(axis=0)
+
+    # ----- 슬롯 단위 -----
+
+    def _cell(self, moment: datetime) -> int:
+        return int((moment - self.start) // timedelta(minutes=self.resolution))
+
+    def slot_busy(self, slots: Sequence[Tuple[datetime, datetime]]) -> np.ndarray:
+        """
+        참석자 × 슬롯 bool 행렬: 슬롯 안에 바쁜 칸이 하나라도 있으면 True.
+
+        Args:
+            slots: (시작, 끝) 리스트 (시간 축 안, 칸 경계에 맞춰진 시각)
+        """
+        if not slots:
+            return np.zeros((len(self.attendees), 0), dtype=bool)
+        cells = self.busy.shape[1]
+        first = np.clip([self._cell(start) for start, _ in slots], 0, cells)
+        last = np.clip([self._cell(end) for _, end in slots], 0, cells)
+        return (self.cumulative[:, last] - self.cumulative[:, first]) > 0
+
+    def _rows(self, attendees) -> List[int]:
+        index = {cal_id: row for row, cal_id in enumerate(self.attendees)}
+        return [index[cal_id] for cal_id in attendees if cal_id in index]
+
+    def everyone_free(self, slots) -> np.ndarray:
+        """슬롯마다 모든 참석자가 비어 있는지"""
+        return ~self.slot_busy(slots).any(axis=0)
+
+    def at_most(self, slots, k: int) -> np.ndarray:
+        """슬롯마다 바쁜 참석자가 k명 이하인지"""
+        return self.slot_busy(slots).sum(axis=0) <= k
+
+    def required_and_optional(self, slots, required, optional, min_optional: int) -> np.ndarray:
+        """슬롯마다 필수 참석자가 모두 비어 있고 선택 참석자가 min_optional 명 이상 비어 있는지"""
+        busy = self.slot_busy(slots)
+        required_free = ~busy[self._rows(required)].any(axis=0)
+        optional_free = (~busy[self._rows(optional)]).sum(axis=0)
+        return required_free & (optional_free >= min_optional)
+
+    def busy_attendees(self, slots) -> List[List[str]]:
+        """슬롯마다 바쁜 참석자 목록"""
+        busy = self.slot_busy(slots)
+        return [[self.attendees[row] for row in np.flatnonzero(busy[:, i])] for i in range(busy.shape[1])]
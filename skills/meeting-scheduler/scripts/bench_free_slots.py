@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+빈 시간 탐색 벤치마크 (find_free_time.find_free_slots)
+
+후보 슬롯마다 바쁜 시간 전체를 훑던 이전 구현(reference_free_slots)과 현재 구현을 비교합니다.
+
+1. 무작위 일정·근무 시간·회의 길이·격자 간격으로 두 구현의 결과가 같은지 확인
+2. 기간(주)과 바쁜 시간 수를 늘려 가며 두 구현의 실행 시간 비교
+3. 필수/선택 참석자 점수순 상위 k(rank_slots) 실행 시간
+4. (NumPy 가 있으면) 참석자 × 시간 비트맵(availability.py)의 결과를 바쁜 시간 직접 비교와 대조하고,
+   참석자 수를 늘려 가며 freebusy 결과 → 빈 슬롯 전체 시간 비교
+
+실제 계정 없이 가짜 바쁜 시간으로만 실행합니다.
+
+사용법:
+    python bench_free_slots.py --weeks 4 12 26 --busy-per-day 8 --cases 300
+결과가 다르면 종료 코드 1.
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytz
+
+sys.path.insert(0, str(Path(__file__).parent))
+from find_free_time import TIMEZONE, find_free_slots, merge_busy_periods, parse_busy_periods, rank_slots
+
+try:
+    from availability import AvailabilityMatrix, resolution_for
+except ImportError:
+    AvailabilityMatrix = None
+
+
+def reference_free_slots(busy_periods, date_start, date_end, duration_minutes,
+                         working_hours=(9, 18), lunch_break=(12, 13), slot_interval=30):
+    """이전 구현: 30분 후보마다 localize 하고 바쁜 시간 전체를 선형 탐색"""
+    tz = pytz.timezone(TIMEZONE)
+    free_slots = []
+    current_date = date_start.date()
+    end_date = date_end.date()
+
+    while current_date <= end_date:
+        if current_date.weekday() >= 5:
+            current_date += timedelta(days=1)
+            continue
+
+        day_start = tz.localize(datetime.combine(current_date, datetime.min.time().replace(hour=working_hours[0])))
+        day_end = tz.localize(datetime.combine(current_date, datetime.min.time().replace(hour=working_hours[1])))
+
+        current_slot = day_start
+        while current_slot + timedelta(minutes=duration_minutes) <= day_end:
+            slot_end = current_slot + timedelta(minutes=duration_minutes)
+            if lunch_break[0] <= current_slot.hour < lunch_break[1]:
+                current_slot = tz.localize(
+                    datetime.combine(current_date, datetime.min.time().replace(hour=lunch_break[1]))
+                )
+                continue
+            is_free = True
+            for busy_start, busy_end in busy_periods:
+                if not (slot_end <= busy_start or current_slot >= busy_end):
+                    is_free = False
+                    break
+            if is_free:
+                free_slots.append((current_slot, slot_end))
+            current_slot += timedelta(minutes=slot_interval)
+
+        current_date += timedelta(days=1)
+
+    return free_slots
+
+
+def random_busy(rng, start: datetime, days: int, per_day: int) -> list:
+    """start 부터 days 일 동안 하루 per_day 개의 바쁜 시간 (주로 낮 시간, 5분 단위, 가끔 여러 날에 걸친 일정)"""
+    busy = []
+    for day in range(days):
+        for _ in range(per_day):
+            begin = start + timedelta(days=day, minutes=5 * rng.randrange(7 * 12, 20 * 12))
+            length = timedelta(minutes=5 * rng.choice([1, 3, 3, 6, 6, 6, 12, 12, 24, 48, 300]))
+            busy.append((begin, begin + length))
+    busy.sort(key=lambda x: x[0])
+    return merge_busy_periods(busy)
+
+
+def check_equivalence(rng, cases: int) -> bool:
+    tz = pytz.timezone(TIMEZONE)
+    mismatches = 0
+    for _ in range(cases):
+        start = tz.localize(datetime(2026, 1, 1) + timedelta(days=rng.randrange(60)))
+        days = rng.randint(1, 21)
+        end = (start + timedelta(days=days)).replace(hour=23, minute=59)
+        busy = random_busy(rng, start - timedelta(days=1), days + 2, rng.choice([0, 1, 5, 20]))
+        first = rng.randint(6, 12)
+        params = dict(
+            duration_minutes=rng.choice([15, 30, 45, 60, 90, 120]),
+            working_hours=(first, rng.randint(first + 1, 23)),
+            lunch_break=rng.choice([(12, 13), (11, 13), (12, 12), (0, 0), (13, 14)]),
+            slot_interval=rng.choice([10, 15, 30, 45, 60, 90, 120]),
+        )
+        if find_free_slots(busy, start, end, **params) != reference_free_slots(busy, start, end, **params):
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"  불일치: {start.date()} +{days}일, 바쁜 시간 {len(busy)}개, {params}")
+    print(f"[결과 비교] 무작위 {cases}건, 불일치 {mismatches}건 → {'OK' if not mismatches else 'FAIL'}")
+    return mismatches == 0
+
+
+def best_of(repeat: int, fn, *args, **kwargs) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args, **kwargs)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def benchmark(rng, weeks_list: list, busy_per_day: int, repeat: int):
+    tz = pytz.timezone(TIMEZONE)
+    start = tz.localize(datetime(2026, 3, 2))
+    print(f"\n{'기간':>6} {'바쁜 시간':>9} {'슬롯':>6} {'이전(ms)':>10} {'현재(ms)':>10} {'배수':>7}")
+    for weeks in weeks_list:
+        end = (start + timedelta(weeks=weeks)).replace(hour=23, minute=59)
+        busy = random_busy(rng, start, weeks * 7, busy_per_day)
+        slots = len(find_free_slots(busy, start, end, 30))
+        before = best_of(repeat, reference_free_slots, busy, start, end, 30)
+        after = best_of(repeat, find_free_slots, busy, start, end, 30)
+        print(f"{weeks:>5}주 {len(busy):>9} {slots:>6} {before * 1000:>10.1f} {after * 1000:>10.1f} "
+              f"{before / after:>6.1f}x")
+
+
+def random_freebusy(rng, start: datetime, days: int, attendees: int, per_day: int) -> dict:
+    """freebusy 결과 형식의 무작위 바쁜 시간 (분 단위 경계 포함)"""
+    freebusy = {}
+    for a in range(attendees):
+        busy = []
+        for day in range(days):
+            for _ in range(rng.randint(0, per_day)):
+                begin = start + timedelta(days=day, minutes=rng.randrange(7 * 60, 20 * 60))
+                end = begin + timedelta(minutes=rng.choice([7, 15, 30, 30, 60, 60, 90, 240]))
+                busy.append({'start': begin.isoformat(), 'end': end.isoformat()})
+        freebusy[f'person{a}@maum.ai'] = {'busy': busy}
+    return freebusy
+
+
+def sweep_slots(freebusy, start, end, duration, working_hours=(9, 18)):
+    return find_free_slots(merge_busy_periods(parse_busy_periods(freebusy)), start, end, duration, working_hours)
+
+
+def bitmap_slots(freebusy, start, end, duration, working_hours=(9, 18), max_conflicts=0):
+    candidates = find_free_slots([], start, end, duration, working_hours)
+    matrix = AvailabilityMatrix.from_freebusy(freebusy, start, end, resolution_for(duration, 30))
+    return [slot for slot, ok in zip(candidates, matrix.at_most(candidates, max_conflicts)) if ok]
+
+
+def check_bitmap(rng, cases: int) -> bool:
+    tz = pytz.timezone(TIMEZONE)
+    mismatches = 0
+    for _ in range(cases):
+        start = tz.localize(datetime(2026, 1, 1) + timedelta(days=rng.randrange(60)))
+        days = rng.randint(1, 21)
+        end = (start + timedelta(days=days)).replace(hour=23, minute=59)
+        freebusy = random_freebusy(rng, start, days + 1, rng.randint(1, 8), rng.choice([1, 3, 6]))
+        duration = rng.choice([15, 20, 30, 45, 60, 90])
+        working_hours = (rng.randint(7, 10), rng.randint(15, 22))
+        if sweep_slots(freebusy, start, end, duration, working_hours) != \
+                bitmap_slots(freebusy, start, end, duration, working_hours):
+            mismatches += 1
+
+        # k명까지 바쁜 것을 허용: 참석자 부분집합마다 바쁜 시간 직접 비교한 결과와 대조
+        k = rng.randint(1, 2)
+        names = list(freebusy)
+        candidates = find_free_slots([], start, end, duration, working_hours)
+        per_person = {name: set(sweep_slots({name: freebusy[name]}, start, end, duration, working_hours))
+                      for name in names}
+        expected = [slot for slot in candidates if sum(slot not in per_person[n] for n in names) <= k]
+        if expected != bitmap_slots(freebusy, start, end, duration, working_hours, k):
+            mismatches += 1
+    print(f"[비트맵 비교] 무작위 {cases}건, 불일치 {mismatches}건 → {'OK' if not mismatches else 'FAIL'}")
+    return mismatches == 0
+
+
+def benchmark_bitmap(rng, attendee_counts: list, weeks: int, repeat: int):
+    tz = pytz.timezone(TIMEZONE)
+    start = tz.localize(datetime(2026, 3, 2))
+    end = (start + timedelta(weeks=weeks)).replace(hour=23, minute=59)
+    print(f"\n{weeks}주, freebusy 결과 → 빈 슬롯 (parse/merge/sweep vs 비트맵)")
+    print(f"{'참석자':>6} {'바쁜 시간':>9} {'이전(ms)':>10} {'비트맵(ms)':>11} {'배수':>7}")
+    for count in attendee_counts:
+        freebusy = random_freebusy(rng, start, weeks * 7, count, 6)
+        periods = sum(len(cal['busy']) for cal in freebusy.values())
+        before = best_of(repeat, sweep_slots, freebusy, start, end, 60)
+        after = best_of(repeat, bitmap_slots, freebusy, start, end, 60)
+        print(f"{count:>6} {periods:>9} {before * 1000:>10.1f} {after * 1000:>11.1f} {before / after:>6.1f}x")
+
+
+def benchmark_rank(rng, attendee_counts: list, weeks: int, repeat: int):
+    tz = pytz.timezone(TIMEZONE)
+    start = tz.localize(datetime(2026, 3, 2))
+    end = (start + timedelta(weeks=weeks)).replace(hour=23, minute=59)
+    print(f"\n{weeks}주, 필수 3명 + 나머지 선택, 정족수 80%, 상위 5개 (rank_slots)")
+    print(f"{'참석자':>6} {'바쁜 시간':>9} {'시간(ms)':>10}")
+    for count in attendee_counts:
+        freebusy = random_freebusy(rng, start, weeks * 7, count, 6)
+        names = list(freebusy)
+        required = names[:min(3, count)]
+        periods = sum(len(cal['busy']) for cal in freebusy.values())
+        elapsed = best_of(repeat, rank_slots, freebusy, required, names[len(required):], start, end, 60, 5,
+                          quorum=max(len(required), int(count * 0.8)), preferred_hours=[(600, 720), (840, 1020)])
+        print(f"{count:>6} {periods:>9} {elapsed * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='빈 시간 탐색 벤치마크')
+    parser.add_argument('--weeks', type=int, nargs='+', default=[1, 4, 12, 26], help='탐색 기간(주) 목록')
+    parser.add_argument('--busy-per-day', type=int, default=8, help='하루 바쁜 시간 수 (병합 전)')
+    parser.add_argument('--cases', type=int, default=300, help='결과 비교 무작위 케이스 수')
+    parser.add_argument('--repeat', type=int, default=3, help='시간 측정 반복 횟수 (최솟값 사용)')
+    parser.add_argument('--attendees', type=int, nargs='+', default=[5, 30, 100],
+                        help='비트맵 벤치마크 참석자 수 목록')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ok = check_equivalence(rng, args.cases)
+    benchmark(rng, args.weeks, args.busy_per_day, args.repeat)
+    benchmark_rank(rng, args.attendees, 12, args.repeat)
+    if AvailabilityMatrix is not None:
+        ok = check_bitmap(rng, max(1, args.cases // 5)) and ok
+        benchmark_bitmap(rng, args.attendees, 4, args.repeat)
+    else:
+        print("\nNumPy 가 없어 비트맵 비교는 건너뜁니다.")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
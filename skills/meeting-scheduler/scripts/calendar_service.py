@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Calendar API 서비스 공용 팩토리
+
+find_free_time / list_rooms / create_meeting 이 같이 씁니다.
+- 토큰 pickle 은 프로세스당 한 번만 읽고, 파일이 바뀌었거나 만료가 임박했을 때만 다시 읽음
+- 토큰 갱신은 파일 잠금으로 여러 프로세스 중 하나만 수행 (google_token_store.py)
+- 서비스 객체는 (API, 버전, 인증 정보)별로 한 번만 생성해 재사용
+- discovery 문서는 google-api-python-client 에 포함된 정적 JSON 사용 (네트워크 조회 없음)
+- 모든 요청은 쿼터 관리자(google_quota.py)를 거침 (프로세스 간 공유 속도 제한, 429 재시도)
+"""
+
+import threading
+from pathlib import Path
+
+from googleapiclient.discovery import build
+
+from google_quota import govern
+from google_token_store import load_token, needs_refresh
+
+TOKEN_PATHS = [
+    Path.home() / "work/vault-worv/.credentials/calendar_token.pickle",
+    Path.home() / ".credentials/calendar_token.pickle",
+]
+
+_lock = threading.RLock()
+_services = {}
+_credentials = {}
+
+
+def find_token_file() -> Path:
+    for path in TOKEN_PATHS:
+        if path.exists():
+            return path
+    raise FileNotFoundError("Calendar OAuth 토큰을 찾을 수 없습니다.")
+
+
+def _file_key(path: Path):
+    stat = path.stat()
+    return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def load_credentials(token_file: Path = None):
+    """OAuth 토큰 로드 (만료가 임박했으면 갱신 후 저장)"""
+    token_file = token_file or find_token_file()
+    with _lock:
+        key = _file_key(token_file)
+        creds = _credentials.get(key)
+        if creds is None or needs_refresh(creds):
+            creds = load_token(token_file)
+            _credentials[_file_key(token_file)] = creds
+        return creds
+
+
+def get_service(api: str, version: str, creds):
+    """(API, 버전, 인증 정보)별로 캐시된 서비스 객체 반환"""
+    key = (api, version, id(creds))
+    with _lock:
+        cached = _services.get(key)
+        if cached is None:
+            service = govern(build(api, version, credentials=creds, static_discovery=True, cache_discovery=False),
+                             api, creds)
+            # id() 가 재사용되지 않도록 인증 정보도 함께 보관
+            cached = _services[key] = (creds, service)
+        return cached[1]
+
+
+def get_calendar_service():
+    """OAuth 토큰으로 Calendar API 서비스 반환"""
+    return get_service('calendar', 'v3', load_credentials())
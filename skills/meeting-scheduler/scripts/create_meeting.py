@@ -6,48 +6,19 @@
 import argparse
 import json
 import os
-import pickle
 import sys
 import uuid
 from datetime import datetime
-from pathlib import Path
 from typing import List, Optional
 
 import pytz
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+
+from calendar_service import get_calendar_service
+from google_freebusy import invalidate as invalidate_freebusy
 
 
 # 설정
 TIMEZONE = 'Asia/Seoul'
-TOKEN_PATHS = [
-    Path.home() / "work/vault-worv/.credentials/calendar_token.pickle",
-    Path.home() / ".credentials/calendar_token.pickle",
-]
-
-
-def get_calendar_service():
-    """OAuth 토큰으로 Calendar API 서비스 반환"""
-    creds = None
-    token_file = None
-
-    for path in TOKEN_PATHS:
-        if path.exists():
-            token_file = path
-            break
-
-    if not token_file:
-        raise FileNotFoundError("Calendar OAuth 토큰을 찾을 수 없습니다.")
-
-    with open(token_file, 'rb') as f:
-        creds = pickle.load(f)
-
-    if creds and creds.expired and creds.refresh_token:
-        creds.refresh(Request())
-        with open(token_file, 'wb') as f:
-            pickle.dump(creds, f)
-
-    return build('calendar', 'v3', credentials=creds)
 
 
 def create_event(
@@ -116,6 +87,9 @@ def create_event(
         sendUpdates='all' if all_attendees else 'none',
     ).execute()
 
+    # 주최자 캘린더 ID(primary)는 이메일과 다를 수 있으므로 캐시 전체를 비움
+    invalidate_freebusy()
+
     return created
 
 
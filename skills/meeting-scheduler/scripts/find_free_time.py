@@ -4,54 +4,46 @@
 """
 
 import argparse
+import heapq
 import json
 import os
-import pickle
 import sys
+from bisect import bisect_right
 from datetime import datetime, timedelta
-from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Iterator, Tuple
 
-import pytz
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-
-
-# 설정
-TIMEZONE = 'Asia/Seoul'
-TOKEN_PATHS = [
-    Path.home() / "work/vault-worv/.credentials/calendar_token.pickle",
-    Path.home() / ".credentials/calendar_token.pickle",
-]
+# 스킬 데몬이 떠 있으면 데몬에서 실행 (무거운 import 전에 확인)
+if __name__ == '__main__':
+    from daemon_client import forward_to_daemon
+    forward_to_daemon(__file__)
 
+import pytz
 
-def get_calendar_service():
-    """OAuth 토큰으로 Calendar API 서비스 반환"""
-    creds = None
-    token_file = None
+from calendar_service import get_calendar_service
+from google_freebusy import query_freebusy
+from list_rooms import filter_rooms, merge_room_busy, room_entry, room_sort_key
 
-    for path in TOKEN_PATHS:
-        if path.exists():
-            token_file = path
-            break
+try:
+    from availability import AvailabilityMatrix, resolution_for
+except ImportError:
+    # NumPy 없으면 --format json 도 바쁜 시간 비교로 계산 (--max-conflicts 는 사용 불가)
+    AvailabilityMatrix = None
 
-    if not token_file:
-        raise FileNotFoundError("Calendar OAuth 토큰을 찾을 수 없습니다.")
 
-    with open(token_file, 'rb') as f:
-        creds = pickle.load(f)
+# 설정
+TIMEZONE = 'Asia/Seoul'
 
-    if creds and creds.expired and creds.refresh_token:
-        creds.refresh(Request())
-        with open(token_file, 'wb') as f:
-            pickle.dump(creds, f)
+# 회의 앞뒤로 이보다 짧게 남는 빈 시간(분)은 쓸모없이 쪼개진 시간으로 보고 감점
+MIN_USEFUL_GAP = 30
 
-    return build('calendar', 'v3', credentials=creds)
 
+def get_freebusy(service, calendars: List[str], time_min: datetime, time_max: datetime, ttl: float = None) -> Dict:
+    """
+    여러 캘린더의 freebusy 조회.
 
-def get_freebusy(service, calendars: List[str], time_min: datetime, time_max: datetime) -> Dict:
-    """여러 캘린더의 freebusy 조회"""
+    참석자 수와 관계없이 API 한도(50개)씩 나눠 동시에 조회하고, 최근 조회 결과는 짧은 캐시에서 씁니다.
+    조회하지 못한 캘린더는 경고를 출력합니다 (바쁜 시간 없음으로 처리).
+    """
     tz = pytz.timezone(TIMEZONE)
 
     if time_min.tzinfo is None:
@@ -59,15 +51,11 @@ def get_freebusy(service, calendars: List[str], time_min: datetime, time_max: da
     if time_max.tzinfo is None:
         time_max = tz.localize(time_max)
 
-    body = {
-        'timeMin': time_min.isoformat(),
-        'timeMax': time_max.isoformat(),
-        'items': [{'id': cal} for cal in calendars],
-        'timeZone': TIMEZONE,
-    }
-
-    result = service.freebusy().query(body=body).execute()
-    return result.get('calendars', {})
+    calendars = query_freebusy(service, calendars, time_min, time_max, time_zone=TIMEZONE, ttl=ttl)
+    for cal_id, cal_data in calendars.items():
+        for error in cal_data.get('errors', []):
+            print(f"⚠️ {cal_id} freebusy 조회 실패: {error.get('reason')}", file=sys.stderr)
+    return calendars
 
 
 def parse_busy_periods(freebusy_result: Dict) -> List[Tuple[datetime, datetime]]:
@@ -104,6 +92,24 @@ def merge_busy_periods(busy_periods: List[Tuple[datetime, datetime]]) -> List[Tu
     return merged
 
 
+def _slot_grid(day_start: datetime, day_end: datetime, lunch_start: datetime, lunch_end: datetime,
+               step: timedelta) -> List[Tuple[datetime, datetime, datetime]]:
+    """
+    하루의 슬롯 시작 격자: [(기준 시각, 시작 하한, 시작 상한)], 시작 = 기준 + k * step.
+
+    격자가 처음 점심시간(시 단위)에 닿으면 그 뒤는 점심 종료 시각 기준으로 다시 맞춥니다.
+    """
+    if day_start >= lunch_end or lunch_start >= lunch_end:
+        return [(day_start, day_start, day_end)]
+    # 점심시간에 들어가는 첫 격자점
+    k = max(0, -((day_start - lunch_start) // step))
+    first_lunch_slot = day_start + k * step
+    if first_lunch_slot >= lunch_end:
+        # 격자가 점심시간을 건너뜀
+        return [(day_start, day_start, day_end)]
+    return [(day_start, day_start, first_lunch_slot), (lunch_end, lunch_end, day_end)]
+
+
 def find_free_slots(
     busy_periods: List[Tuple[datetime, datetime]],
     date_start: datetime,
@@ -113,50 +119,266 @@ def find_free_slots(
     lunch_break: Tuple[int, int] = (12, 13),
     slot_interval: int = 30,
 ) -> List[Tuple[datetime, datetime]]:
-    """빈 시간 슬롯 찾기"""
+    """빈 시간 슬롯 찾기 (iter_free_slots 결과 리스트)"""
+    return list(iter_free_slots(busy_periods, date_start, date_end, duration_minutes,
+                                working_hours, lunch_break, slot_interval))
+
+
+def iter_free_slots(
+    busy_periods: List[Tuple[datetime, datetime]],
+    date_start: datetime,
+    date_end: datetime,
+    duration_minutes: int,
+    working_hours: Tuple[int, int] = (9, 18),
+    lunch_break: Tuple[int, int] = (12, 13),
+    slot_interval: int = 30,
+) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    빈 시간 슬롯을 시간순으로 하나씩 생성
+
+    근무 시간을 slot_interval 분 격자로 나눈 후보 중 바쁜 시간과 겹치지 않는 것을 시간순으로 반환합니다
+    (주말 제외, 시작 시각이 점심시간이면 점심 종료 시각부터 격자를 다시 맞춤).
+    후보마다 바쁜 시간 전체를 훑지 않고, 바쁜 구간을 한 번만 지나가며 그 사이 빈 구간에 들어가는
+    격자점만 계산합니다 (바쁜 구간 수 + 결과 수에 비례).
+    """
     tz = pytz.timezone(TIMEZONE)
-    free_slots = []
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=slot_interval)
+
+    # 시작순으로 병합된 바쁜 시간은 끝 시각도 오름차순 → bisect 가능
+    if any(busy_periods[i][0] > busy_periods[i + 1][0] for i in range(len(busy_periods) - 1)):
+        busy_periods = sorted(busy_periods, key=lambda x: x[0])
+    busy = merge_busy_periods(busy_periods)
+    busy_ends = [end for _, end in busy]
+    cursor = 0
 
     current_date = date_start.date()
     end_date = date_end.date()
+    next_midnight = tz.localize(datetime.combine(current_date, datetime.min.time()))
 
     while current_date <= end_date:
+        midnight = next_midnight
+        next_midnight = tz.localize(datetime.combine(current_date + timedelta(days=1), datetime.min.time()))
+
         # 주말 제외
         if current_date.weekday() >= 5:
             current_date += timedelta(days=1)
             continue
 
+        # UTC 오프셋이 바뀌지 않는 날(대부분)은 localize 대신 자정 기준 덧셈
+        same_offset = midnight.utcoffset() == next_midnight.utcoffset()
+
+        def at(hour):
+            if same_offset:
+                return midnight + timedelta(hours=hour)
+            return tz.localize(datetime.combine(current_date, datetime.min.time().replace(hour=hour)))
+
         # 근무 시간 내 슬롯 생성
-        day_start = tz.localize(datetime.combine(current_date, datetime.min.time().replace(hour=working_hours[0])))
-        day_end = tz.localize(datetime.combine(current_date, datetime.min.time().replace(hour=working_hours[1])))
-
-        current_slot = day_start
-        while current_slot + timedelta(minutes=duration_minutes) <= day_end:
-            slot_end = current_slot + timedelta(minutes=duration_minutes)
-
-            # 점심시간 체크
-            slot_hour = current_slot.hour
-            if lunch_break[0] <= slot_hour < lunch_break[1]:
-                current_slot = tz.localize(
-                    datetime.combine(current_date, datetime.min.time().replace(hour=lunch_break[1]))
-                )
+        day_start = at(working_hours[0])
+        day_end = at(working_hours[1])
+        lunch_start = at(lunch_break[0])
+        lunch_end = at(lunch_break[1])
+
+        for anchor, low, high in _slot_grid(day_start, day_end, lunch_start, lunch_end, step):
+            # low 이후에 끝나는 첫 바쁜 구간부터 빈 구간을 차례로 만듦
+            cursor = bisect_right(busy_ends, low, cursor)
+            gap_start, i = low, cursor
+            while True:
+                if i < len(busy) and busy[i][0] < day_end:
+                    gap_end = busy[i][0]
+                else:
+                    gap_end = day_end
+                if gap_end > gap_start:
+                    # gap_start 이상인 첫 격자점부터, 끝이 빈 구간을 넘지 않는 동안
+                    slot = anchor + max(0, -((anchor - gap_start) // step)) * step
+                    while slot < high and slot + duration <= gap_end:
+                        yield slot, slot + duration
+                        slot += step
+                if gap_end >= day_end or i >= len(busy):
+                    break
+                gap_start = max(gap_start, busy[i][1])
+                i += 1
+
+        current_date += timedelta(days=1)
+
+
+def parse_preferred_hours(text: str) -> List[Tuple[int, int]]:
+    """'10:00-12:00,14:00-17:00' → [(600, 720), (840, 1020)] (자정부터의 분)"""
+    windows = []
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        start, end = part.replace("~", "-").split("-")
+        windows.append(tuple(int(h) * 60 + int(m) for h, m in (t.strip().split(":") for t in (start, end))))
+    return windows
+
+
+class _BusyCursor:
+    """한 참석자의 병합된 바쁜 시간(epoch 초)을 시간순 슬롯에 맞춰 앞으로만 따라가는 커서"""
+
+    def __init__(self, busy: List[Tuple[float, float]]):
+        self.starts = [start for start, _ in busy]
+        self.ends = [end for _, end in busy]
+        self.index = 0
+
+    def around(self, start: float, end: float) -> Tuple[bool, float, float]:
+        """(슬롯과 겹치는지, 직전 바쁜 시간의 끝, 다음 바쁜 시간의 시작) — 없으면 None"""
+        self.index = bisect_right(self.ends, start, self.index)
+        following = self.starts[self.index] if self.index < len(self.starts) else None
+        if following is not None and following < end:
+            return True, None, None
+        previous_end = self.ends[self.index - 1] if self.index else None
+        return False, previous_end, following
+
+
+def rank_slots(
+    freebusy: Dict,
+    required: List[str],
+    optional: List[str],
+    date_start: datetime,
+    date_end: datetime,
+    duration_minutes: int,
+    top: int,
+    quorum: int = None,
+    preferred_hours: List[Tuple[int, int]] = None,
+    working_hours: Tuple[int, int] = (9, 18),
+    lunch_break: Tuple[int, int] = (12, 13),
+    slot_interval: int = 30,
+) -> List[Dict]:
+    """
+    필수/선택 참석자 기준으로 슬롯에 점수를 매겨 상위 top 개 선택.
+
+    필수 참석자가 모두 빈 슬롯만 후보로 만들고(iter_free_slots), 빈 인원이 quorum 이상인 후보를
+    (불참 선택 참석자 수, 선호 시간 밖 분, 앞뒤로 쪼개지는 빈 시간 수, 시작 시각) 순으로 비교합니다.
+    후보는 하나씩 만들며 크기 top 의 힙으로만 추리므로, 후보 전체를 모아 정렬하지 않습니다.
+
+    Args:
+        quorum: 최소 참석 인원 (필수 포함, 기본: 필수 참석자 수)
+        preferred_hours: 선호 시간대 [(시작 분, 끝 분)] (parse_preferred_hours)
+
+    Returns:
+        점수 순 [{'slot': (시작, 끝), 'busy_attendees': [...], 'score': {...}}]
+    """
+    attendees = list(dict.fromkeys(required + optional))
+    optional = [cal_id for cal_id in attendees if cal_id not in required]
+    quorum = len(required) if quorum is None else quorum
+    min_gap = MIN_USEFUL_GAP * 60
+
+    # 참석자별 병합된 바쁜 시간 (커서는 비교가 빠른 epoch 초로)
+    cursors = {}
+    for cal_id in attendees:
+        periods = sorted(
+            (datetime.fromisoformat(busy['start'].replace('Z', '+00:00')).timestamp(),
+             datetime.fromisoformat(busy['end'].replace('Z', '+00:00')).timestamp())
+            for busy in freebusy.get(cal_id, {}).get('busy', [])
+        )
+        cursors[cal_id] = _BusyCursor(merge_busy_periods(periods))
+    required_busy = merge_busy_periods(parse_busy_periods({cal_id: freebusy.get(cal_id, {}) for cal_id in required}))
+
+    def outside_preferred(start: datetime) -> int:
+        if not preferred_hours:
+            return 0
+        first = start.hour * 60 + start.minute
+        last = first + duration_minutes
+        overlap = max(max(0, min(last, end) - max(first, begin)) for begin, end in preferred_hours)
+        return duration_minutes - overlap
+
+    def scored():
+        for start, end in iter_free_slots(required_busy, date_start, date_end, duration_minutes,
+                                          working_hours, lunch_break, slot_interval):
+            first, last = start.timestamp(), end.timestamp()
+            midnight = first - (start.hour * 3600 + start.minute * 60 + start.second)
+            day_start = midnight + working_hours[0] * 3600
+            day_end = midnight + working_hours[1] * 3600
+
+            busy, fragments = [], 0
+            for cal_id in attendees:
+                overlaps, previous_end, next_start = cursors[cal_id].around(first, last)
+                if overlaps:
+                    busy.append(cal_id)
+                    continue
+                # 이 회의 때문에 남는 앞뒤 빈 시간이 너무 짧으면 하루가 쪼개짐
+                before = first - max(previous_end or day_start, day_start)
+                after = min(next_start or day_end, day_end) - last
+                fragments += (0 < before < min_gap) + (0 < after < min_gap)
+            if len(attendees) - len(busy) < quorum:
                 continue
 
-            # 바쁜 시간과 겹치는지 체크
-            is_free = True
-            for busy_start, busy_end in busy_periods:
-                if not (slot_end <= busy_start or current_slot >= busy_end):
-                    is_free = False
-                    break
+            score = (len(busy), outside_preferred(start), fragments)
+            yield score + (start,), (start, end), busy
 
-            if is_free:
-                free_slots.append((current_slot, slot_end))
+    best = heapq.nsmallest(top, scored(), key=lambda item: item[0])
+    return [
+        {
+            'slot': slot,
+            'busy_attendees': busy,
+            'score': {'conflicts': key[0], 'outside_preferred': key[1], 'fragments': key[2]},
+        }
+        for key, slot, busy in best
+    ]
 
-            current_slot += timedelta(minutes=slot_interval)
 
-        current_date += timedelta(days=1)
+def find_slots_with_rooms(
+    freebusy: Dict,
+    attendees: List[str],
+    rooms: Dict[str, Dict],
+    date_start: datetime,
+    date_end: datetime,
+    duration_minutes: int,
+    top: int,
+    preferred_rooms: List[str] = None,
+    working_hours: Tuple[int, int] = (9, 18),
+    lunch_break: Tuple[int, int] = (12, 13),
+    slot_interval: int = 30,
+) -> List[Dict]:
+    """
+    참석자가 모두 비어 있고 후보 회의실 중 하나 이상이 빈 슬롯을 회의실 선호 순으로 선택.
+
+    참석자와 회의실의 바쁜 시간은 같은 freebusy 결과에서 읽습니다 (조회 한 번).
+    슬롯 순위: preferred_rooms 회의실이 빈 슬롯 → 선호(preferred) 회의실이 빈 슬롯 → 나머지, 같은 순위는 시간순.
+    후보는 하나씩 만들며 크기 top 의 힙으로만 추립니다.
+
+    Args:
+        freebusy: 참석자와 회의실 ID 를 모두 조회한 get_freebusy 결과
+        rooms: 후보 회의실 {이름: 정보} (list_rooms.filter_rooms)
+        preferred_rooms: 우선할 회의실 이름 (앞쪽일수록 우선)
+
+    Returns:
+        순위순 [{'slot': (시작, 끝), 'rooms': [가용 회의실 (선호 순)], 'room_rank': 0|1|2}]
+    """
+    preferred_rooms = preferred_rooms or []
+
+    def room_rank(room: Dict) -> int:
+        if room['name'] in preferred_rooms:
+            return 0
+        return 1 if room['preferred'] else 2
+
+    def room_order(room: Dict):
+        named = preferred_rooms.index(room['name']) if room['name'] in preferred_rooms else len(preferred_rooms)
+        return (room_rank(room), named) + room_sort_key(room)
+
+    attendee_busy = merge_busy_periods(parse_busy_periods({cal_id: freebusy.get(cal_id, {}) for cal_id in attendees}))
+    room_busy = merge_room_busy({
+        info['id']: freebusy.get(info['id'], {'errors': [{'reason': 'missingResponse'}]}) for info in rooms.values()
+    })
+    # 조회에 실패한 회의실은 후보에서 제외
+    ordered = sorted((room_entry(name, info) for name, info in rooms.items()
+                      if room_busy.get(info['id']) is not None), key=room_order)
+    cursors = {
+        room['id']: _BusyCursor([(start.timestamp(), end.timestamp()) for start, end in room_busy[room['id']]])
+        for room in ordered
+    }
+
+    def candidates():
+        for start, end in iter_free_slots(attendee_busy, date_start, date_end, duration_minutes,
+                                          working_hours, lunch_break, slot_interval):
+            first, last = start.timestamp(), end.timestamp()
+            free_rooms = [room for room in ordered if not cursors[room['id']].around(first, last)[0]]
+            if free_rooms:
+                yield (room_rank(free_rooms[0]), start), (start, end), free_rooms
 
-    return free_slots
+    best = heapq.nsmallest(top, candidates(), key=lambda item: item[0])
+    return [{'slot': slot, 'rooms': free_rooms, 'room_rank': key[0]} for key, slot, free_rooms in best]
 
 
 def format_slot(slot: Tuple[datetime, datetime]) -> str:
@@ -169,12 +391,26 @@ def format_slot(slot: Tuple[datetime, datetime]) -> str:
 def main():
     parser = argparse.ArgumentParser(description="참석자들의 공통 빈 시간 찾기")
     parser.add_argument("--attendees", required=True, help="참석자 이메일 (쉼표 구분)")
+    parser.add_argument("--optional", default="", help="선택 참석자 이메일 (쉼표 구분)")
+    parser.add_argument("--quorum", type=int, help="최소 참석 인원 (필수 포함, 기본: 필수 참석자 수)")
+    parser.add_argument("--preferred-hours", help="선호 시간대 (예: 10:00-12:00,14:00-17:00)")
+    parser.add_argument("--rank", choices=["auto", "time", "score"], default="auto",
+                        help="정렬: time=시간순, score=점수순 (auto: 선택 참석자/정족수/선호 시간이 있으면 score)")
     parser.add_argument("--duration", type=int, default=60, help="회의 시간 (분)")
     parser.add_argument("--start-date", required=True, help="시작일 (YYYY-MM-DD)")
     parser.add_argument("--end-date", required=True, help="종료일 (YYYY-MM-DD)")
     parser.add_argument("--working-hours", default="09:00-18:00", help="근무 시간")
     parser.add_argument("--top", type=int, default=3, help="상위 N개 슬롯만 출력")
     parser.add_argument("--format", choices=["json", "text"], default="text")
+    parser.add_argument("--no-cache", action="store_true", help="freebusy 캐시를 쓰지 않고 새로 조회")
+    parser.add_argument("--room", action="store_true",
+                        help="조건에 맞는 회의실도 비어 있는 슬롯만 (참석자와 회의실을 한 번에 조회)")
+    parser.add_argument("--min-capacity", type=int, default=0, help="--room: 최소 수용 인원")
+    parser.add_argument("--location", help="--room: 회의실 위치 (예: maumai, cw-5층)")
+    parser.add_argument("--prefer-room", action="append", default=[],
+                        help="--room: 우선할 회의실 이름 (여러 번 지정 가능, 앞쪽 우선)")
+    parser.add_argument("--max-conflicts", type=int, default=0,
+                        help="바쁜 참석자가 N명 이하인 슬롯도 포함 (NumPy 필요, 기본: 0)")
 
     args = parser.parse_args()
 
@@ -183,6 +419,21 @@ def main():
     if not attendees:
         print("❌ 참석자가 필요합니다.", file=sys.stderr)
         sys.exit(1)
+    optional = [a.strip() for a in args.optional.split(",") if a.strip() and a.strip() not in attendees]
+
+    rank = args.rank
+    if rank == "auto":
+        rank = "score" if optional or args.quorum is not None or args.preferred_hours else "time"
+    if rank == "score" and args.max_conflicts > 0:
+        print("❌ --max-conflicts 는 점수순 정렬과 함께 쓸 수 없습니다 (--optional/--quorum 사용).", file=sys.stderr)
+        sys.exit(1)
+    if args.room and (rank == "score" or args.max_conflicts > 0):
+        print("❌ --room 은 모든 참석자가 비어 있는 슬롯만 찾습니다 (--optional/--quorum/--preferred-hours/"
+              "--max-conflicts 와 함께 쓸 수 없음).", file=sys.stderr)
+        sys.exit(1)
+    if args.quorum is not None and not len(attendees) <= args.quorum <= len(attendees) + len(optional):
+        print(f"❌ --quorum 은 {len(attendees)}~{len(attendees) + len(optional)} 사이여야 합니다.", file=sys.stderr)
+        sys.exit(1)
 
     # 날짜 파싱
     tz = pytz.timezone(TIMEZONE)
@@ -193,24 +444,68 @@ def main():
     wh_parts = args.working_hours.replace("~", "-").split("-")
     working_hours = (int(wh_parts[0].split(":")[0]), int(wh_parts[1].split(":")[0]))
 
+    # 참석자 × 시간 비트맵 사용 여부 (JSON 출력 또는 --max-conflicts)
+    use_matrix = (not args.room and rank == "time" and AvailabilityMatrix is not None
+                  and (args.format == "json" or args.max_conflicts > 0))
+    if args.max_conflicts > 0 and AvailabilityMatrix is None:
+        print("❌ --max-conflicts 는 NumPy 가 필요합니다 (pip install numpy).", file=sys.stderr)
+        sys.exit(1)
+
     try:
         service = get_calendar_service()
 
-        # freebusy 조회
-        freebusy = get_freebusy(service, attendees, start_date, end_date)
-
-        # 바쁜 시간 추출 및 병합
-        busy_periods = parse_busy_periods(freebusy)
-        merged_busy = merge_busy_periods(busy_periods)
-
-        # 빈 시간 찾기
-        free_slots = find_free_slots(
-            merged_busy,
-            start_date,
-            end_date,
-            args.duration,
-            working_hours,
-        )
+        rooms = filter_rooms(args.min_capacity, location=args.location) if args.room else {}
+        if args.room and not rooms:
+            print("❌ 조건에 맞는 회의실이 없습니다.", file=sys.stderr)
+            sys.exit(1)
+        for name in args.prefer_room:
+            if name not in rooms:
+                print(f"⚠️ 선호 회의실 '{name}' 은 조건에 맞는 회의실이 아닙니다.", file=sys.stderr)
+
+        # freebusy 조회 (--room 이면 회의실까지 한 번에)
+        freebusy = get_freebusy(service, attendees + optional + [info["id"] for info in rooms.values()],
+                                start_date, end_date, ttl=0 if args.no_cache else None)
+
+        busy_attendees = scores = slot_rooms = None
+        if args.room:
+            found = find_slots_with_rooms(
+                freebusy, attendees, rooms, start_date, end_date, args.duration, args.top,
+                preferred_rooms=args.prefer_room, working_hours=working_hours,
+            )
+            free_slots = [item["slot"] for item in found]
+            slot_rooms = [item["rooms"] for item in found]
+        elif rank == "score":
+            ranked = rank_slots(
+                freebusy, attendees, optional, start_date, end_date, args.duration, args.top,
+                quorum=args.quorum,
+                preferred_hours=parse_preferred_hours(args.preferred_hours) if args.preferred_hours else None,
+                working_hours=working_hours,
+            )
+            free_slots = [item["slot"] for item in ranked]
+            busy_attendees = [item["busy_attendees"] for item in ranked]
+            scores = [item["score"] for item in ranked]
+        elif use_matrix:
+            # 후보 슬롯(바쁜 시간 없이 만든 격자)을 비트맵으로 한꺼번에 판정
+            candidates = find_free_slots([], start_date, end_date, args.duration, working_hours)
+            matrix = AvailabilityMatrix.from_freebusy(freebusy, start_date, end_date,
+                                                      resolution_for(args.duration, 30))
+            ok = matrix.at_most(candidates, args.max_conflicts)
+            free_slots = [slot for slot, free in zip(candidates, ok) if free]
+            if args.max_conflicts > 0:
+                busy_attendees = matrix.busy_attendees(free_slots[:args.top])
+        else:
+            # 바쁜 시간 추출 및 병합
+            busy_periods = parse_busy_periods(freebusy)
+            merged_busy = merge_busy_periods(busy_periods)
+
+            # 빈 시간 찾기
+            free_slots = find_free_slots(
+                merged_busy,
+                start_date,
+                end_date,
+                args.duration,
+                working_hours,
+            )
 
         # 상위 N개만
         top_slots = free_slots[:args.top]
@@ -224,26 +519,48 @@ def main():
                 }
                 for slot in top_slots
             ]
+            if busy_attendees is not None:
+                for item, busy in zip(output, busy_attendees):
+                    item["busy_attendees"] = busy
+            if scores is not None:
+                for item, score in zip(output, scores):
+                    item["score"] = score
+            if slot_rooms is not None:
+                for item, free_rooms in zip(output, slot_rooms):
+                    item["rooms"] = free_rooms
             print(json.dumps(output, ensure_ascii=False, indent=2))
         else:
             if not top_slots:
-                print("❌ 공통 빈 시간이 없습니다.")
+                print("❌ 공통 빈 시간이 없습니다." + (" (가용 회의실 포함)" if args.room else ""))
                 print(f"\n참석자: {', '.join(attendees)}")
+                if optional:
+                    print(f"선택 참석자: {', '.join(optional)}")
                 print(f"기간: {args.start_date} ~ {args.end_date}")
                 print(f"회의 시간: {args.duration}분")
             else:
-                print(f"✅ 공통 빈 시간 (상위 {len(top_slots)}개)")
+                print(f"✅ 공통 빈 시간 (상위 {len(top_slots)}개{', 점수순' if scores is not None else ''})")
                 print(f"참석자: {', '.join(attendees)}")
+                if optional:
+                    print(f"선택 참석자: {', '.join(optional)}")
                 print(f"회의 시간: {args.duration}분\n")
 
                 for i, slot in enumerate(top_slots, 1):
-                    print(f"  {i}. {format_slot(slot)}")
+                    line = f"  {i}. {format_slot(slot)}"
+                    if busy_attendees and busy_attendees[i - 1]:
+                        line += f"  (불참: {', '.join(busy_attendees[i - 1])})"
+                    print(line)
+                    if slot_rooms:
+                        names = [f"{room['name']}({room['capacity']}명)" for room in slot_rooms[i - 1][:3]]
+                        more = len(slot_rooms[i - 1]) - len(names)
+                        print(f"     회의실: {', '.join(names)}{f' 외 {more}개' if more > 0 else ''}")
 
                 # 첫 번째 슬롯 정보 출력 (스크립트 연동용)
                 first = top_slots[0]
                 print(f"\n📅 추천: {format_slot(first)}")
                 print(f"   시작: {first[0].strftime('%Y-%m-%dT%H:%M:%S')}")
                 print(f"   종료: {first[1].strftime('%Y-%m-%dT%H:%M:%S')}")
+                if slot_rooms:
+                    print(f"   회의실: {slot_rooms[0][0]['name']} ({slot_rooms[0][0]['id']})")
 
     except FileNotFoundError as e:
         print(f"❌ {e}", file=sys.stderr)
@@ -0,0 +1,209 @@
+"""
+Google API Batch Executor
+
+Runs many googleapiclient requests through the API's HTTP batch endpoint.
+
+- Requests are grouped into batch calls of up to ``batch_size`` items.
+- Up to ``max_workers`` batch calls run at once; every worker thread uses
+  its own transport because httplib2.Http is not thread-safe.
+- Items that fail with 429/5xx (or a transport error) are retried in a later
+  batch with exponential backoff and jitter.
+- Results come back in request order, one BatchResult per request; a failed
+  item carries its error instead of raising.
+
+The same module ships as google_api/batch.py in every skill with a
+google_api package and as scripts/google_batch.py next to standalone scripts.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, NamedTuple, Optional
+
+import google_auth_httplib2
+import httplib2
+from googleapiclient.errors import HttpError
+
+# Most APIs, Gmail included, cap a batch at 100 calls
+BATCH_LIMIT = 100
+# APIs with a lower cap, keyed by discovery name
+API_BATCH_LIMITS = {'calendar': 50}
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_WORKERS = 4
+MAX_RETRIES = 3
+
+_local = threading.local()
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one request: the response on success, otherwise the error."""
+    key: Any
+    response: Any
+    error: Optional[Exception]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _new_transport(http):
+    """Fresh transport that authorizes (and is quota-governed) like http."""
+    if hasattr(http, 'with_transport'):
+        # Quota-governed transport: keep the governor, replace what it wraps
+        return http.with_transport(_new_transport(http.http))
+    if isinstance(http, google_auth_httplib2.AuthorizedHttp):
+        return google_auth_httplib2.AuthorizedHttp(http.credentials, http=httplib2.Http())
+    return httplib2.Http()
+
+
+def thread_http(service):
+    """
+    Get a transport for the current thread that authorizes like the service's own.
+
+    Args:
+        service: googleapiclient Resource
+
+    Returns:
+        httplib2.Http (or AuthorizedHttp) owned by the calling thread
+    """
+    cache = _local.__dict__.setdefault('http', {})
+    key = id(service._http)
+    if key not in cache:
+        cache[key] = _new_transport(service._http)
+    return cache[key]
+
+
+def is_retryable(error) -> bool:
+    """Whether an error is worth retrying (429, 5xx, transport errors)."""
+    if isinstance(error, HttpError):
+        return error.resp.status == 429 or error.resp.status >= 500
+    return isinstance(error, (OSError, httplib2.HttpLib2Error))
+
+
+def batch_limit(service) -> int:
+    """Most calls one batch may carry for the service's API."""
+    name = getattr(service, '_rootDesc', {}).get('name')
+    return API_BATCH_LIMITS.get(name, BATCH_LIMIT)
+
+
+def _send_batch(service, items: list) -> list:
+    """
+    Send (key, request) items as one batch call.
+
+    Returns:
+        [BatchResult, ...] in item order
+    """
+    responses = {}
+
+    def callback(request_id, response, exception):
+        responses[request_id] = (response, exception)
+
+    batch = service.new_batch_http_request(callback=callback)
+    for i, (_, request) in enumerate(items):
+        batch.add(request, request_id=str(i))
+    try:
+        batch.execute(http=thread_http(service))
+    except Exception as e:
+        # The batch call itself failed: every item gets the same error
+        return [BatchResult(key, None, e) for key, _ in items]
+
+    return [
+        BatchResult(key, *responses.get(str(i), (None, RuntimeError('missing batch response'))))
+        for i, (key, _) in enumerate(items)
+    ]
+
+
+def _run_chunk(service, items: list, max_retries: int) -> list:
+    """Send one chunk, retrying retryable failures; returns results in item order."""
+    results = {}
+    pending = list(enumerate(items))
+
+    for attempt in range(max_retries + 1):
+        if not pending:
+            break
+        if attempt:
+            time.sleep(min(2 ** attempt, 16) + random.random())
+
+        retry = []
+        for (index, item), result in zip(pending, _send_batch(service, [item for _, item in pending])):
+            if result.error is not None and is_retryable(result.error) and attempt < max_retries:
+                retry.append((index, item))
+            else:
+                results[index] = result
+        pending = retry
+
+    return [results[index] for index in range(len(items))]
+
+
+def _as_item(index: int, entry) -> tuple:
+    if isinstance(entry, tuple):
+        return entry
+    return index, entry
+
+
+def iter_batch(
+    service,
+    requests,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_retries: int = MAX_RETRIES,
+):
+    """
+    Execute requests in batch calls and yield results in request order.
+
+    Requests are pulled lazily, so a generator of any length can be passed;
+    only the batches in flight are held in memory.
+
+    Args:
+        service: googleapiclient Resource the requests were built from
+        requests: Iterable of HttpRequest or (key, HttpRequest); plain requests
+            are keyed by their position
+        batch_size: Calls per batch (capped at batch_limit(service))
+        max_workers: Batch calls in flight at once
+        max_retries: Retries for items failing with 429/5xx
+
+    Yields:
+        BatchResult(key, response, error)
+    """
+    batch_size = max(1, min(batch_size, batch_limit(service)))
+    max_workers = max(1, max_workers)
+    items = (_as_item(index, entry) for index, entry in enumerate(requests))
+    in_flight = deque()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            while len(in_flight) < max_workers:
+                chunk = list(islice(items, batch_size))
+                if not chunk:
+                    break
+                in_flight.append(pool.submit(_run_chunk, service, chunk, max_retries))
+
+            if not in_flight:
+                break
+            yield from in_flight.popleft().result()
+
+
+def execute_batch(
+    service,
+    requests,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_retries: int = MAX_RETRIES,
+) -> list:
+    """
+    Execute requests in batch calls.
+
+    Args:
+        service: googleapiclient Resource the requests were built from
+        requests: Iterable of HttpRequest or (key, HttpRequest)
+        batch_size: Calls per batch (capped at batch_limit(service))
+        max_workers: Batch calls in flight at once
+        max_retries: Retries for items failing with 429/5xx
+
+    Returns:
+        List of BatchResult(key, response, error), one per request, in order
+    """
+    return list(iter_batch(service, requests, batch_size, max_workers, max_retries))
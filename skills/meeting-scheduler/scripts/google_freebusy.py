@@ -0,0 +1,248 @@
+"""
+Calendar freeBusy Engine
+
+Answers free/busy lookups for any number of calendars.
+
+- Calendar IDs are split into chunks of FREEBUSY_LIMIT (the API's
+  calendarExpansionMax). The chunk queries go out together through the
+  batch executor (see batch.py), which runs them concurrently and retries
+  429/5xx.
+- Results are cached per (calendar, window) in a small SQLite file for
+  CACHE_TTL seconds, so repeated slot searches during one scheduling
+  conversation do not query again. A cached window also answers any window
+  inside it; busy periods are clipped to the requested window.
+- Busy periods are stored in UTC and served in the requested time zone, so
+  callers with and without time_zone can share the cache. The 'primary'
+  alias is cached under the authorized account's real calendar ID.
+- Calendars the API reports errors for (notFound, ...) are returned with
+  their errors and are not cached.
+
+The same module ships as google_api/freebusy.py in calendar-reader and as
+scripts/google_freebusy.py next to the meeting-scheduler scripts.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import weakref
+from datetime import datetime, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from google_batch import execute_batch
+
+# calendarExpansionMax: calendars per freebusy.query
+FREEBUSY_LIMIT = 50
+FREEBUSY_FIELDS = 'calendars(busy,errors)'
+
+CACHE_PATH = Path(os.getenv(
+    'GOOGLE_FREEBUSY_CACHE',
+    str(Path.home() / '.cache/google-freebusy/freebusy.sqlite3'),
+))
+CACHE_TTL = float(os.getenv('GOOGLE_FREEBUSY_TTL', '120'))  # seconds, 0 disables the cache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS freebusy (
+    calendar_id TEXT NOT NULL,
+    time_min REAL NOT NULL,
+    time_max REAL NOT NULL,
+    fetched_at REAL NOT NULL,
+    busy TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, time_min, time_max)
+);
+"""
+
+
+def _rfc3339(value) -> str:
+    """RFC3339 string of a timezone-aware datetime (strings pass through)."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _epoch(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _format_epoch(seconds: float, time_zone: str = None) -> str:
+    """RFC3339 string as the API formats it: UTC with 'Z', or the offset of time_zone."""
+    if time_zone:
+        return datetime.fromtimestamp(seconds, ZoneInfo(time_zone)).isoformat()
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _clip(busy: list, time_min: float, time_max: float, time_zone: str = None) -> list:
+    """Busy periods overlapping [time_min, time_max), cut to that window and formatted in time_zone."""
+    clipped = []
+    for period in busy:
+        start, end = _epoch(period['start']), _epoch(period['end'])
+        if end <= time_min or start >= time_max:
+            continue
+        clipped.append({
+            'start': _format_epoch(max(start, time_min), time_zone),
+            'end': _format_epoch(min(end, time_max), time_zone),
+        })
+    return clipped
+
+
+def chunked(items: list, size: int = FREEBUSY_LIMIT) -> list:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class FreeBusyCache:
+    """(calendar, window) -> busy periods, shared by every process on this machine."""
+
+    def __init__(self, path=CACHE_PATH, ttl: float = CACHE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, calendar_id: str, time_min: float, time_max: float, time_zone: str = None):
+        """Busy periods (in time_zone) from the newest fresh entry covering the window, or None."""
+        row = self.conn.execute(
+            'SELECT busy FROM freebusy WHERE calendar_id = ? AND time_min <= ? AND time_max >= ? '
+            'AND fetched_at >= ? ORDER BY fetched_at DESC LIMIT 1',
+            (calendar_id, time_min, time_max, time.time() - self.ttl),
+        ).fetchone()
+        return _clip(json.loads(row[0]), time_min, time_max, time_zone) if row else None
+
+    def put(self, entries: dict, time_min: float, time_max: float):
+        """Store {calendar ID: busy periods}; the periods are normalized to UTC."""
+        now = time.time()
+        entries = {
+            cal_id: [{'start': _format_epoch(_epoch(p['start'])), 'end': _format_epoch(_epoch(p['end']))}
+                     for p in busy]
+            for cal_id, busy in entries.items()
+        }
+        with self.conn:
+            self.conn.execute('DELETE FROM freebusy WHERE fetched_at < ?', (now - self.ttl,))
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO freebusy (calendar_id, time_min, time_max, fetched_at, busy) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(cal_id, time_min, time_max, now, json.dumps(busy)) for cal_id, busy in entries.items()],
+            )
+
+    def invalidate(self, calendar_ids=None):
+        """Drop cached entries for the given calendars (all calendars if None)."""
+        with self.conn:
+            if calendar_ids is None:
+                self.conn.execute('DELETE FROM freebusy')
+            else:
+                self.conn.executemany('DELETE FROM freebusy WHERE calendar_id = ?', [(c,) for c in calendar_ids])
+
+
+# Real ID of each service's primary calendar ('primary' means a different calendar per account)
+_PRIMARY_IDS = weakref.WeakKeyDictionary()
+
+
+def _primary_id(service):
+    """ID of the authorized account's primary calendar, or None if it cannot be read."""
+    try:
+        return _PRIMARY_IDS[service]
+    except (KeyError, TypeError):
+        pass
+    try:
+        primary = service.calendars().get(calendarId='primary', fields='id').execute()['id']
+    except Exception:
+        return None
+    try:
+        _PRIMARY_IDS[service] = primary
+    except TypeError:
+        pass
+    return primary
+
+
+def _query_chunks(service, calendar_ids: list, time_min: str, time_max: str, time_zone: str = None) -> dict:
+    """Query the API in chunks; returns {calendar ID: {'busy': [...], 'errors': [...]?}}."""
+    chunks = chunked(calendar_ids)
+    requests = []
+    for index, chunk in enumerate(chunks):
+        body = {'timeMin': time_min, 'timeMax': time_max, 'items': [{'id': cal_id} for cal_id in chunk]}
+        if time_zone:
+            body['timeZone'] = time_zone
+        requests.append((index, service.freebusy().query(body=body, fields=FREEBUSY_FIELDS)))
+
+    calendars = {}
+    for result in execute_batch(service, requests):
+        if result.ok:
+            calendars.update(result.response.get('calendars', {}))
+            continue
+        error = {'domain': 'global', 'reason': 'requestFailed', 'message': str(result.error)}
+        for cal_id in chunks[result.key]:
+            calendars[cal_id] = {'busy': [], 'errors': [error]}
+    return calendars
+
+
+def query_freebusy(
+    service,
+    calendar_ids,
+    time_min,
+    time_max,
+    time_zone: str = None,
+    ttl: float = None,
+) -> dict:
+    """
+    Free/busy information for any number of calendars.
+
+    Args:
+        service: Calendar API service
+        calendar_ids: Calendar IDs (duplicates are ignored)
+        time_min: Window start (RFC3339 string or timezone-aware datetime)
+        time_max: Window end (RFC3339 string or timezone-aware datetime)
+        time_zone: Time zone for the returned busy periods
+        ttl: Cache lifetime in seconds (default CACHE_TTL, 0 bypasses the cache)
+
+    Returns:
+        {calendar ID: {'busy': [{'start', 'end'}, ...]}} in calendar_ids order;
+        calendars that could not be read also carry 'errors'
+    """
+    calendar_ids = list(dict.fromkeys(calendar_ids))
+    time_min, time_max = _rfc3339(time_min), _rfc3339(time_max)
+    ttl = CACHE_TTL if ttl is None else ttl
+    window = (_epoch(time_min), _epoch(time_max))
+
+    cache = FreeBusyCache(ttl=ttl) if ttl > 0 else None
+    try:
+        # Cache keys are real calendar IDs; an unresolved 'primary' is queried but not cached
+        real_ids = {cal_id: cal_id for cal_id in calendar_ids}
+        if cache and 'primary' in real_ids:
+            real_ids['primary'] = _primary_id(service) or 'primary'
+        cacheable = [real_id for real_id in dict.fromkeys(real_ids.values()) if real_id != 'primary']
+
+        calendars = {}
+        if cache:
+            for real_id in cacheable:
+                busy = cache.get(real_id, *window, time_zone)
+                if busy is not None:
+                    calendars[real_id] = {'busy': busy}
+
+        missing = [real_id for real_id in dict.fromkeys(real_ids.values()) if real_id not in calendars]
+        if missing:
+            fetched = _query_chunks(service, missing, time_min, time_max, time_zone)
+            for real_id in missing:
+                calendars[real_id] = fetched.get(real_id, {'busy': [], 'errors': [{'reason': 'missingResponse'}]})
+            if cache:
+                cache.put({
+                    real_id: calendars[real_id].get('busy', [])
+                    for real_id in missing if real_id in cacheable and not calendars[real_id].get('errors')
+                }, *window)
+    finally:
+        if cache:
+            cache.close()
+
+    return {cal_id: calendars[real_ids[cal_id]] for cal_id in calendar_ids}
+
+
+def invalidate(calendar_ids=None):
+    """Forget cached free/busy data, e.g. after creating or moving an event."""
+    if CACHE_PATH.exists():
+        cache = FreeBusyCache()
+        try:
+            cache.invalidate(calendar_ids)
+        finally:
+            cache.close()
@@ -6,23 +6,24 @@
 import argparse
 import json
 import os
-import pickle
 import sys
-from datetime import datetime
-from pathlib import Path
-from typing import List, Dict, Optional
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
+
+# 스킬 데몬이 떠 있으면 데몬에서 실행 (무거운 import 전에 확인)
+if __name__ == '__main__':
+    from daemon_client import forward_to_daemon
+    forward_to_daemon(__file__)
 
 import pytz
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+
+from calendar_service import get_calendar_service
+from google_freebusy import query_freebusy
 
 
 # 설정
 TIMEZONE = 'Asia/Seoul'
-TOKEN_PATHS = [
-    Path.home() / "work/vault-worv/.credentials/calendar_token.pickle",
-    Path.home() / ".credentials/calendar_token.pickle",
-]
 
 # 알려진 회의실 리소스 ID
 # preferred: True인 회의실이 우선 추천됨
@@ -121,28 +122,9 @@ KNOWN_ROOMS = {
 }
 
 
-def get_calendar_service():
-    """OAuth 토큰으로 Calendar API 서비스 반환"""
-    creds = None
-    token_file = None
-
-    for path in TOKEN_PATHS:
-        if path.exists():
-            token_file = path
-            break
-
-    if not token_file:
-        raise FileNotFoundError("Calendar OAuth 토큰을 찾을 수 없습니다.")
-
-    with open(token_file, 'rb') as f:
-        creds = pickle.load(f)
-
-    if creds and creds.expired and creds.refresh_token:
-        creds.refresh(Request())
-        with open(token_file, 'wb') as f:
-            pickle.dump(creds, f)
-
-    return build('calendar', 'v3', credentials=creds)
+def _localize(value: datetime) -> datetime:
+    tz = pytz.timezone(TIMEZONE)
+    return tz.localize(value) if value.tzinfo is None else value
 
 
 def check_room_availability(
@@ -152,24 +134,31 @@ def check_room_availability(
     end: datetime,
 ) -> bool:
     """회의실 가용성 확인"""
-    tz = pytz.timezone(TIMEZONE)
-
-    if start.tzinfo is None:
-        start = tz.localize(start)
-    if end.tzinfo is None:
-        end = tz.localize(end)
-
-    body = {
-        'timeMin': start.isoformat(),
-        'timeMax': end.isoformat(),
-        'items': [{'id': room_id}],
-        'timeZone': TIMEZONE,
-    }
+    return check_rooms_availability(service, [room_id], start, end)[room_id]
 
-    result = service.freebusy().query(body=body).execute()
-    busy = result.get('calendars', {}).get(room_id, {}).get('busy', [])
 
-    return len(busy) == 0
+def check_rooms_availability(
+    service,
+    room_ids: List[str],
+    start: datetime,
+    end: datetime,
+    ttl: float = None,
+) -> Dict[str, bool]:
+    """
+    여러 회의실 가용성을 한 번에 확인.
+
+    freebusy 쿼리 하나에 최대 50개씩 묶어 동시에 조회하고, 최근 조회 결과는 짧은 캐시에서 씁니다.
+    조회에 실패한 회의실은 경고를 출력하고 사용 불가로 처리합니다.
+    """
+    calendars = query_freebusy(service, room_ids, _localize(start), _localize(end), time_zone=TIMEZONE, ttl=ttl)
+    availability = {}
+    for room_id, info in calendars.items():
+        if info.get('errors'):
+            print(f"회의실 {room_id} 조회 실패: {info['errors'][0].get('reason')}", file=sys.stderr)
+            availability[room_id] = False
+        else:
+            availability[room_id] = not info.get('busy')
+    return availability
 
 
 def discover_rooms_from_events(service, days: int = 90) -> Dict[str, Dict]:
@@ -209,18 +198,13 @@ def discover_rooms_from_events(service, days: int = 90) -> Dict[str, Dict]:
     return discovered
 
 
-def get_available_rooms(
-    service,
-    start: datetime,
-    end: datetime,
+def filter_rooms(
     min_capacity: int = 0,
     preferred_only: bool = False,
     location: Optional[str] = None,
-) -> List[Dict]:
-    """가용한 회의실 목록 반환 (선호 회의실 우선)"""
-    available = []
-
-    # 알려진 회의실 확인
+) -> Dict[str, Dict]:
+    """조건에 맞는 알려진 회의실 {이름: 정보}"""
+    candidates = {}
     for name, info in KNOWN_ROOMS.items():
         if min_capacity > 0 and info.get('capacity', 0) < min_capacity:
             continue
@@ -231,32 +215,145 @@ def get_available_rooms(
         if location and info.get('location', '') != location:
             continue
 
-        if check_room_availability(service, info['id'], start, end):
-            available.append({
-                'name': name,
-                'id': info['id'],
-                'capacity': info.get('capacity', 0),
-                'type': info.get('type', ''),
-                'location': info.get('location', ''),
-                'preferred': info.get('preferred', False),
-                'available': True,
-            })
+        candidates[name] = info
+    return candidates
+
+
+def room_sort_key(room: Dict):
+    """선호 회의실 우선, 그 다음 수용 인원 순"""
+    return (not room['preferred'], -room['capacity'])
+
+
+def room_entry(name: str, info: Dict) -> Dict:
+    return {
+        'name': name,
+        'id': info['id'],
+        'capacity': info.get('capacity', 0),
+        'type': info.get('type', ''),
+        'location': info.get('location', ''),
+        'preferred': info.get('preferred', False),
+        'available': True,
+    }
+
+
+def merge_room_busy(calendars: Dict) -> Dict[str, Optional[List[Tuple[datetime, datetime]]]]:
+    """
+    freebusy 결과를 회의실별 바쁜 시간으로 정리.
+
+    Returns:
+        {회의실 ID: 시작순으로 병합된 [(시작, 끝)]} — 조회에 실패한 회의실은 None
+    """
+    busy = {}
+    for room_id, info in calendars.items():
+        if info.get('errors'):
+            busy[room_id] = None
+            continue
+        periods = sorted(
+            (datetime.fromisoformat(period['start'].replace('Z', '+00:00')),
+             datetime.fromisoformat(period['end'].replace('Z', '+00:00')))
+            for period in info.get('busy', [])
+        )
+        merged = []
+        for start, end in periods:
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        busy[room_id] = merged
+    return busy
+
 
-    # 선호 회의실 우선, 그 다음 수용 인원 순
-    available.sort(key=lambda x: (not x['preferred'], -x['capacity']))
-    return available
+def rooms_busy(
+    service,
+    room_ids: List[str],
+    time_min: datetime,
+    time_max: datetime,
+    ttl: float = None,
+) -> Dict[str, Optional[List[Tuple[datetime, datetime]]]]:
+    """
+    여러 회의실의 바쁜 시간을 한 번에 조회 (freebusy 50개씩, 캐시 사용).
+
+    Returns:
+        merge_room_busy 결과 (조회에 실패한 회의실은 경고 출력 후 None)
+    """
+    calendars = query_freebusy(service, room_ids, _localize(time_min), _localize(time_max),
+                               time_zone=TIMEZONE, ttl=ttl)
+    for room_id, info in calendars.items():
+        if info.get('errors'):
+            print(f"회의실 {room_id} 조회 실패: {info['errors'][0].get('reason')}", file=sys.stderr)
+    return merge_room_busy(calendars)
+
+
+def _is_free(busy: Optional[List[Tuple[datetime, datetime]]], ends: List[datetime],
+             start: datetime, end: datetime) -> bool:
+    """병합된 바쁜 시간(rooms_busy)과 그 끝 시각 목록으로 [start, end) 가 비어 있는지 (조회 실패면 False)"""
+    if busy is None:
+        return False
+    # start 이후에 끝나는 첫 바쁜 구간이 end 전에 시작하면 겹침
+    index = bisect_right(ends, start)
+    return index == len(busy) or busy[index][0] >= end
+
+
+def get_available_rooms_for_windows(
+    service,
+    windows: List[Tuple[datetime, datetime]],
+    min_capacity: int = 0,
+    preferred_only: bool = False,
+    location: Optional[str] = None,
+    ttl: float = None,
+) -> List[List[Dict]]:
+    """
+    여러 시간대 각각의 가용 회의실 목록 (선호 회의실 우선).
+
+    모든 후보 회의실 × 모든 시간대를 freebusy 한 번(50개씩 나눈 배치)으로 조회한 뒤 로컬에서 판정합니다.
+
+    Returns:
+        windows 순서대로 가용 회의실 목록
+    """
+    windows = [(_localize(start), _localize(end)) for start, end in windows]
+    if not windows:
+        return []
+    candidates = filter_rooms(min_capacity, preferred_only, location)
+    busy = rooms_busy(service, [info['id'] for info in candidates.values()],
+                      min(start for start, _ in windows), max(end for _, end in windows), ttl)
+
+    ends = {room_id: [end for _, end in periods or []] for room_id, periods in busy.items()}
+
+    results = []
+    for start, end in windows:
+        available = [
+            room_entry(name, info) for name, info in candidates.items()
+            if _is_free(busy.get(info['id']), ends.get(info['id'], []), start, end)
+        ]
+        available.sort(key=room_sort_key)
+        results.append(available)
+    return results
 
 
-from datetime import timedelta
+def get_available_rooms(
+    service,
+    start: datetime,
+    end: datetime,
+    min_capacity: int = 0,
+    preferred_only: bool = False,
+    location: Optional[str] = None,
+    ttl: float = None,
+) -> List[Dict]:
+    """가용한 회의실 목록 반환 (선호 회의실 우선)"""
+    return get_available_rooms_for_windows(service, [(start, end)], min_capacity, preferred_only, location, ttl)[0]
 
 
 def main():
     parser = argparse.ArgumentParser(description="회의실 목록 및 가용성 조회")
     parser.add_argument("--start", help="시작 시간 (YYYY-MM-DDTHH:MM:SS)")
     parser.add_argument("--end", help="종료 시간 (YYYY-MM-DDTHH:MM:SS)")
+    parser.add_argument("--window", action="append",
+                        help="확인할 시간대 START/END (YYYY-MM-DDTHH:MM:SS/YYYY-MM-DDTHH:MM:SS), 여러 번 지정 가능")
+    parser.add_argument("--location", help="위치로 제한 (예: maumai, cw-5층)")
     parser.add_argument("--min-capacity", type=int, default=0, help="최소 수용 인원")
     parser.add_argument("--discover", action="store_true", help="이벤트에서 회의실 발견")
     parser.add_argument("--format", choices=["json", "text"], default="text")
+    parser.add_argument("--no-cache", action="store_true", help="freebusy 캐시를 쓰지 않고 새로 조회")
 
     args = parser.parse_args()
 
@@ -274,13 +371,42 @@ def main():
                 for room_id, info in discovered.items():
                     print(f"  {info['name']}: {room_id}")
 
+        elif args.window:
+            # 여러 시간대의 가용 회의실을 한 번에 조회
+            tz = pytz.timezone(TIMEZONE)
+            windows = []
+            for window in args.window:
+                start_text, _, end_text = window.partition("/")
+                windows.append((tz.localize(datetime.strptime(start_text.strip(), "%Y-%m-%dT%H:%M:%S")),
+                                tz.localize(datetime.strptime(end_text.strip(), "%Y-%m-%dT%H:%M:%S"))))
+
+            results = get_available_rooms_for_windows(service, windows, args.min_capacity, location=args.location,
+                                                      ttl=0 if args.no_cache else None)
+
+            if args.format == "json":
+                output = [
+                    {"start": start.isoformat(), "end": end.isoformat(), "rooms": rooms}
+                    for (start, end), rooms in zip(windows, results)
+                ]
+                print(json.dumps(output, ensure_ascii=False, indent=2))
+            else:
+                for (start, end), rooms in zip(windows, results):
+                    print(f"\n🕐 {start.strftime('%Y-%m-%d %H:%M')} ~ {end.strftime('%H:%M')}")
+                    if not rooms:
+                        print("  ❌ 가용한 회의실이 없습니다.")
+                    for i, room in enumerate(rooms, 1):
+                        capacity = f" ({room['capacity']}명)" if room['capacity'] else ""
+                        room_type = f" [{room['type']}]" if room['type'] else ""
+                        print(f"  {i}. {room['name']}{capacity}{room_type}")
+
         elif args.start and args.end:
             # 특정 시간대 가용 회의실 조회
             tz = pytz.timezone(TIMEZONE)
             start = tz.localize(datetime.strptime(args.start, "%Y-%m-%dT%H:%M:%S"))
             end = tz.localize(datetime.strptime(args.end, "%Y-%m-%dT%H:%M:%S"))
 
-            available = get_available_rooms(service, start, end, args.min_capacity)
+            available = get_available_rooms(service, start, end, args.min_capacity, location=args.location,
+                                            ttl=0 if args.no_cache else None)
 
             if args.format == "json":
                 print(json.dumps(available, ensure_ascii=False, indent=2))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+토큰 저장소 동시성 스트레스 테스트 (google_token_store.py)
+
+실제 계정 없이 가짜 인증 정보를 pickle 로 저장해 두고, 여러 프로세스가 동시에 토큰을 읽게 합니다.
+
+1. 만료된 토큰을 N개 프로세스가 동시에 로드 → 갱신은 정확히 한 번, 모두 같은 새 토큰을 받아야 함
+2. 만료가 임박한(REFRESH_AHEAD 이내) 토큰 → 미리 갱신되어야 함
+3. 한 프로세스가 토큰을 계속 다시 쓰는 동안 N개 프로세스가 읽기 → 깨진 pickle 을 읽으면 안 됨
+
+사용법:
+    python stress_token_refresh.py --processes 32 --refresh-delay 0.5
+실패하면 종료 코드 1.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from google_token_store import REFRESH_AHEAD, load_token, read_token, save_token
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class FakeCredentials:
+    """google.oauth2.credentials.Credentials 중 토큰 저장소가 쓰는 부분만 흉내"""
+
+    def __init__(self, token, expiry, counter_path, refresh_delay, padding=0):
+        self.token = token
+        self.expiry = expiry
+        self.refresh_token = 'refresh-token'
+        self.counter_path = counter_path
+        self.refresh_delay = refresh_delay
+        # 쓰기 도중 읽으면 깨지기 쉽도록 pickle 크기를 키움
+        self.padding = os.urandom(padding)
+
+    @property
+    def valid(self):
+        return bool(self.token) and self.expiry > _utcnow()
+
+    def refresh(self, request):
+        time.sleep(self.refresh_delay)
+        with open(self.counter_path, 'a') as f:
+            f.write(f'{os.getpid()}\n')
+        self.token = f'token-{os.getpid()}-{time.time_ns()}'
+        self.expiry = _utcnow() + timedelta(hours=1)
+
+
+def _load_worker(token_path, barrier, results):
+    barrier.wait()
+    creds = load_token(token_path)
+    results.put((creds.token, creds.valid))
+
+
+def _read_worker(token_path, deadline, results):
+    reads = errors = 0
+    while time.time() < deadline:
+        try:
+            read_token(token_path)
+        except Exception:
+            errors += 1
+        reads += 1
+    results.put((reads, errors))
+
+
+def _write_worker(token_path, deadline, counter_path):
+    i = 0
+    while time.time() < deadline:
+        save_token(token_path, FakeCredentials(f'token-{i}', _utcnow() + timedelta(hours=1),
+                                               counter_path, 0, padding=256 * 1024))
+        i += 1
+
+
+def refresh_count(counter_path) -> int:
+    try:
+        return len(Path(counter_path).read_text().splitlines())
+    except FileNotFoundError:
+        return 0
+
+
+def concurrent_load(ctx, token_path, processes: int) -> list:
+    barrier = ctx.Barrier(processes)
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_load_worker, args=(token_path, barrier, results)) for _ in range(processes)]
+    for p in workers:
+        p.start()
+    tokens = [results.get(timeout=60) for _ in workers]
+    for p in workers:
+        p.join()
+    return tokens
+
+
+def check_expired(ctx, workdir: Path, processes: int, refresh_delay: float) -> bool:
+    token_path, counter = workdir / 'expired.pickle', workdir / 'expired.count'
+    save_token(token_path, FakeCredentials('old', _utcnow() - timedelta(minutes=1), str(counter), refresh_delay))
+
+    start = time.time()
+    tokens = concurrent_load(ctx, token_path, processes)
+    elapsed = time.time() - start
+    refreshes = refresh_count(counter)
+    distinct = {token for token, _ in tokens}
+
+    ok = refreshes == 1 and len(distinct) == 1 and all(valid for _, valid in tokens) and 'old' not in distinct
+    print(f"[만료 토큰] 프로세스 {processes}개, 갱신 {refreshes}회, 받은 토큰 {len(distinct)}종, "
+          f"{elapsed:.2f}s → {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def check_refresh_ahead(ctx, workdir: Path, processes: int) -> bool:
+    token_path, counter = workdir / 'ahead.pickle', workdir / 'ahead.count'
+    expiry = _utcnow() + timedelta(seconds=REFRESH_AHEAD / 2)
+    save_token(token_path, FakeCredentials('soon', expiry, str(counter), 0.1))
+
+    tokens = concurrent_load(ctx, token_path, processes)
+    refreshes = refresh_count(counter)
+    ok = refreshes == 1 and 'soon' not in {token for token, _ in tokens}
+    print(f"[만료 임박 토큰] 갱신 {refreshes}회 → {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def check_torn_reads(ctx, workdir: Path, processes: int, seconds: float) -> bool:
+    token_path, counter = workdir / 'torn.pickle', workdir / 'torn.count'
+    save_token(token_path, FakeCredentials('first', _utcnow() + timedelta(hours=1), str(counter), 0))
+
+    deadline = time.time() + seconds
+    results = ctx.Queue()
+    writer = ctx.Process(target=_write_worker, args=(token_path, deadline, str(counter)))
+    readers = [ctx.Process(target=_read_worker, args=(token_path, deadline, results)) for _ in range(processes)]
+    for p in [writer] + readers:
+        p.start()
+    counts = [results.get(timeout=seconds + 60) for _ in readers]
+    for p in [writer] + readers:
+        p.join()
+
+    reads = sum(r for r, _ in counts)
+    errors = sum(e for _, e in counts)
+    leftovers = [p.name for p in workdir.glob('.torn.pickle.*')]
+    ok = errors == 0 and not leftovers
+    print(f"[쓰기 중 읽기] 읽기 {reads}회, 실패 {errors}회, 남은 임시 파일 {len(leftovers)}개 → "
+          f"{'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='토큰 저장소 동시성 스트레스 테스트')
+    parser.add_argument('--processes', type=int, default=32, help='동시 프로세스 수 (기본: 32)')
+    parser.add_argument('--refresh-delay', type=float, default=0.5, help='가짜 갱신 요청 소요 시간(초)')
+    parser.add_argument('--seconds', type=float, default=2.0, help='쓰기 중 읽기 테스트 시간(초)')
+    args = parser.parse_args()
+
+    # 각 프로세스가 모듈을 새로 import 하도록 spawn 사용 (스크립트를 따로 실행하는 것과 같은 조건)
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        ok = all([
+            check_expired(ctx, workdir, args.processes, args.refresh_delay),
+            check_refresh_ahead(ctx, workdir, args.processes),
+            check_torn_reads(ctx, workdir, args.processes, args.seconds),
+        ])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+스킬 데몬 (skillsd)
+
+스킬 스크립트는 호출마다 새 python3 프로세스로 실행되어 googleapiclient, pptx, PIL, openai
+import 에만 매번 1초 가까이 씁니다. 이 데몬은 그 모듈들을 미리 import 해 둔 채 Unix 소켓에서
+기다리다가, 요청마다 fork 한 자식 프로세스에서 스크립트를 실행합니다.
+- 자식은 import 가 끝난 데몬 메모리를 그대로 물려받아 바로 스크립트 실행을 시작
+- 클라이언트의 stdin/stdout/stderr 를 SCM_RIGHTS 로 넘겨받아 입출력이 클라이언트 터미널로 직접 연결
+- 요청마다 새 프로세스이므로 스킬끼리 같은 이름의 모듈(google_api, gmail_client)이 섞이지 않고,
+  스크립트가 바꾼 전역 상태가 다음 요청에 남지 않음
+- 종료 코드는 소켓으로 돌려보내 클라이언트가 같은 코드로 종료
+
+스크립트 쪽은 daemon_client.forward_to_daemon 으로 데몬이 떠 있을 때만 넘기고,
+없으면 평소처럼 직접 실행합니다.
+
+사용법:
+    python skillsd.py start     # 백그라운드 실행
+    python skillsd.py status
+    python skillsd.py stop
+    python skillsd.py run       # 포그라운드 실행 (로그를 터미널로)
+"""
+
+import argparse
+import array
+import importlib
+import json
+import os
+import runpy
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from daemon_client import CHILD_ENV, SOCKET_PATH
+
+# 이 디렉토리 아래의 스크립트만 실행 (~/.claude/skills 또는 레포의 skills/)
+SKILLS_ROOT = Path(__file__).resolve().parents[2]
+PID_PATH = SOCKET_PATH.with_suffix('.pid')
+LOG_PATH = SOCKET_PATH.with_suffix('.log')
+
+# 설치되지 않은 모듈은 건너뜀 (그 스킬은 자식에서 평소처럼 import)
+PRELOAD_MODULES = (
+    'googleapiclient.discovery',
+    'googleapiclient.errors',
+    'googleapiclient.http',
+    'google.auth.transport.requests',
+    'google.oauth2.credentials',
+    'google.oauth2.service_account',
+    'google_auth_httplib2',
+    'google_auth_oauthlib.flow',
+    'pytz',
+    'dotenv',
+    'openai',
+    'pptx',
+    'PIL.Image',
+    'PIL.ImageDraw',
+    'PIL.ImageFont',
+)
+
+DEFAULT_IDLE_TIMEOUT = 60  # 분
+REAP_INTERVAL = 5.0
+REQUEST_TIMEOUT = 10.0
+MAX_REQUEST_SIZE = 16 * 1024 * 1024
+START_TIMEOUT = 30.0
+
+
+def log(message: str):
+    print(f"[{datetime.now().isoformat(timespec='seconds')}] {message}", file=sys.stderr, flush=True)
+
+
+def preload(modules=PRELOAD_MODULES) -> list:
+    """가능한 모듈만 import 하고 성공한 이름 목록 반환"""
+    loaded = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            continue
+        loaded.append(name)
+    return loaded
+
+
+def _recv_exact(conn, size: int) -> bytes:
+    data = b''
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("요청을 끝까지 받지 못했습니다.")
+        data += chunk
+    return data
+
+
+def read_request(conn) -> tuple:
+    """
+    길이(4바이트) + JSON 요청과 함께 온 파일 디스크립터 3개(stdin/stdout/stderr) 읽기.
+
+    Raises:
+        ValueError: 형식이 잘못된 요청
+        ConnectionError: 요청 도중 연결 끊김
+    """
+    fds = array.array('i')
+    data, ancdata, _, _ = conn.recvmsg(4, socket.CMSG_SPACE(3 * fds.itemsize))
+    if not data:
+        # 상태 확인용 연결 (보낸 것 없이 닫힘)
+        raise ConnectionResetError
+    for level, kind, cmsg in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(cmsg[:len(cmsg) - len(cmsg) % fds.itemsize])
+    if len(fds) != 3:
+        for fd in fds:
+            os.close(fd)
+        raise ValueError(f"파일 디스크립터 3개가 필요합니다 (받은 수: {len(fds)})")
+
+    if len(data) < 4:
+        data += _recv_exact(conn, 4 - len(data))
+    (size,) = struct.unpack('!I', data)
+    if size > MAX_REQUEST_SIZE:
+        raise ValueError(f"요청이 너무 큽니다: {size}바이트")
+    return json.loads(_recv_exact(conn, size)), list(fds)
+
+
+def check_request(request: dict):
+    """실행할 수 없는 요청이면 이유를, 괜찮으면 None 반환"""
+    if request.get('prefix') != sys.prefix:
+        # 다른 가상환경의 스크립트는 그 환경의 패키지로 직접 실행해야 함
+        return f"다른 Python 환경입니다 ({request.get('prefix')})"
+    script = Path(request.get('script', ''))
+    if script.suffix != '.py' or not script.is_file():
+        return f"스크립트를 찾을 수 없습니다: {script}"
+    if SKILLS_ROOT not in script.resolve().parents:
+        return f"{SKILLS_ROOT} 밖의 스크립트는 실행하지 않습니다: {script}"
+    return None
+
+
+def _reset_process(encoding: str):
+    """fork 직후 자식: 데몬의 시그널 처리를 기본값으로, 새 stdio 로 sys.std* 교체"""
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    for signum in (signal.SIGTERM, signal.SIGHUP, signal.SIGCHLD):
+        signal.signal(signum, signal.SIG_DFL)
+
+    sys.stdin = sys.__stdin__ = open(0, 'r', encoding=encoding, closefd=False)
+    # 터미널이면 줄 단위, 파이프/파일이면 블록 단위 버퍼링 (직접 실행할 때와 같게)
+    sys.stdout = sys.__stdout__ = open(1, 'w', buffering=1 if os.isatty(1) else -1,
+                                       encoding=encoding, closefd=False)
+    sys.stderr = sys.__stderr__ = open(2, 'w', buffering=1, encoding=encoding,
+                                       errors='backslashreplace', closefd=False)
+
+
+def run_script(script: str) -> int:
+    """runpy 로 스크립트를 __main__ 으로 실행하고 종료 코드 반환"""
+    try:
+        runpy.run_path(script, run_name='__main__')
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+
+
+def serve_request(conn):
+    """fork 된 자식에서 요청 하나를 처리하고 그 종료 코드로 종료 (반환하지 않음)"""
+    code = 1
+    try:
+        conn.settimeout(REQUEST_TIMEOUT)
+        request, fds = read_request(conn)
+        conn.settimeout(None)
+
+        error = check_request(request)
+        if error:
+            log(f"거절: {error}")
+            conn.sendall(json.dumps({'error': error}).encode() + b'\n')
+            code = 0
+            return
+
+        for target, fd in enumerate(fds):
+            if fd != target:
+                os.dup2(fd, target)
+                os.close(fd)
+        _reset_process(request.get('encoding') or 'utf-8')
+
+        script = request['script']
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        os.environ[CHILD_ENV] = '1'
+        sys.argv = [script] + request['argv']
+        # 직접 실행할 때와 같이 스크립트 디렉토리가 sys.path[0]
+        daemon_dir = str(Path(__file__).parent)
+        sys.path[:] = [os.path.dirname(script)] + [p for p in sys.path if p != daemon_dir]
+
+        conn.sendall(json.dumps({'pid': os.getpid()}).encode() + b'\n')
+        code = run_script(script)
+        conn.sendall(json.dumps({'exit': code}).encode() + b'\n')
+    except ConnectionResetError:
+        code = 0
+    except Exception:
+        # stdio 교체 전이면 데몬 로그, 이후면 클라이언트 stderr 로 출력
+        traceback.print_exc()
+    finally:
+        os._exit(code)
+
+
+def _reap(children: set):
+    for pid in list(children):
+        try:
+            done, status = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            children.discard(pid)
+            continue
+        if done:
+            children.discard(pid)
+            if os.WIFEXITED(status) and os.WEXITSTATUS(status):
+                log(f"pid={pid} 종료 코드 {os.WEXITSTATUS(status)}")
+
+
+def _daemon_alive() -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(SOCKET_PATH))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve(idle_timeout: float):
+    """
+    소켓에서 요청을 받아 fork 로 처리. idle_timeout 초 동안 요청과 실행 중인 작업이 없으면 종료.
+
+    Raises:
+        RuntimeError: 이미 다른 데몬이 같은 소켓에서 실행 중
+    """
+    if _daemon_alive():
+        raise RuntimeError(f"이미 실행 중입니다: {SOCKET_PATH}")
+
+    started = time.monotonic()
+    loaded = preload()
+    log(f"모듈 {len(loaded)}개 미리 import ({time.monotonic() - started:.2f}초): {', '.join(loaded)}")
+
+    SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    SOCKET_PATH.unlink(missing_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(str(SOCKET_PATH))
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
+    server.settimeout(REAP_INTERVAL)
+    PID_PATH.write_text(str(os.getpid()))
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGHUP, stop)
+    log(f"대기 중: {SOCKET_PATH} (pid {os.getpid()}, 실행 가능 경로 {SKILLS_ROOT})")
+
+    children = set()
+    last_active = time.monotonic()
+    try:
+        while True:
+            _reap(children)
+            if children:
+                last_active = time.monotonic()
+            elif idle_timeout and time.monotonic() - last_active > idle_timeout:
+                log("요청이 없어 종료합니다.")
+                break
+
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                serve_request(conn)
+            conn.close()
+            children.add(pid)
+            last_active = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        SOCKET_PATH.unlink(missing_ok=True)
+        PID_PATH.unlink(missing_ok=True)
+        log("종료")
+
+
+def read_pid():
+    try:
+        pid = int(PID_PATH.read_text())
+        os.kill(pid, 0)
+        return pid
+    except (FileNotFoundError, ValueError, ProcessLookupError):
+        return None
+
+
+def start(idle_timeout: float) -> int:
+    """run 을 새 세션의 백그라운드 프로세스로 띄우고 소켓이 열릴 때까지 대기"""
+    if _daemon_alive():
+        print(f"이미 실행 중입니다 (pid {read_pid()}).")
+        return 0
+
+    LOG_PATH.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    env = dict(os.environ)
+    # macOS: fork 한 자식에서 Objective-C 런타임 초기화(프록시 조회 등)가 죽지 않도록
+    env.setdefault('OBJC_DISABLE_INITIALIZE_FORK_SAFETY', 'YES')
+    with open(LOG_PATH, 'a') as log_file:
+        process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), 'run', '--idle-timeout', str(idle_timeout)],
+            stdin=subprocess.DEVNULL, stdout=log_file, stderr=log_file,
+            env=env, start_new_session=True,
+        )
+
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            print(f"시작 실패 (로그: {LOG_PATH})", file=sys.stderr)
+            return 1
+        if _daemon_alive():
+            print(f"시작했습니다 (pid {process.pid}, 소켓 {SOCKET_PATH})")
+            return 0
+        time.sleep(0.1)
+    print(f"시작 대기 시간 초과 (로그: {LOG_PATH})", file=sys.stderr)
+    return 1
+
+
+def stop_daemon() -> int:
+    pid = read_pid()
+    if pid is None:
+        print("실행 중이 아닙니다.")
+        SOCKET_PATH.unlink(missing_ok=True)
+        return 0
+
+    os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline and read_pid() == pid:
+        time.sleep(0.1)
+    print(f"종료했습니다 (pid {pid}).")
+    return 0
+
+
+def status() -> int:
+    pid = read_pid()
+    if pid is None or not _daemon_alive():
+        print("실행 중이 아닙니다.")
+        return 1
+    print(f"실행 중 (pid {pid}, 소켓 {SOCKET_PATH}, 로그 {LOG_PATH})")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='스킬 데몬 (import/인증 비용을 줄이기 위한 상주 프로세스)')
+    parser.add_argument('command', choices=['start', 'stop', 'status', 'run'],
+                        help='start: 백그라운드 실행, stop: 종료, status: 상태, run: 포그라운드 실행')
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help=f'요청이 없으면 이 시간(분) 뒤 종료, 0이면 계속 실행 (기본: {DEFAULT_IDLE_TIMEOUT})')
+
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        sys.exit(start(args.idle_timeout))
+    if args.command == 'stop':
+        sys.exit(stop_daemon())
+    if args.command == 'status':
+        sys.exit(status())
+
+    try:
+        serve(args.idle_timeout * 60)
+    except (RuntimeError, OSError) as e:
+        print(f"오류: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()